@@ -0,0 +1,3 @@
+"""
+Benchmarks for soundcalc. Run them with `python3 -m benchmarks` from the repository root.
+"""
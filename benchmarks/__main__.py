@@ -0,0 +1,74 @@
+"""
+Run the benchmarks, and save them as a baseline or compare them against one.
+
+    python3 -m benchmarks --save               # record a baseline
+    python3 -m benchmarks --compare            # flag regressions against it
+
+The exit code is 1 if a comparison finds a regression.
+"""
+
+from __future__ import annotations
+
+import argparse
+import fnmatch
+import json
+import platform
+import sys
+
+from .suite import SIZES, get_benchmarks, time_benchmark
+
+
+DEFAULT_BASELINE_PATH = "benchmarks/baseline.json"
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="benchmarks", description="soundcalc benchmarks")
+    parser.add_argument("--sizes", type=lambda text: [int(n) for n in text.split(",")], default=list(SIZES),
+                        help="numbers of configs, e.g. 3,1000")
+    parser.add_argument("--filter", default="*", help="only run benchmarks whose name matches this glob")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per benchmark, the fastest one counts")
+    parser.add_argument("--save", nargs="?", const=DEFAULT_BASELINE_PATH, metavar="PATH", help="save as baseline")
+    parser.add_argument("--compare", nargs="?", const=DEFAULT_BASELINE_PATH, metavar="PATH",
+                        help="compare against a baseline")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="flag benchmarks that are slower than the baseline by more than this fraction")
+    args = parser.parse_args(argv)
+
+    baseline = None
+    if args.compare is not None:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)["timings"]
+
+    timings = {}
+    regressions = []
+    for benchmark in get_benchmarks(args.sizes):
+        if not fnmatch.fnmatch(benchmark.name, args.filter):
+            continue
+        seconds = time_benchmark(benchmark, args.repeat)
+        timings[benchmark.name] = seconds
+        line = f"{benchmark.name:<24} {seconds * 1e3:10.2f} ms  {benchmark.num_configs / seconds:12.0f} configs/s"
+        if baseline is not None and benchmark.name in baseline:
+            ratio = seconds / baseline[benchmark.name]
+            line += f"  {ratio:6.2f}x baseline"
+            if ratio > 1 + args.threshold:
+                line += "  REGRESSION"
+                regressions.append(benchmark.name)
+        print(line, flush=True)
+
+    if args.save is not None:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump({
+                "python": platform.python_version(),
+                "machine": platform.machine(),
+                "timings": timings,
+            }, f, indent=2)
+        print(f"wrote :: {args.save}")
+
+    if regressions:
+        print(f"{len(regressions)} regression(s): {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,182 @@
+"""
+The benchmarks, on reproducible synthetic configs derived from the presets.
+"""
+
+from __future__ import annotations
+
+import dataclasses
+import functools
+import random
+import subprocess
+import sys
+import time
+from dataclasses import dataclass
+from typing import Callable
+
+from soundcalc.common.fields import FIELDS
+from soundcalc.common.fri import get_FRI_roots_and_opening_size_bits, get_num_FRI_folding_rounds
+from soundcalc.registry import PRESETS, REGIMES
+from soundcalc.security import get_rbr_levels_for_zkevm_and_regime, compute_security_for_zkevm
+from soundcalc.multi_air import MultiAIR, compute_security_for_multi_air
+from soundcalc.regimes.best_attack import best_attack_security
+from soundcalc.regimes.capacity_bound import _get_optimal_eta_cached
+from soundcalc.regimes.johnson_bound import _get_optimal_m_cached
+from soundcalc.report import build_markdown_report
+from soundcalc.zkevms.param_table import ParamTable
+from soundcalc.zkevms.zkevm import zkEVMConfig, zkEVMParams
+
+
+# Numbers of configs to run every benchmark on
+SIZES = (3, 1000, 100_000)
+
+SEED = 1
+
+
+@dataclass(frozen=True)
+class Benchmark:
+    name: str
+    num_configs: int
+    # Prepares the inputs (not timed), and returns the function to time
+    setup: Callable[[], Callable[[], object]]
+
+
+@functools.lru_cache(maxsize=None)
+def make_configs(num_configs: int, seed: int = SEED) -> tuple[zkEVMConfig, ...]:
+    """
+    Returns `num_configs` variants of the presets, the same ones for every run.
+    The first configs are the presets themselves.
+    """
+    rng = random.Random(seed)
+    presets = [preset.default().cfg for preset in PRESETS.values()]
+    configs = presets[:num_configs]
+    while len(configs) < num_configs:
+        configs.append(dataclasses.replace(
+            rng.choice(presets),
+            rho=rng.choice([1 / 2, 1 / 4, 1 / 8, 1 / 16]),
+            num_queries=rng.randint(20, 200),
+            FRI_folding_factor=rng.choice([2, 4, 8, 16]),
+            field=rng.choice(list(FIELDS.values())),
+            grinding_query_phase=rng.randint(0, 24),
+        ))
+    return tuple(configs)
+
+
+def clear_caches() -> None:
+    """
+    Clear the memoization caches, so that every repetition of a benchmark does the full work.
+    """
+    get_FRI_roots_and_opening_size_bits.cache_clear()
+    get_num_FRI_folding_rounds.cache_clear()
+    _get_optimal_m_cached.cache_clear()
+    _get_optimal_eta_cached.cache_clear()
+
+
+def _make_params(configs: tuple[zkEVMConfig, ...]) -> list[zkEVMParams]:
+    # Build params with all derived attributes, so that only the timed function is measured
+    params_list = [zkEVMParams(cfg) for cfg in configs]
+    for params in params_list:
+        params.FRI_rounds_n, params.proof_size_bits
+    return params_list
+
+
+def _bench_params(num_configs: int):
+    configs = make_configs(num_configs)
+
+    def run():
+        for cfg in configs:
+            zkEVMParams(cfg).proof_size_bits
+    return run
+
+
+def _bench_regime(identifier: str, num_configs: int):
+    regime = REGIMES[identifier]()
+    params_list = _make_params(make_configs(num_configs))
+
+    def run():
+        for params in params_list:
+            try:
+                get_rbr_levels_for_zkevm_and_regime(regime, params)
+            except AssertionError:
+                pass
+    return run
+
+
+def _bench_regime_table(identifier: str, num_configs: int):
+    regime = REGIMES[identifier]()
+    configs = make_configs(num_configs)
+
+    def run():
+        table = ParamTable.from_configs(configs)
+        regime.get_rbr_levels_vectorized(table)
+    return run
+
+
+def _bench_best_attack(num_configs: int):
+    params_list = _make_params(make_configs(num_configs))
+
+    def run():
+        for params in params_list:
+            best_attack_security(params)
+    return run
+
+
+def _bench_report(num_configs: int):
+    regimes = [REGIMES["UDR"](), REGIMES["JBR"]()]
+    sections = {}
+    for i, params in enumerate(_make_params(make_configs(num_configs))):
+        try:
+            sections[f"{params.name} {i}"] = (params, compute_security_for_zkevm(regimes, params))
+        except AssertionError:
+            pass
+
+    def run():
+        build_markdown_report(sections)
+    return run
+
+
+def _bench_multi_air(num_configs: int):
+    # One system with every config as one of its AIRs
+    regime = REGIMES["JBR"]()
+    configs = make_configs(num_configs)
+
+    def run():
+        compute_security_for_multi_air(regime, MultiAIR("bench", configs), "union")
+    return run
+
+
+def _bench_startup(num_configs: int):
+    # One command line invocation with a single preset, as scripts run it; this
+    # is dominated by the imports (see the registry module)
+    command = [sys.executable, "-m", "soundcalc", "solve", "--preset", "zisk", "--regime", "JBR", "--target", "100"]
+
+    def run():
+        for _ in range(num_configs):
+            subprocess.run(command, check=True, stdout=subprocess.DEVNULL)
+    return run
+
+
+def get_benchmarks(sizes=SIZES) -> list[Benchmark]:
+    benchmarks = [Benchmark("startup", 1, lambda: _bench_startup(1))]
+    for n in sizes:
+        benchmarks.append(Benchmark(f"params/{n}", n, lambda n=n: _bench_params(n)))
+        for identifier in REGIMES:
+            benchmarks.append(Benchmark(f"regime/{identifier}/{n}", n, lambda i=identifier, n=n: _bench_regime(i, n)))
+            benchmarks.append(Benchmark(f"table/{identifier}/{n}", n, lambda i=identifier, n=n: _bench_regime_table(i, n)))
+        benchmarks.append(Benchmark(f"best_attack/{n}", n, lambda n=n: _bench_best_attack(n)))
+        benchmarks.append(Benchmark(f"report/{n}", n, lambda n=n: _bench_report(n)))
+        benchmarks.append(Benchmark(f"multi_air/{n}", n, lambda n=n: _bench_multi_air(n)))
+    return benchmarks
+
+
+def time_benchmark(benchmark: Benchmark, repeat: int) -> float:
+    """
+    Returns the fastest of `repeat` runs, in seconds.
+    """
+    run = benchmark.setup()
+    timings = []
+    for _ in range(repeat):
+        clear_caches()
+        start = time.perf_counter()
+        run()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
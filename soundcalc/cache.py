@@ -0,0 +1,120 @@
+"""
+Persistent on-disk cache of the security levels of zkEVM configs, in SQLite.
+
+Results are keyed by a stable hash of the zkEVMConfig and by the regime: its
+identifier, its options (e.g. `optimize_m`) and its FORMULA_VERSION, together
+with COMMON_FORMULA_VERSION. Bumping the formula version of a regime therefore
+invalidates only the results of that regime.
+"""
+
+from __future__ import annotations
+
+import dataclasses
+import hashlib
+import json
+import sqlite3
+from typing import Any, Optional
+
+from .common.fields import FieldParams
+from .common.utils import COMMON_FORMULA_VERSION
+from .security import get_rbr_levels_for_zkevm_and_regime
+from .regimes import best_attack
+from .zkevms.zkevm import zkEVMConfig, zkEVMParams
+
+
+DEFAULT_CACHE_PATH = ".soundcalc-cache.sqlite"
+
+
+def get_config_hash(cfg: zkEVMConfig) -> str:
+    """
+    Returns a hash of all fields of the config, which is stable across runs and machines.
+    """
+    def encode(value):
+        if isinstance(value, FieldParams):
+            return dataclasses.asdict(value)
+        return value
+
+    fields = {field.name: encode(getattr(cfg, field.name)) for field in dataclasses.fields(cfg)}
+    data = json.dumps(fields, sort_keys=True)
+    return hashlib.sha256(data.encode()).hexdigest()
+
+
+def get_regime_key(regime) -> str:
+    """
+    Returns the part of the cache key that identifies a regime, including its version and options.
+    """
+    options = {name: value for name, value in vars(regime).items() if not name.startswith("_")}
+    version = f"{type(regime).FORMULA_VERSION}.{COMMON_FORMULA_VERSION}"
+    return f"{regime.identifier()}@{version}:{json.dumps(options, sort_keys=True)}"
+
+
+# The key of the best attack results
+BEST_ATTACK_KEY = f"best attack@{best_attack.FORMULA_VERSION}.{COMMON_FORMULA_VERSION}"
+
+
+class ResultCache:
+    """
+    A cache of results in an SQLite database. Use it as a context manager, or call
+    `close`, to make sure that new results are written to disk.
+    """
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH):
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._db = sqlite3.connect(path)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS results ("
+            "config_hash TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL, "
+            "PRIMARY KEY (config_hash, key))"
+        )
+
+    def get(self, config_hash: str, key: str) -> Optional[Any]:
+        row = self._db.execute(
+            "SELECT value FROM results WHERE config_hash = ? AND key = ?", (config_hash, key)
+        ).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return json.loads(row[0])
+
+    def put(self, config_hash: str, key: str, value: Any) -> None:
+        self._db.execute(
+            "INSERT OR REPLACE INTO results (config_hash, key, value) VALUES (?, ?, ?)",
+            (config_hash, key, json.dumps(value)),
+        )
+
+    def close(self) -> None:
+        self._db.commit()
+        self._db.close()
+
+    def __enter__(self) -> "ResultCache":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def compute_security_for_zkevm_cached(cache: ResultCache, fri_regimes: list, params: zkEVMParams) -> dict[str, dict]:
+    """
+    Same as `compute_security_for_zkevm`, but results are served from the cache if possible.
+    """
+    config_hash = get_config_hash(params.cfg)
+    results: dict[str, dict] = {}
+
+    for fri_regime in fri_regimes:
+        key = get_regime_key(fri_regime)
+        levels = cache.get(config_hash, key)
+        if levels is None:
+            levels = get_rbr_levels_for_zkevm_and_regime(fri_regime, params)
+            cache.put(config_hash, key, levels)
+        results[fri_regime.identifier()] = levels
+
+    level = cache.get(config_hash, BEST_ATTACK_KEY)
+    if level is None:
+        level = best_attack.best_attack_security(params)
+        cache.put(config_hash, BEST_ATTACK_KEY, level)
+    results["best attack"] = level
+
+    return results
@@ -0,0 +1,273 @@
+"""
+Catalogs of zkEVM configs in data files (TOML, JSON or JSONL), as an alternative
+to writing a preset class per config.
+
+Every entry of a catalog gives the fields of a zkEVMConfig. Fields are given by
+name as in zkEVMConfig, the field by name as in FIELDS (e.g. "GOLDILOCKS_3"), and
+`rho` may be a fraction (e.g. "1/4"). An entry can start from a preset with the
+key `preset` (e.g. "risc0"), and then only give the fields that differ. In TOML
+and JSON, a `defaults` table applies to all entries:
+
+    [defaults]
+    preset = "risc0"
+
+    [[configs]]
+    name = "risc0-goldilocks"
+    field = "GOLDILOCKS_3"
+
+JSON catalogs are objects with the same keys, and JSONL catalogs have one entry
+per line. Entries are validated and turned into configs one at a time, as they
+are consumed. JSONL files are also read line by line, so arbitrarily large
+catalogs can be evaluated with bounded memory.
+"""
+
+from __future__ import annotations
+
+import dataclasses
+import json
+import os
+from fractions import Fraction
+from typing import Any, Iterable, Iterator, Optional
+
+from .common.fields import FIELDS, FieldParams
+from .common.fri import get_FRI_layers
+from .registry import PRESETS
+from .zkevms.zkevm import zkEVMConfig, zkEVMParams
+
+
+# Catalog formats, by name and by file extension
+CATALOG_FORMATS = ("toml", "json", "jsonl")
+
+# Maps each zkEVMConfig field to the name of its type
+_CONFIG_FIELDS = {field.name: field.type for field in dataclasses.fields(zkEVMConfig)}
+
+# The key of an entry that names the preset it starts from
+PRESET_KEY = "preset"
+
+# Fields that have to be at least 1
+_POSITIVE_FIELDS = (
+    "hash_size_bits",
+    "trace_length",
+    "num_columns",
+    "num_polys",
+    "num_queries",
+    "AIR_max_degree",
+    "FRI_early_stop_degree",
+    "max_combo",
+)
+
+# Fields that have to be at least 0
+_GRINDING_FIELDS = (
+    "grinding_batching_phase",
+    "grinding_commit_phase",
+    "grinding_query_phase",
+)
+
+
+class CatalogError(ValueError):
+    """
+    An invalid entry of a catalog.
+    """
+
+    def __init__(self, path: str, location: str, message: str):
+        self.path = path
+        self.location = location
+        super().__init__(f"{path}, {location}: {message}")
+
+
+def _parse_value(name: str, value: Any):
+    type_name = _CONFIG_FIELDS[name]
+    if type_name == "FieldParams":
+        if isinstance(value, FieldParams):
+            return value
+        if isinstance(value, str) and value in FIELDS:
+            return FIELDS[value]
+        raise ValueError(f"unknown field {value!r}, choose from {list(FIELDS)}")
+
+    # bool is a subclass of int, but should not be accepted for numbers (and vice versa)
+    if type_name == "float":
+        if isinstance(value, str):
+            try:
+                return float(Fraction(value))
+            except (ValueError, ZeroDivisionError):
+                pass
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            return float(value)
+    elif type_name == "int":
+        if isinstance(value, int) and not isinstance(value, bool):
+            return value
+    elif type_name == "bool":
+        if isinstance(value, bool):
+            return value
+    elif type_name == "str":
+        if isinstance(value, str):
+            return value
+    raise ValueError(f"{name} must be of type {type_name}, got {value!r}")
+
+
+def check_config(cfg: zkEVMConfig) -> None:
+    """
+    Raise a ValueError if the parameters of the config are out of range.
+
+    These are the assumptions that the calculator makes about its input, e.g. that
+    there are at least as many batched polynomials as columns, and that every FRI
+    layer has at least one leaf.
+    """
+    if not 0 < cfg.rho < 1:
+        raise ValueError(f"rho must be between 0 and 1, got {cfg.rho}")
+    for name in _POSITIVE_FIELDS:
+        if getattr(cfg, name) < 1:
+            raise ValueError(f"{name} must be positive, got {getattr(cfg, name)}")
+    if cfg.num_columns > cfg.num_polys:
+        raise ValueError(f"num_columns ({cfg.num_columns}) must not exceed num_polys ({cfg.num_polys})")
+    if cfg.FRI_folding_factor < 2:
+        raise ValueError(f"FRI_folding_factor must be at least 2, got {cfg.FRI_folding_factor}")
+    for name in _GRINDING_FIELDS:
+        if getattr(cfg, name) < 0:
+            raise ValueError(f"{name} must not be negative, got {getattr(cfg, name)}")
+
+    # Every Merkle tree of FRI needs a leaf, e.g. the last layer is empty if the early stop degree is too small
+    params = zkEVMParams(cfg)
+    layers = get_FRI_layers(
+        num_functions=cfg.num_polys,
+        witness_size=int(params.D),
+        field_extension_degree=int(params.field_extension_degree),
+        early_stop_degree=cfg.FRI_early_stop_degree,
+        folding_factor=cfg.FRI_folding_factor,
+    )
+    if any(num_leafs < 1 for num_leafs, _ in layers):
+        raise ValueError(
+            f"some FRI layer has no leafs for a domain of size {int(params.D)}, FRI_folding_factor "
+            f"{cfg.FRI_folding_factor}, extension degree {params.field_extension_degree} and "
+            f"FRI_early_stop_degree {cfg.FRI_early_stop_degree}"
+        )
+
+
+def parse_config(entry: dict, defaults: Optional[dict] = None) -> zkEVMConfig:
+    """
+    Turn an entry of a catalog into a validated zkEVMConfig.
+
+    The keys of the entry take precedence over `defaults`, which take precedence
+    over the preset that either of them names.
+    """
+    if not isinstance(entry, dict):
+        raise ValueError(f"an entry must be a table of fields, got {entry!r}")
+    entry = {**(defaults or {}), **entry}
+
+    values = {}
+    preset_name = entry.pop(PRESET_KEY, None)
+    if preset_name is not None:
+        if not isinstance(preset_name, str) or preset_name not in PRESETS:
+            raise ValueError(f"unknown preset {preset_name!r}")
+        values = {name: getattr(_get_preset_config(preset_name), name) for name in _CONFIG_FIELDS}
+
+    unknown = set(entry) - set(_CONFIG_FIELDS)
+    if unknown:
+        raise ValueError(f"unknown fields: {sorted(unknown)}")
+    for name, value in entry.items():
+        values[name] = _parse_value(name, value)
+
+    missing = set(_CONFIG_FIELDS) - set(values)
+    if missing:
+        raise ValueError(f"missing fields: {sorted(missing)}")
+
+    cfg = zkEVMConfig(**values)
+    check_config(cfg)
+    return cfg
+
+
+# Configs of the presets that entries start from, as building them can be costly
+_preset_configs: dict[str, zkEVMConfig] = {}
+
+
+def _get_preset_config(name: str) -> zkEVMConfig:
+    if name not in _preset_configs:
+        _preset_configs[name] = PRESETS[name].default().cfg
+    return _preset_configs[name]
+
+
+def _iter_entries(path: str, format: str) -> Iterator[tuple[str, dict, Optional[dict]]]:
+    """
+    Yield the entries of a catalog, with their location in the file and the defaults.
+    """
+    if format == "jsonl":
+        with open(path, encoding="utf-8") as f:
+            for line_number, line in enumerate(f, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError as e:
+                    raise CatalogError(path, f"line {line_number}", str(e)) from None
+                yield f"line {line_number}", entry, None
+        return
+
+    if format == "toml":
+        try:
+            import tomllib
+        except ModuleNotFoundError:
+            # Python < 3.11
+            import tomli as tomllib
+        with open(path, "rb") as f:
+            try:
+                document = tomllib.load(f)
+            except tomllib.TOMLDecodeError as e:
+                raise CatalogError(path, "top level", str(e)) from None
+    else:
+        with open(path, encoding="utf-8") as f:
+            try:
+                document = json.load(f)
+            except json.JSONDecodeError as e:
+                raise CatalogError(path, "top level", str(e)) from None
+
+    if not isinstance(document, dict) or not isinstance(document.get("configs"), list):
+        raise CatalogError(path, "top level", "expected a list of configs under the key 'configs'")
+    defaults = document.get("defaults")
+    if defaults is not None and not isinstance(defaults, dict):
+        raise CatalogError(path, "defaults", f"expected a table of fields, got {defaults!r}")
+    for index, entry in enumerate(document["configs"], start=1):
+        yield f"config {index}", entry, defaults
+
+
+def iter_catalog(
+    path: str,
+    format: Optional[str] = None,
+    errors: Optional[list[CatalogError]] = None,
+) -> Iterator[zkEVMConfig]:
+    """
+    Lazily load the configs of a catalog, in the order of the file.
+
+    The format defaults to the extension of `path`. An invalid entry raises a
+    CatalogError, unless `errors` is given: then the error is appended to it,
+    and the entry is skipped.
+    """
+    if format is None:
+        format = os.path.splitext(path)[1].lstrip(".")
+    if format not in CATALOG_FORMATS:
+        raise ValueError(f"unknown catalog format {format!r}, choose from {CATALOG_FORMATS}")
+
+    for location, entry, defaults in _iter_entries(path, format):
+        try:
+            yield parse_config(entry, defaults)
+        except ValueError as e:
+            if isinstance(entry, dict) and "name" in entry:
+                location += f" ({entry['name']})"
+            error = CatalogError(path, location, str(e))
+            if errors is None:
+                raise error from None
+            errors.append(error)
+
+
+def load_catalog(path: str, format: Optional[str] = None) -> list[zkEVMConfig]:
+    """
+    Load all configs of a catalog. See `iter_catalog`.
+    """
+    return list(iter_catalog(path, format))
+
+
+def iter_catalogs(paths: Iterable[str], errors: Optional[list[CatalogError]] = None) -> Iterator[zkEVMConfig]:
+    """
+    Lazily load the configs of several catalogs, one after the other.
+    """
+    for path in paths:
+        yield from iter_catalog(path, errors=errors)
@@ -0,0 +1,76 @@
+"""
+Small helpers that let the soundness formulas operate on both plain Python
+scalars (a single `zkEVMParams`) and NumPy arrays (a whole `ParamTable`).
+
+For scalars we stick to the `math` module, so that the numbers reported for a
+single zkEVM do not change. NumPy is only imported once an array shows up.
+"""
+
+from __future__ import annotations
+
+import math
+from typing import Any
+
+
+def is_array(x: Any) -> bool:
+    """
+    Returns True if x is a NumPy array (as opposed to a Python scalar).
+    """
+    return hasattr(x, "ndim") and x.ndim > 0
+
+
+def sqrt(x):
+    if not is_array(x):
+        return math.sqrt(x)
+    import numpy as np
+    return np.sqrt(x)
+
+
+def ceil(x):
+    if not is_array(x):
+        return math.ceil(x)
+    import numpy as np
+    return np.ceil(x)
+
+
+def floor(x):
+    if not is_array(x):
+        return math.floor(x)
+    import numpy as np
+    return np.floor(x)
+
+
+def log2(x):
+    if not is_array(x):
+        return math.log2(x)
+    import numpy as np
+    return np.log2(x)
+
+
+def log1p(x):
+    if not is_array(x):
+        return math.log1p(x)
+    import numpy as np
+    return np.log1p(x)
+
+
+def logaddexp2(a, b):
+    """
+    Returns log2(2^a + 2^b), without leaving the log domain.
+    """
+    if not (is_array(a) or is_array(b)):
+        hi, lo = max(a, b), min(a, b)
+        return hi + math.log2(1 + 2.0 ** (lo - hi))
+    import numpy as np
+    return np.logaddexp2(a, b)
+
+
+def where(cond, a, b):
+    """
+    Elementwise `a if cond else b`.
+    """
+    if not (is_array(cond) or is_array(a) or is_array(b)):
+        return a if cond else b
+    import numpy as np
+    return np.where(cond, a, b)
+
@@ -4,7 +4,7 @@ Preset finite fields to be used by the zkEVM configs
 
 from __future__ import annotations
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 import math
 
 
@@ -17,6 +17,11 @@ class FieldParams:
     field_extension_degree: int
     # Extension field size |F| = p^{ext_size}
     F: float
+    # log2 |F|, which is what the soundness formulas work with. Derived from p and the extension degree.
+    log2_F: float = field(init=False)
+
+    def __post_init__(self):
+        object.__setattr__(self, "log2_F", _log2_F(self.p, self.field_extension_degree))
 
 
 def _F(p: int, ext_size: int) -> float:
@@ -24,6 +29,11 @@ def _F(p: int, ext_size: int) -> float:
     return math.pow(p, ext_size)
 
 
+def _log2_F(p: int, ext_size: int) -> float:
+    # Computed from the exact integer |F|, so this does not suffer from the rounding in _F
+    return math.log2(p ** ext_size)
+
+
 # Base fields
 GOLDILOCKS_P = (1 << 64) - (1 << 32) + 1
 BABYBEAR_P = (1 << 31) - (1 << 27) + 1
@@ -59,6 +69,28 @@ BABYBEAR_5 = FieldParams(
 )
 
 
+# All preset fields, by the name of their Python constant
+FIELDS = {
+    "GOLDILOCKS_2": GOLDILOCKS_2,
+    "GOLDILOCKS_3": GOLDILOCKS_3,
+    "BABYBEAR_4": BABYBEAR_4,
+    "BABYBEAR_5": BABYBEAR_5,
+}
+
+
+def get_extension_field(field: FieldParams, field_extension_degree: int) -> FieldParams:
+    """
+    Returns the extension of the given degree over the base field of `field`.
+    """
+    base_name = field.name.split("^")[0]
+    return FieldParams(
+        name=f"{base_name}^{field_extension_degree}",
+        p=field.p,
+        field_extension_degree=field_extension_degree,
+        F=_F(field.p, field_extension_degree),
+    )
+
+
 def field_element_size_bits(field: FieldParams) -> int:
     """
     Returns the size of a field element in bits.
@@ -4,12 +4,19 @@ A few FRI-related utilities used across regimes.
 
 from __future__ import annotations
 
+import functools
 import math
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Optional
+
+from .arrays import log2
 
 if TYPE_CHECKING:
     from ..zkevms.zkevm import zkEVMParams
 
+# Bound on the number of entries in each of the memos below.
+# Sweeps typically share a handful of (domain size, folding factor, field) combinations.
+MEMO_SIZE = 1 << 12
+
 def get_johnson_parameter_m() -> float:
     """
     Return m from https://eprint.iacr.org/2022/1216.pdf
@@ -18,6 +25,7 @@ def get_johnson_parameter_m() -> float:
     #    https://github.com/facebook/winterfell/blob/main/air/src/proof/security.rs#L290-L306
     return 16.0
 
+@functools.lru_cache(maxsize=MEMO_SIZE)
 def get_num_FRI_folding_rounds(
     witness_size: int,
     field_extension_degree: int,
@@ -39,18 +47,44 @@ def get_num_FRI_folding_rounds(
 def get_FRI_query_phase_error(theta: float, num_queries: int, grinding_bits: int) -> float:
     """
     Compute the FRI query phase soundness error.
+    See `get_FRI_query_phase_log2_error`.
+    """
+    return 2.0 ** get_FRI_query_phase_log2_error(theta, num_queries, grinding_bits)
+
+def get_FRI_query_phase_log2_error(theta: float, num_queries: int, grinding_bits: int) -> float:
+    """
+    Compute log2 of the FRI query phase soundness error.
     See the last term of Equation 7 in Theorem 2 of Ha22.
 
     It includes `grinding_query_phase_bits` bits of grinding.
 
+    We stay in the log domain, as (1 - theta) ** num_queries underflows for many queries.
+
     Note: This function is used by all regimes except the toy problem regime (TPR).
     """
-    FRI_query_phase_error = (1 - theta) ** num_queries
+    # log2 of (1 - theta) ** num_queries
+    FRI_query_phase_log2_error = num_queries * log2(1 - theta)
 
     # Add bits of security from grinding (see section 6.3 in ethSTARK)
-    FRI_query_phase_error *= 2 ** (-grinding_bits)
+    FRI_query_phase_log2_error -= grinding_bits
 
-    return FRI_query_phase_error
+    return FRI_query_phase_log2_error
+
+def get_FRI_num_queries_for_level(theta: float, target_bits: float, grinding_bits: int) -> Optional[int]:
+    """
+    Invert `get_FRI_query_phase_error`: return the smallest number of queries such that
+    the query phase error is at most 2^{-target_bits}.
+
+    Each query contributes -log2(1 - theta) bits and grinding adds `grinding_bits` on top,
+    so this is ceil((target_bits - grinding_bits) / -log2(1 - theta)), but at least 1.
+
+    Returns None if theta is out of range, i.e., if there is no closed form.
+    Callers should double check the result, as floating point rounding may be off by one.
+    """
+    if not 0 < theta < 1:
+        return None
+    bits_per_query = -math.log2(1 - theta)
+    return max(1, math.ceil((target_bits - grinding_bits) / bits_per_query))
 
 def get_size_of_merkle_path_bits(num_leafs: int, tuple_size: int, element_size_bits: int, hash_size_bits: int) -> int:
     """
@@ -70,19 +104,16 @@ def get_size_of_merkle_path_bits(num_leafs: int, tuple_size: int, element_size_b
     return leaf_size + sibling + co_path
 
 
-def get_FRI_proof_size_bits(
-        hash_size_bits: int,
-        field_size_bits: int,
+def get_FRI_layers(
         num_functions: int,
-        num_queries: int,
         witness_size: int,
         field_extension_degree: int,
         early_stop_degree: int,
         folding_factor: int,
-) -> int:
-
+) -> list[tuple[int, int]]:
     """
-    Compute the proof size of a (BCS-transformed) FRI interaction in bits.
+    Returns the Merkle trees that a FRI proof commits to, one per layer, as pairs
+    (number of leafs, number of field elements per leaf).
     """
 
     # TODO: the following things are not yet considered.
@@ -91,19 +122,13 @@ def get_FRI_proof_size_bits(
     # The FRI proof contains two parts: Merkle roots, and one "openings" per query,
     # where an "opening" is a Merkle path for each folding layer.
     #
-    # We use the same loop as in `get_num_FRI_folding_rounds`, and count the size that
-    # this layer contributes, which includes the root and all Merkle paths.
+    # We use the same loop as in `get_num_FRI_folding_rounds`.
 
-    size_bits = 0
-
-    # Initial Round: one root and one path per query
+    # Initial Round
     # We assume that for the initial functions, there is only one Merkle root, and
     # each leaf i for that root contains symbols i for all initial functions.
     n = int(witness_size)
-    num_leafs = n // int(folding_factor)
-    tuple_size = num_functions
-    size_bits += hash_size_bits + num_queries * get_size_of_merkle_path_bits(num_leafs, tuple_size, field_size_bits, hash_size_bits)
-
+    layers = [(n // int(folding_factor), num_functions)]
 
     # Folding rounds
     # We assume that "siblings" for the following layers are grouped together
@@ -112,9 +137,66 @@ def get_FRI_proof_size_bits(
     # TODO: need to check if that is actually the correct loop
     while n // int(folding_factor * field_extension_degree) >= int(early_stop_degree):
         n //= int(folding_factor)
-        num_leafs = n // int(folding_factor)
-        tuple_size = folding_factor
+        layers.append((n // int(folding_factor), folding_factor))
+
+    return layers
+
+
+def get_FRI_proof_size_bits(
+        hash_size_bits: int,
+        field_size_bits: int,
+        num_functions: int,
+        num_queries: int,
+        witness_size: int,
+        field_extension_degree: int,
+        early_stop_degree: int,
+        folding_factor: int,
+) -> int:
+
+    """
+    Compute the proof size of a (BCS-transformed) FRI interaction in bits.
+    """
+    roots_bits, opening_bits = get_FRI_roots_and_opening_size_bits(
+        hash_size_bits=hash_size_bits,
+        field_size_bits=field_size_bits,
+        num_functions=num_functions,
+        witness_size=witness_size,
+        field_extension_degree=field_extension_degree,
+        early_stop_degree=early_stop_degree,
+        folding_factor=folding_factor,
+    )
+    return roots_bits + num_queries * opening_bits
+
+
+@functools.lru_cache(maxsize=MEMO_SIZE)
+def get_FRI_roots_and_opening_size_bits(
+        hash_size_bits: int,
+        field_size_bits: int,
+        num_functions: int,
+        witness_size: int,
+        field_extension_degree: int,
+        early_stop_degree: int,
+        folding_factor: int,
+) -> tuple[int, int]:
+    """
+    Compute the two parts of the FRI proof size in bits: the size of all Merkle roots,
+    and the size of one "opening", which is sent once per query.
+
+    The proof size is then `roots + num_queries * opening`. As this does not depend on
+    the number of queries, it is memoized.
+    """
+
+    roots_bits = 0
+    opening_bits = 0
+    for num_leafs, tuple_size in get_FRI_layers(
+        num_functions=num_functions,
+        witness_size=witness_size,
+        field_extension_degree=field_extension_degree,
+        early_stop_degree=early_stop_degree,
+        folding_factor=folding_factor,
+    ):
         # one root and one path per query
-        size_bits += hash_size_bits + num_queries * get_size_of_merkle_path_bits(num_leafs, tuple_size, field_size_bits, hash_size_bits)
+        roots_bits += hash_size_bits
+        opening_bits += get_size_of_merkle_path_bits(num_leafs, tuple_size, field_size_bits, hash_size_bits)
 
-    return size_bits
\ No newline at end of file
+    return roots_bits, opening_bits
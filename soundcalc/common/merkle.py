@@ -0,0 +1,209 @@
+"""
+A proof size model with deduplicated Merkle openings and Merkle caps.
+
+`get_FRI_proof_size_bits` charges every query a full, independent Merkle path per
+layer. In practice, the openings of all queries to a tree are batched: a node is
+sent only once, and not at all if the verifier can compute it from other queries.
+Provers may also send a Merkle cap, i.e., all 2^cap_height nodes at that height
+instead of the root, so that paths stop below the cap.
+
+We keep the layout of `get_size_of_merkle_path_bits`: an opening sends the leaf
+and its sibling leaf in full, and the hashes above them. For queries at leafs
+S of a tree, let A_l be the number of distinct nodes at height l above S (so A_0
+is the number of distinct leafs). Then the openings send 2 * A_1 leafs, and at
+every height 0 < l < depth - cap_height, the 2 * A_{l+1} - A_l siblings that
+are not computed from other queries.
+
+Queries are uniformly random positions, drawn independently with replacement,
+so the expected A_l has a closed form (see `get_expected_num_distinct_nodes`).
+The expected proof size is computed analytically from there. The distribution of
+the proof size, which depends on how the positions of one query relate across
+layers, is sampled with NumPy (see `sample_FRI_proof_size_bits`).
+"""
+
+from __future__ import annotations
+
+import math
+from typing import Optional, TYPE_CHECKING
+
+from .fri import get_FRI_layers
+
+if TYPE_CHECKING:
+    import numpy as np
+    from ..zkevms.zkevm import zkEVMParams
+
+
+def get_expected_num_distinct_nodes(num_leafs: int, num_queries: int, height: int) -> float:
+    """
+    Returns the expected number of distinct nodes at `height` above `num_queries`
+    uniformly random leafs of a tree with `num_leafs` leafs.
+
+    The nodes at that height split the leafs into buckets of 2^height leafs (the last
+    one may be smaller), and a bucket is hit with probability 1 - (1 - size/num_leafs)^num_queries.
+    """
+    size = 1 << height
+    num_full, remainder = divmod(num_leafs, size)
+
+    def hit_probability(bucket_size: int) -> float:
+        # 1 - (1 - p)^q, without cancellation for small p
+        return -math.expm1(num_queries * math.log1p(-bucket_size / num_leafs)) if bucket_size < num_leafs else 1.0
+
+    expected = num_full * hit_probability(size)
+    if remainder:
+        expected += hit_probability(remainder)
+    return expected
+
+
+def _get_opening_bits(
+    num_distinct_nodes,
+    tree_depth: int,
+    cap_height: int,
+    leaf_size_bits: int,
+    hash_size_bits: int,
+):
+    # The size of the batched openings, given the number of distinct nodes at each height (see the module docs).
+    # Works both for expected values and for arrays of samples.
+    A = num_distinct_nodes
+    cap_height = min(cap_height, tree_depth)
+    top = tree_depth - cap_height
+    if top == 0:
+        # The cap consists of the hashes of the leafs, so only the leafs themselves are sent
+        return A[0] * leaf_size_bits
+    bits = 2 * A[1] * leaf_size_bits
+    for height in range(1, top):
+        bits = bits + (2 * A[height + 1] - A[height]) * hash_size_bits
+    return bits
+
+
+def get_expected_merkle_opening_bits(
+    num_leafs: int,
+    tuple_size: int,
+    element_size_bits: int,
+    hash_size_bits: int,
+    num_queries: int,
+    cap_height: int = 0,
+) -> float:
+    """
+    Returns the expected size of the openings of `num_queries` random leafs of a Merkle tree,
+    with deduplicated nodes. Also see `get_size_of_merkle_path_bits`, for a single path.
+    """
+    assert num_leafs > 0
+    tree_depth = math.ceil(math.log2(num_leafs))
+    A = [get_expected_num_distinct_nodes(num_leafs, num_queries, height) for height in range(tree_depth + 1)]
+    return _get_opening_bits(A, tree_depth, cap_height, tuple_size * element_size_bits, hash_size_bits)
+
+
+def _get_cap_bits(num_leafs: int, cap_height: int, hash_size_bits: int) -> int:
+    # The cap replaces the root: it has one hash per node at `cap_height` below the root
+    tree_depth = math.ceil(math.log2(num_leafs))
+    return math.ceil(num_leafs / (1 << (tree_depth - min(cap_height, tree_depth)))) * hash_size_bits
+
+
+def get_expected_FRI_proof_size_bits(
+        hash_size_bits: int,
+        field_size_bits: int,
+        num_functions: int,
+        num_queries: int,
+        witness_size: int,
+        field_extension_degree: int,
+        early_stop_degree: int,
+        folding_factor: int,
+        cap_height: int = 0,
+) -> float:
+    """
+    Expected counterpart of `get_FRI_proof_size_bits`, where the openings of the
+    queries are deduplicated and every tree is committed to with a Merkle cap.
+    """
+    bits = 0.0
+    for num_leafs, tuple_size in get_FRI_layers(
+        num_functions=num_functions,
+        witness_size=witness_size,
+        field_extension_degree=field_extension_degree,
+        early_stop_degree=early_stop_degree,
+        folding_factor=folding_factor,
+    ):
+        bits += _get_cap_bits(num_leafs, cap_height, hash_size_bits)
+        bits += get_expected_merkle_opening_bits(
+            num_leafs, tuple_size, field_size_bits, hash_size_bits, num_queries, cap_height
+        )
+    return bits
+
+
+def sample_FRI_proof_size_bits(
+        hash_size_bits: int,
+        field_size_bits: int,
+        num_functions: int,
+        num_queries: int,
+        witness_size: int,
+        field_extension_degree: int,
+        early_stop_degree: int,
+        folding_factor: int,
+        cap_height: int = 0,
+        num_samples: int = 1000,
+        seed: Optional[int] = None,
+) -> np.ndarray:
+    """
+    Monte Carlo counterpart of `get_expected_FRI_proof_size_bits`: returns the proof
+    size for `num_samples` random draws of the query positions.
+
+    Each query is a random leaf of the first layer, and follows the folding to the
+    leaf at the same relative position of the following layers.
+    """
+    import numpy as np
+
+    rng = np.random.default_rng(seed)
+    layers = get_FRI_layers(
+        num_functions=num_functions,
+        witness_size=witness_size,
+        field_extension_degree=field_extension_degree,
+        early_stop_degree=early_stop_degree,
+        folding_factor=folding_factor,
+    )
+    first_num_leafs = layers[0][0]
+    positions = np.sort(rng.integers(0, first_num_leafs, size=(num_samples, num_queries)), axis=1)
+
+    bits = np.zeros(num_samples)
+    for num_leafs, tuple_size in layers:
+        # Sorting is preserved by these maps, so the positions of every layer stay sorted
+        leafs = positions * num_leafs // first_num_leafs
+        tree_depth = math.ceil(math.log2(num_leafs))
+        # The distinct nodes at each height are the distinct leafs, shifted by the height
+        A = [1 + np.count_nonzero(np.diff(leafs >> height, axis=1), axis=1) for height in range(tree_depth + 1)]
+        bits += _get_cap_bits(num_leafs, cap_height, hash_size_bits)
+        bits += _get_opening_bits(A, tree_depth, cap_height, tuple_size * field_size_bits, hash_size_bits)
+    return bits
+
+
+def get_expected_proof_size_bits(params: zkEVMParams, cap_height: int = 0) -> float:
+    """
+    Expected counterpart of `zkEVMParams.proof_size_bits`, see `get_expected_FRI_proof_size_bits`.
+    """
+    return get_expected_FRI_proof_size_bits(**_get_proof_size_arguments(params), cap_height=cap_height)
+
+
+def sample_proof_size_bits(
+    params: zkEVMParams,
+    cap_height: int = 0,
+    num_samples: int = 1000,
+    seed: Optional[int] = None,
+) -> np.ndarray:
+    """
+    Samples of the proof size of a zkEVM, see `sample_FRI_proof_size_bits`.
+    """
+    return sample_FRI_proof_size_bits(
+        **_get_proof_size_arguments(params), cap_height=cap_height, num_samples=num_samples, seed=seed
+    )
+
+
+def _get_proof_size_arguments(params: zkEVMParams) -> dict:
+    # The same as in `zkEVMParams.proof_size_bits`
+    return dict(
+        hash_size_bits=params.hash_size_bits,
+        field_size_bits=params.field_size_bits,
+        num_functions=params.num_polys,
+        num_queries=params.num_queries,
+        witness_size=int(params.D),
+        field_extension_degree=int(params.field_extension_degree),
+        early_stop_degree=int(params.FRI_early_stop_degree),
+        folding_factor=int(params.FRI_folding_factor),
+    )
@@ -4,8 +4,14 @@ from ..zkevms.zkevm import zkEVMParams
 
 import math
 
+from .arrays import is_array, floor, log2, log1p
+
 KIB = (1024 * 8) # Kilobytes
 
+# Bump this whenever a change to the formulas shared by all regimes (in this directory)
+# changes results. All cached results (see the cache module) are then recomputed.
+COMMON_FORMULA_VERSION = 1
+
 def get_rho_plus(H: int, D: float, max_combo: int) -> float:
     """Compute rho+. See page 16 of Ha22"""
     # XXX Should this be (H + 2) / D? This part is cryptic in [Ha22]
@@ -19,6 +25,18 @@ def get_DEEP_ALI_errors(L_plus: float, params: zkEVMParams):
 
     Returns a dictionary containing levels for ALI and DEEP
     """
+    log2_e_ALI, log2_e_DEEP = get_ALI_and_DEEP_log2_error(L_plus, params)
+
+    levels = {}
+    levels["ALI"] = get_bits_of_security_from_log2_error(log2_e_ALI)
+    levels["DEEP"] = get_bits_of_security_from_log2_error(log2_e_DEEP)
+
+    return levels
+
+def get_ALI_and_DEEP_log2_error(L_plus: float, params: zkEVMParams) -> tuple[float, float]:
+    """
+    Returns log2 of the errors (not the levels) for ALI and DEEP, see `get_DEEP_ALI_errors`.
+    """
 
     # TODO Check that it holds for all regimes
 
@@ -27,21 +45,37 @@ def get_DEEP_ALI_errors(L_plus: float, params: zkEVMParams):
     # We might want to generalize this further for other zkEVMs.
     # For example, Miden also computes similar values for DEEP-ALI in:
     # https://github.com/facebook/winterfell/blob/2f78ee9bf667a561bdfcdfa68668d0f9b18b8315/air/src/proof/security.rs#L188-L210
-    e_ALI = L_plus * params.num_columns / params.F
-    e_DEEP = (
-        L_plus
-        * (params.AIR_max_degree * (params.trace_length + params.max_combo - 1) + (params.trace_length - 1))
-        / (params.F - params.trace_length - params.D)
-    )
 
-    levels = {}
-    levels["ALI"] = get_bits_of_security_from_error(e_ALI)
-    levels["DEEP"] = get_bits_of_security_from_error(e_DEEP)
+    # e_ALI = L_plus * num_columns / F
+    log2_e_ALI = log2(L_plus) + log2(params.num_columns) - params.log2_F
 
-    return levels
+    # e_DEEP = L_plus * (AIR_max_degree * (H + max_combo - 1) + (H - 1)) / (F - H - D)
+    # where log2(F - H - D) = log2(F) + log2(1 - (H + D) / F)
+    H = params.trace_length
+    log2_denominator = params.log2_F + log1p(-(H + params.D) * 2.0 ** -params.log2_F) / math.log(2)
+    log2_e_DEEP = (
+        log2(L_plus)
+        + log2(params.AIR_max_degree * (H + params.max_combo - 1) + (H - 1))
+        - log2_denominator
+    )
+    return log2_e_ALI, log2_e_DEEP
 
 def get_bits_of_security_from_error(error: float) -> int:
     """
     Returns the maximum k such that error <= 2^{-k}
+
+    If error is a NumPy array, this is applied entrywise and an integer array is returned.
+    """
+    if is_array(error):
+        return floor(-log2(error)).astype(int)
+    return int(math.floor(-math.log2(error)))
+
+def get_bits_of_security_from_log2_error(log2_error: float) -> int:
+    """
+    Returns the maximum k such that 2^{log2_error} <= 2^{-k}
+
+    If log2_error is a NumPy array, this is applied entrywise and an integer array is returned.
     """
-    return int(math.floor(-math.log2(error)))
\ No newline at end of file
+    if is_array(log2_error):
+        return floor(-log2_error).astype(int)
+    return int(math.floor(-log2_error))
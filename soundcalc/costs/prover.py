@@ -0,0 +1,172 @@
+"""
+A rough model of the work of a FRI-based prover, to rank configs by prover time.
+
+We count the dominant operations of the parts of the prover that the parameters
+of a config control:
+- the low-degree extension (LDE) of every polynomial, with NTTs,
+- the hashing of the Merkle trees of the initial and the folded codewords,
+- batching the polynomials and folding the codewords in FRI,
+- grinding before the batching, folding and query challenges.
+Field operations are counted as multiplications in the base field, where one
+multiplication in an extension of degree e costs e^2 of them. Hashing is counted
+in compressions of the hash function.
+
+The work is turned into seconds with a `MachineProfile`, i.e., the rates at which
+a machine performs these operations. Witness generation and the evaluation of the
+constraints are not part of the model, as they depend on the zkEVM rather than
+on the parameters.
+
+Like the regimes, the model works both on a single `zkEVMParams` and on a whole
+`ParamTable`.
+"""
+
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass
+
+from ..common.arrays import ceil, is_array, log2, where
+from ..common.fri import get_FRI_layers
+from ..zkevms.zkevm import zkEVMParams
+
+
+@dataclass(frozen=True)
+class MachineProfile:
+    """
+    The rates at which a machine performs the operations of the model.
+    """
+    name: str
+    # Base field multiplications per second, across all cores (including the additions that go with them)
+    field_mults_per_second: float
+    # Compressions of the Merkle tree hash function per second, across all cores
+    hashes_per_second: float
+    # Hashes per second when grinding, which is often done on more specialized hardware
+    grinding_hashes_per_second: float
+    # Number of input bits that one compression absorbs
+    hash_rate_bits: int = 512
+
+
+# A ballpark 16-core CPU. Measure the rates of your machine for numbers you can rely on.
+DEFAULT_MACHINE = MachineProfile(
+    name="16-core CPU",
+    field_mults_per_second=2e10,
+    hashes_per_second=2e8,
+    grinding_hashes_per_second=2e8,
+)
+
+
+def load_machine_profile(path: str) -> MachineProfile:
+    """
+    Load a machine profile from a JSON object with the fields of MachineProfile.
+    """
+    with open(path, encoding="utf-8") as f:
+        return MachineProfile(**json.load(f))
+
+
+@dataclass(frozen=True)
+class ProverCost:
+    """
+    The work of the prover for a config (or arrays of it, for a `ParamTable`).
+    """
+    # Base field multiplications of the NTTs of the low-degree extension
+    lde_field_mults: float
+    # Compressions to build all Merkle trees
+    merkle_hashes: float
+    # Base field multiplications of batching and folding in FRI
+    fri_field_mults: float
+    # Expected number of hashes until grinding succeeds
+    grinding_hashes: float
+
+    def get_seconds(self, machine: MachineProfile = DEFAULT_MACHINE) -> dict[str, float]:
+        """
+        Returns the estimated seconds per part of the prover, and their "total".
+        """
+        seconds = {
+            "LDE": self.lde_field_mults / machine.field_mults_per_second,
+            "Merkle": self.merkle_hashes / machine.hashes_per_second,
+            "FRI": self.fri_field_mults / machine.field_mults_per_second,
+            "grinding": self.grinding_hashes / machine.grinding_hashes_per_second,
+        }
+        seconds["total"] = sum(seconds.values())
+        return seconds
+
+
+def get_expected_grinding_hashes(grinding_bits):
+    """
+    Returns the expected number of hashes until a nonce with `grinding_bits` bits of
+    grinding is found, where no grinding (0 bits) takes no hashes at all.
+    """
+    return where(grinding_bits > 0, 2.0 ** grinding_bits, 0.0)
+
+
+def _get_ntt_mults(size):
+    # A radix-2 NTT of the given size does size/2 butterflies in each of its log2(size) layers
+    return size / 2 * log2(size)
+
+
+def _get_FRI_layers(params: zkEVMParams) -> list:
+    # `get_FRI_layers` for a single zkEVM, and its vectorized version for a `ParamTable`
+    kwargs = dict(
+        num_functions=params.num_polys,
+        witness_size=params.D,
+        field_extension_degree=params.field_extension_degree,
+        early_stop_degree=params.FRI_early_stop_degree,
+        folding_factor=params.FRI_folding_factor,
+    )
+    if is_array(params.D):
+        from ..zkevms.param_table import get_FRI_layers_vectorized
+        return get_FRI_layers_vectorized(**kwargs)
+    return get_FRI_layers(**{name: int(value) for name, value in kwargs.items()})
+
+
+def get_prover_cost(params: zkEVMParams, machine: MachineProfile = DEFAULT_MACHINE) -> ProverCost:
+    """
+    Returns the work of the prover for the given zkEVM (or `ParamTable`).
+
+    The machine only determines how many input bits one hash compression absorbs.
+    """
+    ext = params.field_extension_degree * 1.0
+    ff = params.FRI_folding_factor * 1.0
+    rounds = params.FRI_rounds_n
+    D = params.D * 1.0
+
+    # LDE: interpolate each polynomial over the trace domain, and evaluate it over the
+    # evaluation domain. The columns of the trace are in the base field, the other
+    # batched polynomials (e.g. the composition polynomials) in the extension field.
+    num_polys_in_base_field = params.num_columns + ext * (params.num_polys - params.num_columns)
+    lde_field_mults = num_polys_in_base_field * (_get_ntt_mults(params.trace_length * 1.0) + _get_ntt_mults(D))
+
+    # Merkle trees: one per layer of `get_FRI_layers`, as in the proof size. Every leaf
+    # is hashed in chunks of `hash_rate_bits`, and a tree with L leafs has L - 1 inner nodes.
+    merkle_hashes = 0
+    for num_leafs, tuple_size in _get_FRI_layers(params):
+        leaf_hashes = ceil(tuple_size * params.field_size_bits / machine.hash_rate_bits)
+        merkle_hashes = merkle_hashes + num_leafs * leaf_hashes + where(num_leafs > 0, num_leafs - 1, 0)
+
+    # FRI: batching multiplies every entry of every polynomial by an element of the extension
+    # field, and every folding round does one extension multiplication per entry of its codeword.
+    batching_mults = D * params.num_polys * ext
+    # sum of the sizes of the folded codewords: D + D/ff + ... (one term per folding round)
+    folding_mults = D * (1 - ff ** -rounds) / (1 - 1 / ff) * ext ** 2
+    fri_field_mults = batching_mults + folding_mults
+
+    # Grinding before the batching challenge, before each folding challenge, and before the queries
+    grinding_hashes = (
+        get_expected_grinding_hashes(params.grinding_batching_phase)
+        + rounds * get_expected_grinding_hashes(params.grinding_commit_phase)
+        + get_expected_grinding_hashes(params.grinding_query_phase)
+    )
+
+    return ProverCost(
+        lde_field_mults=lde_field_mults,
+        merkle_hashes=merkle_hashes,
+        fri_field_mults=fri_field_mults,
+        grinding_hashes=grinding_hashes,
+    )
+
+
+def get_prover_seconds(params: zkEVMParams, machine: MachineProfile = DEFAULT_MACHINE) -> float:
+    """
+    Returns the estimated total prover seconds of the model for the given zkEVM (or `ParamTable`).
+    """
+    return get_prover_cost(params, machine).get_seconds(machine)["total"]
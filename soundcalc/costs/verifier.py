@@ -0,0 +1,177 @@
+"""
+A model of the work of a FRI verifier, and of its cost in gas (or cycles).
+
+Per query, the verifier checks one Merkle opening per FRI layer (with the layers of
+`get_FRI_layers`, as in the proof size), combines the openings of the initial layer
+into the DEEP quotient, checks every folding step, and evaluates the final
+polynomial. Once per proof, it evaluates the constraints at the out-of-domain point
+(ALI), hashes the transcript for Fiat-Shamir, and checks the grinding nonces.
+
+Field operations are counted as multiplications in the base field, where one
+multiplication in an extension of degree e costs e^2 of them. Hashing is counted
+in compressions of the hash function. The constraint evaluation depends on the
+AIR, so we only charge AIR_max_degree extension multiplications per column for it.
+
+The work is turned into a cost with a `CostSchedule`, which gives the cost per
+hash, per field multiplication and per byte of proof (e.g. calldata). Its default
+is a ballpark of an EVM verifier; calibrate it against a real verifier for numbers
+you can rely on.
+
+The work is affine in the number of queries (see `get_verifier_cost_affine`), just
+like the proof size, so it can also be used as the objective of `find_pareto_frontier`.
+"""
+
+from __future__ import annotations
+
+import json
+import math
+from dataclasses import dataclass
+
+from ..common.fri import get_FRI_layers, get_FRI_roots_and_opening_size_bits
+from ..zkevms.zkevm import zkEVMParams
+
+
+@dataclass(frozen=True)
+class CostSchedule:
+    """
+    The cost of the operations of the verifier, in some unit (e.g. gas or cycles).
+    """
+    name: str
+    unit: str
+    # Cost of one compression of the hash function
+    per_hash: float
+    # Cost of one multiplication in the base field, including the additions that go with it
+    per_field_mult: float
+    # Cost of one byte of the proof, e.g. for calldata
+    per_proof_byte: float
+    # Cost that does not depend on the proof, e.g. of the transaction
+    fixed: float = 0.0
+    # Number of input bits that one compression absorbs
+    hash_rate_bits: int = 512
+
+
+# Ballpark EVM costs: keccak256 of 64 bytes plus memory handling, a mulmod plus stack
+# handling, non-zero calldata bytes (EIP-2028), and the base cost of a transaction.
+EVM_GAS = CostSchedule(
+    name="EVM",
+    unit="gas",
+    per_hash=60,
+    per_field_mult=20,
+    per_proof_byte=16,
+    fixed=21000,
+)
+
+
+def load_cost_schedule(path: str) -> CostSchedule:
+    """
+    Load a cost schedule from a JSON object with the fields of CostSchedule.
+    """
+    with open(path, encoding="utf-8") as f:
+        return CostSchedule(**json.load(f))
+
+
+@dataclass(frozen=True)
+class VerifierCost:
+    """
+    The work of the verifier for a config, or for a part of it (see `get_verifier_cost_affine`).
+    """
+    # Compressions of the hash function
+    hashes: float
+    # Multiplications in the base field
+    field_mults: float
+    proof_size_bits: float
+
+    def scaled(self, factor: float) -> "VerifierCost":
+        return VerifierCost(self.hashes * factor, self.field_mults * factor, self.proof_size_bits * factor)
+
+    def __add__(self, other: "VerifierCost") -> "VerifierCost":
+        return VerifierCost(
+            self.hashes + other.hashes,
+            self.field_mults + other.field_mults,
+            self.proof_size_bits + other.proof_size_bits,
+        )
+
+    def get_cost(self, schedule: CostSchedule = EVM_GAS, include_fixed: bool = True) -> float:
+        """
+        Returns the cost in the unit of the schedule.
+        """
+        cost = (
+            self.hashes * schedule.per_hash
+            + self.field_mults * schedule.per_field_mult
+            + self.proof_size_bits / 8 * schedule.per_proof_byte
+        )
+        return cost + schedule.fixed if include_fixed else cost
+
+
+def _get_num_hashes(num_bits: int, hash_rate_bits: int) -> int:
+    return math.ceil(num_bits / hash_rate_bits)
+
+
+def get_verifier_cost_affine(params: zkEVMParams, hash_rate_bits: int = 512) -> tuple[VerifierCost, VerifierCost]:
+    """
+    Returns the work of the verifier that does not depend on the number of queries,
+    and the work per query. The total is `fixed + num_queries * per_query`.
+    """
+    ext = int(params.field_extension_degree)
+    ext_mult = ext ** 2
+    layers = get_FRI_layers(
+        num_functions=params.num_polys,
+        witness_size=int(params.D),
+        field_extension_degree=ext,
+        early_stop_degree=int(params.FRI_early_stop_degree),
+        folding_factor=int(params.FRI_folding_factor),
+    )
+    roots_bits, opening_bits = get_FRI_roots_and_opening_size_bits(
+        hash_size_bits=params.hash_size_bits,
+        field_size_bits=params.field_size_bits,
+        num_functions=params.num_polys,
+        witness_size=int(params.D),
+        field_extension_degree=ext,
+        early_stop_degree=int(params.FRI_early_stop_degree),
+        folding_factor=int(params.FRI_folding_factor),
+    )
+
+    # Per query, and per layer: hash the opened leaf and its sibling leaf (see `get_size_of_merkle_path_bits`),
+    # and then hash up to the root, with one compression per level of the tree
+    query_hashes = 0
+    for num_leafs, tuple_size in layers:
+        leaf_hashes = _get_num_hashes(tuple_size * params.field_size_bits, hash_rate_bits)
+        query_hashes += 2 * leaf_hashes + math.ceil(math.log2(num_leafs))
+
+    # Per query: the DEEP quotient of every polynomial, one folding step per layer
+    # (interpolating FRI_folding_factor values), and the final polynomial via Horner
+    query_field_mults = (
+        2 * params.num_polys * ext_mult
+        + len(layers) * params.FRI_folding_factor * ext_mult
+        + params.FRI_early_stop_degree * ext_mult
+    )
+
+    # Once: absorb the roots and the out-of-domain evaluations into the transcript,
+    # check the grinding nonces (one per round with grinding), and evaluate the constraints (ALI)
+    transcript_bits = roots_bits + params.num_polys * params.field_size_bits
+    grinding_checks = (
+        (params.grinding_batching_phase > 0)
+        + (params.grinding_commit_phase > 0) * params.FRI_rounds_n
+        + (params.grinding_query_phase > 0)
+    )
+    fixed_hashes = _get_num_hashes(transcript_bits, hash_rate_bits) + grinding_checks
+    fixed_field_mults = params.num_columns * params.AIR_max_degree * ext_mult
+
+    fixed = VerifierCost(fixed_hashes, fixed_field_mults, roots_bits)
+    per_query = VerifierCost(query_hashes, query_field_mults, opening_bits)
+    return fixed, per_query
+
+
+def get_verifier_cost(params: zkEVMParams, hash_rate_bits: int = 512) -> VerifierCost:
+    """
+    Returns the work of the verifier for the given zkEVM.
+    """
+    fixed, per_query = get_verifier_cost_affine(params, hash_rate_bits)
+    return fixed + per_query.scaled(params.num_queries)
+
+
+def get_verifier_gas(params: zkEVMParams, schedule: CostSchedule = EVM_GAS) -> float:
+    """
+    Returns the cost of verifying a proof of the given zkEVM, in the unit of the schedule.
+    """
+    return get_verifier_cost(params, schedule.hash_rate_bits).get_cost(schedule)
@@ -0,0 +1,178 @@
+"""
+Incremental re-evaluation of a single zkEVM config, for what-if edits.
+
+The results for a config are computed as a set of nodes (e.g. the batching level
+of JBR, or the proof size). While a node is computed, we record which zkEVMConfig
+fields it reads. After an edit, only the nodes that read one of the edited
+fields are computed again.
+
+Regimes that choose internal parameters (e.g. m in JBR when optimizing it) get an
+extra node for those. Their other nodes are computed with the parameters fixed,
+and depend on the parameters node instead of on the inputs of the optimization.
+"""
+
+from __future__ import annotations
+
+import dataclasses
+from typing import Any, Callable, Optional
+
+from .common.utils import get_DEEP_ALI_errors
+from .regimes.best_attack import best_attack_security
+from .zkevms.zkevm import zkEVMConfig, zkEVMParams
+
+
+class _RecordingParams:
+    """
+    Wraps `zkEVMParams` and records the name of every attribute that is read.
+    """
+
+    def __init__(self, params: zkEVMParams, read_names: set[str]):
+        self._params = params
+        self._read_names = read_names
+
+    def __getattr__(self, name: str):
+        self._read_names.add(name)
+        return getattr(self._params, name)
+
+
+def _get_config_fields(names: set[str]) -> frozenset[str]:
+    """
+    Map attribute names of `zkEVMParams` to the zkEVMConfig fields they are derived from.
+    """
+    return frozenset().union(*(zkEVMParams.DERIVED_FROM.get(name, (name,)) for name in names))
+
+
+@dataclasses.dataclass
+class _Node:
+    compute: Callable[[Any], Any]
+    # The identifier of the regime that the node belongs to, if any
+    rid: Optional[str] = None
+    value: Any = None
+    # What the last computation read: zkEVMConfig fields, and labels of other nodes
+    depends_on: frozenset[str] = frozenset()
+
+
+class IncrementalEvaluator:
+    """
+    Holds the results for one config (as in `compute_security_for_zkevm`), and keeps
+    them up to date under edits of the config via `update`.
+
+    Example:
+
+        evaluator = IncrementalEvaluator(ZiskPreset.default().cfg, regimes)
+        evaluator.update(num_queries=100)
+        evaluator.results["JBR"]["total"]
+
+    Regimes must be deterministic functions of the params, and read the same
+    attributes of the params for every config. This holds for all regimes in
+    this repository, as their formulas do not branch on the parameters.
+    """
+
+    def __init__(self, cfg: zkEVMConfig, regimes: list):
+        self.cfg = cfg
+        self.regimes = {regime.identifier(): regime for regime in regimes}
+        self.params = zkEVMParams(cfg)
+        # Labels of the nodes that were computed by the last call to `__init__` or `update`
+        self.last_recomputed: list[str] = []
+
+        # The regimes with their internal parameters fixed to the current ones
+        self._fixed_regimes = dict(self.regimes)
+        # The assembled results, per regime identifier
+        self._results: dict[str, dict] = {}
+
+        # Nodes are listed such that every node comes after the ones it can depend on.
+        # The nodes of a regime are called with the regime with fixed parameters.
+        self._nodes: dict[str, _Node] = {}
+        for rid, regime in self.regimes.items():
+            self._nodes[f"{rid}/parameters"] = _Node(regime.get_regime_parameters)
+            self._nodes[f"{rid}/batching"] = _Node(type(regime).get_batching_levels, rid)
+            self._nodes[f"{rid}/commit"] = _Node(type(regime).get_commit_levels, rid)
+            self._nodes[f"{rid}/query"] = _Node(type(regime).get_query_phase_levels, rid)
+            self._nodes[f"{rid}/proof system"] = _Node(
+                lambda regime, params: get_DEEP_ALI_errors(regime.get_bound_on_list_size(params), params), rid
+            )
+        self._nodes["best attack"] = _Node(best_attack_security)
+        self._nodes["proof size"] = _Node(lambda params: params.proof_size_bits)
+
+        self._evaluate(self.params, set(), everything=True)
+
+    def update(self, **changes) -> dict[str, dict]:
+        """
+        Apply the given changes to the config, recompute what depends on them,
+        and return the new results.
+
+        If a regime rejects the new config (i.e., one of its sanity checks fails),
+        the AssertionError propagates and the evaluator keeps its previous state.
+        """
+        cfg = dataclasses.replace(self.cfg, **changes)
+        changed = {name for name in changes if getattr(cfg, name) != getattr(self.cfg, name)}
+        params = zkEVMParams(cfg)
+        self._evaluate(params, changed)
+        self.cfg = cfg
+        self.params = params
+        return self.results
+
+    @property
+    def proof_size_bits(self) -> int:
+        return self._nodes["proof size"].value
+
+    @property
+    def results(self) -> dict[str, dict]:
+        """
+        The results for the current config, as returned by `compute_security_for_zkevm`.
+        """
+        results: dict[str, dict] = {}
+        for rid in self.regimes:
+            if rid not in self._results:
+                self._results[rid] = self._assemble_levels(rid)
+            results[rid] = self._results[rid]
+        results["best attack"] = self._nodes["best attack"].value
+        return results
+
+    def _evaluate(self, params: zkEVMParams, changed: set[str], everything: bool = False) -> None:
+        """
+        Recompute the nodes that depend on something in `changed` (or all nodes).
+        The label of a parameters node whose value changes is added to `changed`.
+
+        Nothing is modified before all nodes have been computed successfully.
+        """
+        values: dict[str, tuple[Any, frozenset[str]]] = {}
+        fixed_regimes = dict(self._fixed_regimes)
+        for label, node in self._nodes.items():
+            if not (everything or node.depends_on & changed):
+                continue
+            # The formulas read the same attributes for every config, so we only
+            # need to record what a node reads the first time it is computed
+            read_names: Optional[set[str]] = set() if everything else None
+            node_params = params if read_names is None else _RecordingParams(params, read_names)
+            if node.rid is None:
+                value = node.compute(node_params)
+            else:
+                value = node.compute(fixed_regimes[node.rid], node_params)
+            depends_on = node.depends_on if read_names is None else _get_config_fields(read_names)
+
+            if label.endswith("/parameters"):
+                rid = label.split("/")[0]
+                fixed_regimes[rid] = self.regimes[rid].with_regime_parameters(value)
+                if value != node.value:
+                    changed.add(label)
+            elif node.rid is not None and fixed_regimes[node.rid] is not self.regimes[node.rid]:
+                depends_on |= {f"{node.rid}/parameters"}
+            values[label] = (value, depends_on)
+
+        for label, (value, depends_on) in values.items():
+            self._nodes[label].value, self._nodes[label].depends_on = value, depends_on
+            self._results.pop(label.split("/")[0], None)
+        self._fixed_regimes = fixed_regimes
+        self.last_recomputed = list(values)
+
+    def _assemble_levels(self, rid: str) -> dict:
+        # same as `get_rbr_levels_for_zkevm_and_regime`, but from the nodes
+        fri_levels = (
+            self._nodes[f"{rid}/batching"].value
+            | self._nodes[f"{rid}/commit"].value
+            | self._nodes[f"{rid}/query"].value
+        )
+        proof_system_levels = self._nodes[f"{rid}/proof system"].value
+        total = min(list(fri_levels.values()) + list(proof_system_levels.values()))
+        return fri_levels | proof_system_levels | {"total": total} | self._nodes[f"{rid}/parameters"].value
@@ -0,0 +1,304 @@
+"""
+Models of low-degree tests that shift the evaluation domain, in the style of STIR
+(https://eprint.iacr.org/2024/390) and WHIR (https://eprint.iacr.org/2024/1586).
+
+Like FRI, these tests fold the committed function by a factor k per round. Unlike
+FRI, each round commits to the folded function over a domain that is only half as
+large, instead of k times smaller. The rate therefore improves by a factor k/2 per
+round, and later rounds need fewer queries for the same security:
+
+    degree_i = degree_0 / k^i,    domain_i = domain_0 / 2^i,    rho_i = rho_0 * (2/k)^i
+
+Each round i >= 1 consists of
+- the folding of the previous function (STIR), or log2(k) sumcheck rounds (WHIR),
+- out-of-domain (OOD) samples, which bound the list of codewords to one in the
+  list decoding regimes (none are needed in the unique decoding regime),
+- the queries into the previous function, that check it against the new one ("shift").
+After the last round, the prover sends the final polynomial in the clear, and the
+verifier makes the final queries.
+
+The proximity parameter, the list size, the batching error and the folding error of
+each round come from a decoding regime (e.g. UDR or JBR), applied to the parameters
+of that round (see `_get_round_params`). The number of queries of each round is the
+smallest one that reaches the target security (see `get_FRI_num_queries_for_level`),
+and the number of OOD samples the smallest one that keeps their error below it.
+
+Both protocols allow a different proximity parameter per round. If the regime chooses
+its own parameters (e.g. m in JBR with `optimize_m`), each round therefore takes the
+largest proximity whose folding error still reaches the target (see `get_round_regime`).
+Since the folding errors of STIR and WHIR differ, so do their proximities and queries.
+For a fixed proximity, both need the same queries per round, as in the WHIR paper.
+
+The proof size follows the conventions of `get_FRI_proof_size_bits`: one Merkle root
+per committed function, and per query the leaf, its sibling and the path.
+"""
+
+from __future__ import annotations
+
+import dataclasses
+import itertools
+import math
+from dataclasses import dataclass
+from typing import Optional
+
+from ..common.arrays import logaddexp2
+from ..common.fri import (
+    get_FRI_num_queries_for_level,
+    get_FRI_query_phase_log2_error,
+    get_size_of_merkle_path_bits,
+)
+from ..common.utils import get_bits_of_security_from_log2_error, get_DEEP_ALI_errors
+from ..zkevms.zkevm import zkEVMParams
+
+
+@dataclass(frozen=True)
+class LDTRound:
+    """
+    One committed function of a low-degree test, and the queries into it.
+    """
+    degree: int
+    domain_size: int
+    rho: float
+    # The proximity parameter of the decoding regime for this function
+    theta: float
+    # The internal parameters of the regime that were chosen for this function (see `get_round_regime`)
+    regime_parameters: dict[str, float]
+    # The queries into this function, made in the next round (or at the end, for the last function)
+    num_queries: int
+    # Out-of-domain samples of this function (none for the initial function)
+    num_ood_samples: int
+    # The Merkle tree of the function, as in `get_FRI_layers`
+    num_leafs: int
+    tuple_size: int
+
+
+@dataclass(frozen=True)
+class LDTAnalysis:
+    """
+    The rounds, the round-by-round levels and the proof size of a low-degree test for one config.
+    """
+    protocol: str
+    regime: str
+    target_bits: int
+    rounds: list[LDTRound]
+    # Round-by-round levels (and their minimum as "total"), including ALI and DEEP
+    levels: dict[str, int]
+    proof_size_bits: int
+
+    @property
+    def num_queries(self) -> int:
+        """
+        The number of queries over all rounds, each of which opens one Merkle path.
+        """
+        return sum(r.num_queries for r in self.rounds)
+
+
+class DomainShiftingLDT:
+    """
+    The shared round structure of STIR- and WHIR-style low-degree tests (see the module docs).
+    Subclasses provide the folding error, and the messages of a round that STIR and WHIR do not share.
+    """
+
+    def __init__(self, folding_factor: Optional[int] = None):
+        # Defaults to the FRI folding factor of the config
+        self.folding_factor = folding_factor
+
+    def identifier(self) -> str:
+        raise NotImplementedError
+
+    def get_fold_log2_error(self, regime, round_params: zkEVMParams, list_size: float) -> float:
+        """
+        Returns log2 of the error of reducing the function of `round_params` to its fold.
+        """
+        raise NotImplementedError
+
+    def get_ood_log2_error(self, list_size: float, degree: int, num_samples: int, log2_F: float) -> float:
+        """
+        Returns log2 of the error of `num_samples` OOD samples of a function of the given degree.
+
+        Two of the at most `list_size` codewords agree on a random point with probability at most
+        degree/|F|, so this is list_size^2/2 * (degree/|F|)^num_samples.
+        """
+        return 2 * math.log2(list_size) - 1 + num_samples * (math.log2(degree) - log2_F)
+
+    def get_round_message_bits(self, params: zkEVMParams, folding_factor: int) -> int:
+        """
+        Returns the size of the messages of one folding round besides the commitment, the OOD answers
+        and the queries.
+        """
+        return 0
+
+    def _get_round_params(self, params: zkEVMParams, degree: int, domain_size: int, folding_factor: int) -> zkEVMParams:
+        # The parameters of a single folded function of the given degree and domain, for the regimes
+        return zkEVMParams(dataclasses.replace(
+            params.cfg,
+            trace_length=degree,
+            rho=degree / domain_size,
+            num_columns=1,
+            num_polys=1,
+            FRI_folding_factor=folding_factor,
+        ))
+
+    def _get_num_ood_samples(self, list_size: float, degree: int, target_bits: int, log2_F: float) -> int:
+        # The smallest number of samples with an error of at most 2^-target_bits
+        if list_size <= 1:
+            return 0
+        num_samples = 1
+        while self.get_ood_log2_error(list_size, degree, num_samples, log2_F) > -target_bits:
+            num_samples += 1
+        return num_samples
+
+    def _get_num_queries(self, theta: float, target_bits: int, grinding_bits: int) -> int:
+        # The smallest number of queries whose error is at most 2^-target_bits
+        num_queries = get_FRI_num_queries_for_level(theta, target_bits, grinding_bits)
+        assert num_queries is not None
+        # The closed form may be off by one due to rounding
+        while get_bits_of_security_from_log2_error(
+            get_FRI_query_phase_log2_error(theta, num_queries, grinding_bits)
+        ) < target_bits:
+            num_queries += 1
+        return num_queries
+
+    def get_round_regime(
+        self,
+        regime,
+        params: zkEVMParams,
+        round_params: zkEVMParams,
+        target_bits: int,
+        is_first: bool,
+        is_last: bool,
+    ) -> tuple[object, dict[str, float]]:
+        """
+        Returns the regime for the proximity parameter of one function, and the internal
+        parameters that were chosen for it.
+
+        If the regime chooses its own parameters (see `FRIRegime.get_regime_parameter_candidates`),
+        this is the candidate with the largest proximity, and hence the fewest queries, whose other
+        errors still reach the target: the folding of the function (unless it is the last one),
+        and the batching, ALI and DEEP for the initial function. If no candidate reaches the target,
+        this is the one that comes closest. Otherwise, it is the given regime.
+        """
+        candidates = regime.get_regime_parameter_candidates()
+        if not candidates:
+            return regime, {}
+        best = None
+        for values in itertools.product(*candidates.values()):
+            choice = dict(zip(candidates, values))
+            round_regime = regime.with_regime_parameters(choice)
+            try:
+                list_size = round_regime.get_bound_on_list_size(round_params)
+            except AssertionError:
+                continue
+            levels = []
+            if not is_last:
+                levels.append(get_bits_of_security_from_log2_error(
+                    self.get_fold_log2_error(round_regime, round_params, list_size) - params.grinding_commit_phase
+                ))
+            if is_first:
+                levels.append(get_bits_of_security_from_log2_error(
+                    round_regime.get_batching_log2_error(params) - params.grinding_batching_phase
+                ))
+                levels += get_DEEP_ALI_errors(round_regime.get_bound_on_list_size(params), params).values()
+            key = (min(levels + [target_bits]), round_regime.get_theta(round_params))
+            if best is None or key > best[0]:
+                best = (key, round_regime, choice)
+        if best is None:
+            # No candidate applies, so the regime fails its sanity checks on its own
+            return regime, {}
+        return best[1], best[2]
+
+    def analyze(self, params: zkEVMParams, regime, target_bits: int) -> LDTAnalysis:
+        """
+        Analyze the low-degree test for the given zkEVM, with the proximity, the number of queries
+        and the OOD samples of every round chosen to reach `target_bits` in the given regime.
+
+        Raises an AssertionError if the regime does not apply to the parameters of some round.
+        """
+        k = self.folding_factor or params.FRI_folding_factor
+        grinding_bits = params.grinding_query_phase
+        log2_F = params.log2_F
+
+        # The committed functions, until the degree reaches the early stop degree
+        degree, domain_size = params.trace_length, int(params.D)
+        functions = [(degree, domain_size)]
+        while degree // k >= params.FRI_early_stop_degree:
+            degree, domain_size = degree // k, domain_size // 2
+            functions.append((degree, domain_size))
+
+        rounds = []
+        log2_errors = {}
+        previous = None
+        for i, (degree, domain_size) in enumerate(functions):
+            round_params = self._get_round_params(params, degree, domain_size, k)
+            round_regime, regime_parameters = self.get_round_regime(
+                regime, params, round_params, target_bits, is_first=i == 0, is_last=i == len(functions) - 1
+            )
+            theta = round_regime.get_theta(round_params)
+            num_queries = self._get_num_queries(theta, target_bits, grinding_bits)
+            num_ood_samples = 0
+            if i == 0:
+                initial_regime = round_regime
+                list_size = round_regime.get_bound_on_list_size(params)
+                log2_errors["batching"] = round_regime.get_batching_log2_error(params) - params.grinding_batching_phase
+            else:
+                round_list_size = round_regime.get_bound_on_list_size(round_params)
+                num_ood_samples = self._get_num_ood_samples(round_list_size, degree, target_bits, log2_F)
+                previous_regime, previous_params, previous_round = previous
+                log2_errors[f"round {i} fold"] = (
+                    self.get_fold_log2_error(previous_regime, previous_params, list_size) - params.grinding_commit_phase
+                )
+                if num_ood_samples:
+                    log2_errors[f"round {i} OOD"] = self.get_ood_log2_error(
+                        round_list_size, degree, num_ood_samples, log2_F
+                    )
+                # The queries into the previous function, and the combination of their answers with the OOD answers
+                log2_errors[f"round {i} shift"] = logaddexp2(
+                    get_FRI_query_phase_log2_error(previous_round.theta, previous_round.num_queries, grinding_bits),
+                    math.log2(round_list_size * (previous_round.num_queries + num_ood_samples)) - log2_F,
+                )
+                list_size = round_list_size
+
+            # The initial tree has all batched functions in a leaf, as in `get_FRI_layers`
+            tuple_size = params.num_polys if i == 0 else k
+            rounds.append(LDTRound(
+                degree=degree,
+                domain_size=domain_size,
+                rho=degree / domain_size,
+                theta=theta,
+                regime_parameters=regime_parameters,
+                num_queries=num_queries,
+                num_ood_samples=num_ood_samples,
+                num_leafs=domain_size // k,
+                tuple_size=tuple_size,
+            ))
+            previous = (round_regime, round_params, rounds[-1])
+
+        log2_errors["final queries"] = get_FRI_query_phase_log2_error(
+            rounds[-1].theta, rounds[-1].num_queries, grinding_bits
+        )
+
+        levels = {label: get_bits_of_security_from_log2_error(e) for label, e in log2_errors.items()}
+        levels |= get_DEEP_ALI_errors(initial_regime.get_bound_on_list_size(params), params)
+        levels["total"] = min(levels.values())
+
+        return LDTAnalysis(
+            protocol=self.identifier(),
+            regime=regime.identifier(),
+            target_bits=target_bits,
+            rounds=rounds,
+            levels=levels,
+            proof_size_bits=self._get_proof_size_bits(params, rounds, k),
+        )
+
+    def _get_proof_size_bits(self, params: zkEVMParams, rounds: list[LDTRound], folding_factor: int) -> int:
+        bits = 0
+        for r in rounds:
+            bits += params.hash_size_bits
+            bits += r.num_ood_samples * params.field_size_bits
+            bits += r.num_queries * get_size_of_merkle_path_bits(
+                r.num_leafs, r.tuple_size, params.field_size_bits, params.hash_size_bits
+            )
+        bits += (len(rounds) - 1) * self.get_round_message_bits(params, folding_factor)
+        # The final polynomial, in the clear
+        bits += rounds[-1].degree * params.field_size_bits
+        return bits
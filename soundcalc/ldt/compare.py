@@ -0,0 +1,127 @@
+"""
+Compare FRI with other low-degree tests (e.g. STIR and WHIR) at the same security.
+
+The target is the total level of the preset with FRI in the given regime, unless
+given explicitly. FRI then gets the smallest number of queries that reaches it (see
+`solve_num_queries`), and the other tests the smallest number of queries per round
+(see `DomainShiftingLDT.analyze`). Every test is reported with its queries, the
+Merkle paths that they open, and its proof size.
+"""
+
+from __future__ import annotations
+
+import dataclasses
+from dataclasses import dataclass
+from typing import Optional, Sequence
+
+from ..common.fri import get_FRI_layers
+from ..common.utils import KIB
+from ..security import get_rbr_levels_for_zkevm_and_regime
+from ..solver import solve_num_queries
+from ..zkevms.zkevm import zkEVMParams
+
+
+@dataclass(frozen=True)
+class LDTSummary:
+    """
+    The queries and proof size of one low-degree test at the target of a comparison.
+    """
+    protocol: str
+    # The queries per round. FRI has a single round of queries, each of which opens every layer.
+    queries_per_round: tuple[int, ...]
+    # The number of Merkle paths that the queries open
+    num_openings: int
+    proof_size_bits: int
+    # The total level, including ALI and DEEP. Below the target if the test cannot reach it.
+    total: int
+
+
+@dataclass(frozen=True)
+class LDTComparison:
+    name: str
+    regime: str
+    target_bits: int
+    # FRI first, then the other tests in the given order. FRI is None if the regime does not
+    # apply to its parameters, or if no number of queries reaches the target. The other tests
+    # are None if the regime does not apply to the parameters of some round.
+    summaries: dict[str, Optional[LDTSummary]]
+
+
+def _get_FRI_summary(params: zkEVMParams, regime, target_bits: int) -> Optional[LDTSummary]:
+    solution = solve_num_queries(params, regime, target_bits)
+    if solution is None:
+        return None
+    params = zkEVMParams(dataclasses.replace(params.cfg, num_queries=solution.num_queries))
+    layers = get_FRI_layers(
+        num_functions=params.num_polys,
+        witness_size=int(params.D),
+        field_extension_degree=int(params.field_extension_degree),
+        early_stop_degree=int(params.FRI_early_stop_degree),
+        folding_factor=int(params.FRI_folding_factor),
+    )
+    return LDTSummary(
+        protocol="FRI",
+        queries_per_round=(solution.num_queries,),
+        num_openings=solution.num_queries * len(layers),
+        proof_size_bits=params.proof_size_bits,
+        total=solution.levels["total"],
+    )
+
+
+def compare_low_degree_tests(
+    params: zkEVMParams,
+    regime,
+    low_degree_tests: Sequence,
+    target_bits: Optional[int] = None,
+) -> LDTComparison:
+    """
+    Compare FRI with the given low-degree tests for the given zkEVM, at `target_bits`
+    (default: the total level of `params` with FRI in the regime).
+    """
+    if target_bits is None:
+        target_bits = get_rbr_levels_for_zkevm_and_regime(regime, params)["total"]
+
+    summaries: dict[str, Optional[LDTSummary]] = {"FRI": _get_FRI_summary(params, regime, target_bits)}
+    for ldt in low_degree_tests:
+        try:
+            analysis = ldt.analyze(params, regime, target_bits)
+        except AssertionError:
+            summaries[ldt.identifier()] = None
+            continue
+        summaries[ldt.identifier()] = LDTSummary(
+            protocol=analysis.protocol,
+            queries_per_round=tuple(r.num_queries for r in analysis.rounds),
+            num_openings=analysis.num_queries,
+            proof_size_bits=analysis.proof_size_bits,
+            total=analysis.levels["total"],
+        )
+    return LDTComparison(params.name, regime.identifier(), target_bits, summaries)
+
+
+def format_ldt_comparison(comparison: LDTComparison) -> str:
+    """
+    Format a comparison as a table, with the savings relative to FRI.
+
+    Tests that cannot reach the target are marked, with the level that they reach instead,
+    and are not compared with FRI.
+    """
+    lines = [f"{comparison.name} in {comparison.regime}, at {comparison.target_bits} bits:"]
+    fri = comparison.summaries["FRI"]
+    for protocol, summary in comparison.summaries.items():
+        if summary is None:
+            lines.append(f"    {protocol:<5} —")
+            continue
+        line = (
+            f"    {protocol:<5} queries={sum(summary.queries_per_round):<4} "
+            f"openings={summary.num_openings:<5} proof size={summary.proof_size_bits / KIB:7.1f} KiB "
+            f"total={summary.total}"
+        )
+        if summary.total < comparison.target_bits:
+            line += f" (cannot reach {comparison.target_bits} bits)"
+        elif fri is not None and summary is not fri:
+            saved = 1 - summary.proof_size_bits / fri.proof_size_bits
+            line += f" ({fri.num_openings - summary.num_openings} fewer openings, {saved:.0%} smaller)"
+        if len(summary.queries_per_round) > 1:
+            line += f" per round: {', '.join(map(str, summary.queries_per_round))}"
+        lines.append(line)
+    return "\n".join(lines)
@@ -0,0 +1,21 @@
+"""
+A model of STIR (https://eprint.iacr.org/2024/390), see the base module.
+"""
+
+from __future__ import annotations
+
+from ..zkevms.zkevm import zkEVMParams
+from .base import DomainShiftingLDT
+
+
+class STIR(DomainShiftingLDT):
+    """
+    STIR folds the previous function by the folding factor in one step, as in FRI.
+    """
+
+    def identifier(self) -> str:
+        return "STIR"
+
+    def get_fold_log2_error(self, regime, round_params: zkEVMParams, list_size: float) -> float:
+        # The proximity gap of one folding step of FRI, over the domain and rate of the folded function
+        return regime.get_commit_phase_log2_error(round_params)
@@ -0,0 +1,36 @@
+"""
+A model of WHIR (https://eprint.iacr.org/2024/1586), see the base module.
+"""
+
+from __future__ import annotations
+
+import dataclasses
+import math
+
+from ..common.arrays import logaddexp2
+from ..zkevms.zkevm import zkEVMParams
+from .base import DomainShiftingLDT
+
+
+class WHIR(DomainShiftingLDT):
+    """
+    WHIR folds the previous function one variable at a time, with one sumcheck round per
+    variable, i.e., log2(k) rounds that each fold by 2.
+    """
+
+    def identifier(self) -> str:
+        return "WHIR"
+
+    def get_fold_log2_error(self, regime, round_params: zkEVMParams, list_size: float) -> float:
+        # Each sumcheck round has the proximity gap of folding by 2, plus the error of the sumcheck
+        # itself for each of the `list_size` codewords, i.e., list_size * 2 / |F| for the quadratic
+        # round polynomial. All rounds have the same error, so this is the one of every round.
+        binary_params = zkEVMParams(dataclasses.replace(round_params.cfg, FRI_folding_factor=2))
+        return logaddexp2(
+            regime.get_commit_phase_log2_error(binary_params),
+            math.log2(list_size) + 1 - round_params.log2_F,
+        )
+
+    def get_round_message_bits(self, params: zkEVMParams, folding_factor: int) -> int:
+        # One quadratic polynomial per sumcheck round, i.e., three elements of the extension field
+        return int(math.log2(folding_factor)) * 3 * params.field_size_bits
@@ -1,54 +1,28 @@
 from __future__ import annotations
-import json
+import argparse
+from typing import Optional
 
-from soundcalc.common.utils import KIB, get_DEEP_ALI_errors
-from soundcalc.regimes.best_attack import best_attack_security
-from soundcalc.zkevms.risc0 import Risc0Preset
-from soundcalc.zkevms.miden import MidenPreset
-from soundcalc.zkevms.zisk import ZiskPreset
-from soundcalc.regimes.johnson_bound import JohnsonBoundRegime
-from soundcalc.regimes.unique_decoding import UniqueDecodingRegime
-from soundcalc.report import build_markdown_report
+from soundcalc import profiling
+from soundcalc.common.utils import KIB
+# Presets and regimes that can be selected from the command line. They are
+# imported on first use (see the registry module), so only import them from there.
+from soundcalc.registry import LOW_DEGREE_TESTS, PRESETS, REGIMES
+# The evaluation lives in the security module. These two used to be defined here, and are re-exported for existing callers
+from soundcalc.security import compute_security_for_zkevm, get_rbr_levels_for_zkevm_and_regime
 
 
-def get_rbr_levels_for_zkevm_and_regime(regime, params) -> dict[str, int]:
-
-    # the round-by-round errors consist of the ones for FRI and for the proof system
-    # and we also add a total, which is the minimum over all of them.
-
-    fri_levels = regime.get_rbr_levels(params)
-    list_size = regime.get_bound_on_list_size(params)
-
-    proof_system_levels = get_DEEP_ALI_errors(list_size, params)
-
-    total = min(list(fri_levels.values()) + list(proof_system_levels.values()))
-
-    return fri_levels | proof_system_levels | {"total": total}
-
-
-
-def compute_security_for_zkevm(fri_regimes: list, params) -> dict[str, dict]:
-    """
-    Compute bits of security for a single zkEVM across all security regimes.
-    """
-    results: dict[str, dict] = {}
-
-    # first all reasonable regimes
-    for fri_regime in fri_regimes:
-        rbr_errors = get_rbr_levels_for_zkevm_and_regime(fri_regime, params)
-        results[fri_regime.identifier()] = rbr_errors
-
-    # now the security based on the best known attack - for reference
-    results["best attack"] = best_attack_security(params)
-
-    return results
+# The presets and regimes of the markdown report
+REPORT_PRESETS = ("zisk", "miden", "risc0")
+REPORT_REGIMES = ("UDR", "JBR")
 
 
 def generate_and_save_md_report(sections) -> None:
     """
     Generate markdown report and save it to disk.
     """
-    md = build_markdown_report(sections)
+    from soundcalc.report import build_markdown_report
+
+    md = profiling.call("report", build_markdown_report, sections)
     md_path = "results.md"
 
     with open(md_path, "w", encoding="utf-8") as f:
@@ -61,43 +35,617 @@ def print_summary_for_zkevm(zkevm_params, results: dict[str, dict]) -> None:
     """
     Print a summary of security results for a single zkEVM.
     """
+    import json
+    from soundcalc.costs.verifier import EVM_GAS, get_verifier_gas
+
     print(f"zkEVM: {zkevm_params.name}")
     proof_size_kib = zkevm_params.proof_size_bits // KIB
     print(f"    proof size estimate: {proof_size_kib} KiB, where 1 KiB = 1024 bytes")
+    print(f"    verifier cost estimate: {get_verifier_gas(zkevm_params, EVM_GAS):,.0f} {EVM_GAS.unit} ({EVM_GAS.name})")
     print(json.dumps(results, indent=4))
     print("")
     print("")
 
 
-def main() -> None:
+def generate_report(cache_path: Optional[str] = None) -> None:
     """
-    Main entry point for soundcalc
-
     Analyze multiple zkEVMs across different security regimes,
     generate reports, and save results to disk.
+
+    With `cache_path`, results are read from (and added to) the persistent cache there.
     """
     # Data structure for compiling the markdown report
     sections = {}
 
-    zkevms = [
-        ZiskPreset.default(),
-        MidenPreset.default(),
-        Risc0Preset.default(),
-    ]
+    zkevms = [PRESETS[name].default() for name in REPORT_PRESETS]
 
-    security_regimes = [
-        UniqueDecodingRegime(),
-        JohnsonBoundRegime(),
-    ]
+    security_regimes = [REGIMES[identifier]() for identifier in REPORT_REGIMES]
+
+    cache = None
+    if cache_path is not None:
+        from soundcalc.cache import ResultCache
+        cache = ResultCache(cache_path)
 
     # Analyze each zkEVM across all security regimes
     for zkevm_params in zkevms:
-        results = compute_security_for_zkevm(security_regimes, zkevm_params)
+        if cache is None:
+            results = profiling.call(zkevm_params.name, compute_security_for_zkevm, security_regimes, zkevm_params)
+        else:
+            from soundcalc.cache import compute_security_for_zkevm_cached
+            results = profiling.call(
+                zkevm_params.name, compute_security_for_zkevm_cached, cache, security_regimes, zkevm_params
+            )
         print_summary_for_zkevm(zkevm_params, results)
         sections[zkevm_params.name] = (zkevm_params, results)
 
+    if cache is not None:
+        cache.close()
+
     # Generate and save markdown report
     generate_and_save_md_report(sections)
 
+
+def get_machine_profile(args: argparse.Namespace):
+    """
+    Returns the machine profile for prover time estimates, from --machine or the default one.
+    """
+    from soundcalc.costs.prover import DEFAULT_MACHINE, load_machine_profile
+
+    if args.machine is None:
+        return DEFAULT_MACHINE
+    return load_machine_profile(args.machine)
+
+
+def get_cost_schedule(args: argparse.Namespace):
+    """
+    Returns the cost schedule for verifier cost estimates, from --verifier-schedule or the EVM one.
+    """
+    from soundcalc.costs.verifier import EVM_GAS, load_cost_schedule
+
+    if args.verifier_schedule is None:
+        return EVM_GAS
+    return load_cost_schedule(args.verifier_schedule)
+
+
+def run_sweep_command(args: argparse.Namespace) -> None:
+    """
+    Sweep over variants of a preset and print one line per evaluated config.
+    """
+    from soundcalc.sweep import iter_sweep_configs, run_sweep, format_sweep_result
+
+    base = PRESETS[args.preset].default().cfg
+    axes = {}
+    for name, option in SWEEP_OPTIONS.items():
+        values = getattr(args, option)
+        if values is not None:
+            axes[name] = values
+
+    regimes = [REGIMES[identifier]() for identifier in args.regimes]
+    configs = iter_sweep_configs(base, axes)
+    results = run_sweep(configs, regimes, max_workers=args.workers, chunk_size=args.chunk_size)
+
+    if args.output is None:
+        machine = get_machine_profile(args)
+        schedule = get_cost_schedule(args)
+        for result in results:
+            print(format_sweep_result(result, list(axes), machine, schedule))
+        return
+
+    # Stream the results to disk instead
+    from soundcalc.sinks import open_sink
+
+    num_results = 0
+    with open_sink(args.output, regimes, args.format) as sink:
+        for result in results:
+            sink.write(result)
+            num_results += 1
+    print(f"wrote :: {args.output} ({num_results} configs)")
+
+
+def run_catalog_command(args: argparse.Namespace) -> None:
+    """
+    Evaluate all configs of the given catalogs, and print or stream the results.
+    """
+    import sys
+    from soundcalc.catalog import CatalogError, iter_catalogs
+    from soundcalc.sweep import run_sweep, format_sweep_result
+
+    regimes = [REGIMES[identifier]() for identifier in args.regimes]
+    errors = [] if args.skip_invalid else None
+    configs = iter_catalogs(args.paths, errors)
+    results = run_sweep(configs, regimes, max_workers=args.workers, chunk_size=args.chunk_size)
+
+    try:
+        if args.output is None:
+            machine = get_machine_profile(args)
+            schedule = get_cost_schedule(args)
+            for result in results:
+                print(format_sweep_result(result, ["name"], machine, schedule))
+        else:
+            from soundcalc.sinks import open_sink
+
+            num_results = 0
+            with open_sink(args.output, regimes, args.format) as sink:
+                for result in results:
+                    sink.write(result)
+                    num_results += 1
+            print(f"wrote :: {args.output} ({num_results} configs)")
+    except CatalogError as error:
+        sys.exit(f"invalid config :: {error} (use --skip-invalid to skip invalid configs)")
+
+    if errors:
+        for error in errors:
+            print(f"skipped :: {error}", file=sys.stderr)
+        print(f"skipped {len(errors)} invalid configs", file=sys.stderr)
+
+
+def run_solve_command(args: argparse.Namespace) -> None:
+    """
+    Print the smallest number of queries that meets the target security level.
+    """
+    from soundcalc.solver import solve_num_queries, solve_grinding_split, format_query_solution
+
+    params = PRESETS[args.preset].default()
+    regime = REGIMES[args.regime]()
+
+    if args.max_grinding is not None:
+        solutions = solve_grinding_split(params, regime, args.target, args.max_grinding)
+    else:
+        solution = solve_num_queries(params, regime, args.target, args.grinding)
+        solutions = [solution] if solution is not None else []
+
+    if not solutions:
+        print(f"the FRI query phase of {params.name} cannot reach {args.target} bits in {regime.identifier()}")
+    for solution in solutions:
+        print(format_query_solution(solution))
+
+
+def run_grinding_command(args: argparse.Namespace) -> None:
+    """
+    Print how to best distribute a budget of grinding across the rounds.
+    """
+    from soundcalc.solver import optimize_grinding, format_grinding_allocation
+
+    params = PRESETS[args.preset].default()
+    regime = REGIMES[args.regime]()
+    allocation = optimize_grinding(params, regime, args.budget)
+    print(f"zkEVM: {params.name} in {regime.identifier()}, with a budget of {args.budget:.4g} expected hashes")
+    print(format_grinding_allocation(allocation, get_machine_profile(args)))
+
+
+def run_multi_air_command(args: argparse.Namespace) -> None:
+    """
+    Print the aggregated security and the total proof size of a system with many AIRs.
+    """
+    import json
+    import sys
+    from soundcalc.catalog import CatalogError
+    from soundcalc.multi_air import MultiAIR, compute_security_for_multi_air_and_regimes
+
+    try:
+        multi_air = MultiAIR.from_catalog(args.path)
+    except CatalogError as error:
+        sys.exit(f"invalid config :: {error}")
+
+    regimes = [REGIMES[identifier]() for identifier in args.regimes]
+    results = compute_security_for_multi_air_and_regimes(regimes, multi_air, args.aggregation)
+    print(f"{multi_air.name}: {len(multi_air.instances)} AIRs, aggregated with {args.aggregation}")
+    print(f"    total proof size estimate: {multi_air.proof_size_bits // KIB} KiB, where 1 KiB = 1024 bytes")
+    if multi_air.invalid_instances:
+        print(f"    without the invalid instances: {', '.join(multi_air.invalid_instances)}")
+    print(json.dumps(results, indent=4))
+
+
+def run_pipeline_command(args: argparse.Namespace) -> None:
+    """
+    Print the per-stage and combined results of a recursive proof.
+    """
+    import json
+    import sys
+    from soundcalc.catalog import CatalogError
+    from soundcalc.recursion import Pipeline, PipelineEvaluator
+
+    try:
+        pipeline = Pipeline.from_catalog(args.path)
+    except CatalogError as error:
+        sys.exit(f"invalid config :: {error}")
+
+    regimes = [REGIMES[identifier]() for identifier in args.regimes]
+    machine = get_machine_profile(args)
+    result = PipelineEvaluator(regimes, machine, args.aggregation).evaluate(pipeline)
+    print(f"{pipeline.name}: {len(result.stages)} stages, on {machine.name}")
+    for index, stage in enumerate(result.stages, start=1):
+        if stage.proof_size_bits is None:
+            print(f"    stage {index} ({stage.config.name}): invalid config")
+            continue
+        print(f"    stage {index} ({stage.config.name}): proof size {stage.proof_size_bits // KIB} KiB, "
+              f"prover {stage.prover_seconds:.3g}s")
+        for identifier, levels in stage.results.items():
+            print(f"        {identifier}: {json.dumps(levels)}")
+    combined = " ".join(f"{identifier}={'—' if level is None else level}" for identifier, level in result.combined.items())
+    print(f"    combined ({args.aggregation}): {combined}")
+    print(f"    total prover time: {result.prover_seconds:.3g}s")
+    if result.proof_size_bits is not None:
+        print(f"    final proof size: {result.proof_size_bits // KIB} KiB, where 1 KiB = 1024 bytes")
+
+
+def run_ldt_command(args: argparse.Namespace) -> None:
+    """
+    Print the queries and proof size of FRI and of the other low-degree tests, at the same security.
+    """
+    import sys
+    from soundcalc.ldt.compare import compare_low_degree_tests, format_ldt_comparison
+
+    # Resolved here rather than with argparse choices, which would look up the plugins on every invocation
+    names = args.protocols or list(LOW_DEGREE_TESTS)
+    unknown = [name for name in names if name not in LOW_DEGREE_TESTS]
+    if unknown:
+        sys.exit(f"unknown low-degree tests {unknown}, choose from {list(LOW_DEGREE_TESTS)}")
+
+    params = PRESETS[args.preset].default()
+    low_degree_tests = [LOW_DEGREE_TESTS[name]() for name in names]
+    for identifier in args.regimes:
+        comparison = compare_low_degree_tests(params, REGIMES[identifier](), low_degree_tests, args.target)
+        print(format_ldt_comparison(comparison))
+
+
+def run_sensitivity_command(args: argparse.Namespace) -> None:
+    """
+    Print how the security levels of a preset change with a step of each parameter.
+    """
+    from soundcalc.sensitivity import STEPS, compute_sensitivities, format_sensitivity_report
+
+    cfg = PRESETS[args.preset].default().cfg
+    parameters = args.parameters or list(STEPS)
+    for identifier in args.regimes:
+        [report] = compute_sensitivities([cfg], REGIMES[identifier](), parameters)
+        print(format_sensitivity_report(report))
+        print("")
+
+
+def run_proof_size_command(args: argparse.Namespace) -> None:
+    """
+    Compare the proof size estimate with the expected size when Merkle openings are deduplicated.
+    """
+    import numpy as np
+    from soundcalc.common.merkle import get_expected_proof_size_bits, sample_proof_size_bits
+
+    params = PRESETS[args.preset].default()
+    print(f"zkEVM: {params.name} ({params.num_queries} queries)")
+    print(f"    independent paths: {params.proof_size_bits / KIB:.1f} KiB")
+    for cap_height in args.cap_heights:
+        expected = get_expected_proof_size_bits(params, cap_height)
+        samples = sample_proof_size_bits(params, cap_height, args.samples, args.seed)
+        low, high = np.percentile(samples, [5, 95])
+        print(f"    deduplicated, cap height {cap_height}: {expected / KIB:.1f} KiB expected, "
+              f"90% of samples within [{low / KIB:.1f}, {high / KIB:.1f}] KiB")
+
+
+def run_prover_command(args: argparse.Namespace) -> None:
+    """
+    Print the estimated prover time of a preset, per part of the prover.
+    """
+    from soundcalc.costs.prover import get_prover_cost
+
+    params = PRESETS[args.preset].default()
+    machine = get_machine_profile(args)
+    seconds = get_prover_cost(params, machine).get_seconds(machine)
+    print(f"zkEVM: {params.name}, on {machine.name}")
+    for part, value in seconds.items():
+        print(f"    {part}: {value:.3g}s")
+
+
+def run_verifier_command(args: argparse.Namespace) -> None:
+    """
+    Print the estimated work and cost of the verifier of a preset.
+    """
+    from soundcalc.costs.verifier import get_verifier_cost
+
+    params = PRESETS[args.preset].default()
+    schedule = get_cost_schedule(args)
+    cost = get_verifier_cost(params, schedule.hash_rate_bits)
+    print(f"zkEVM: {params.name}, with the {schedule.name} schedule")
+    print(f"    hashes: {cost.hashes:.0f}")
+    print(f"    field multiplications: {cost.field_mults:.0f}")
+    print(f"    proof size: {cost.proof_size_bits / KIB:.1f} KiB")
+    print(f"    total: {cost.get_cost(schedule):.4g} {schedule.unit}")
+
+
+def run_pareto_command(args: argparse.Namespace) -> None:
+    """
+    Print the Pareto frontier of proof size (or verifier cost) versus security for each regime.
+    """
+    from soundcalc.costs.prover import get_prover_seconds
+    from soundcalc.costs.verifier import get_verifier_gas
+    from soundcalc.pareto import find_pareto_frontier
+    from soundcalc.zkevms.zkevm import zkEVMParams
+
+    base = PRESETS[args.preset].default().cfg
+    axes = {}
+    for name, option in SWEEP_OPTIONS.items():
+        values = getattr(args, option)
+        if values is not None:
+            axes[name] = values
+
+    machine = get_machine_profile(args)
+    schedule = get_cost_schedule(args)
+    for identifier in args.regimes:
+        frontier = find_pareto_frontier(base, REGIMES[identifier](), axes, args.objective, schedule)
+        print(f"{identifier}: {len(frontier.points)} Pareto optimal configs "
+              f"(evaluated {frontier.configs_evaluated} of {frontier.configs_total} configs)")
+        for point in frontier.points:
+            cfg = point.config
+            params = zkEVMParams(cfg)
+            prover_seconds = get_prover_seconds(params, machine)
+            verifier_cost = get_verifier_gas(params, schedule)
+            print(f"    total={point.levels['total']} proof_size={point.proof_size_bits // KIB}KiB prover={prover_seconds:.3g}s "
+                  f"verifier={verifier_cost:.4g}{schedule.unit} "
+                  f"rho={cfg.rho} num_queries={cfg.num_queries} FRI_folding_factor={cfg.FRI_folding_factor} "
+                  f"FRI_early_stop_degree={cfg.FRI_early_stop_degree} field={cfg.field.name}")
+
+
+# Maps sweepable zkEVMConfig fields to the attribute names of their CLI options
+def axis_type(name: str):
+    """
+    Returns an argparse type that parses the values of the sweep axis `name`, see `parse_axis_values`.
+    """
+    def parse(text: str) -> list:
+        from soundcalc.sweep import parse_axis_values
+
+        try:
+            return parse_axis_values(name, text)
+        except (ValueError, ZeroDivisionError) as e:
+            raise argparse.ArgumentTypeError(str(e)) from None
+    return parse
+
+
+SWEEP_OPTIONS = {
+    "rho": "rho",
+    "num_queries": "num_queries",
+    "FRI_folding_factor": "folding_factor",
+    "FRI_early_stop_degree": "early_stop_degree",
+    "field": "field",
+    "grinding_query_phase": "grinding",
+    "grinding_batching_phase": "grinding_batching",
+    "grinding_commit_phase": "grinding_commit",
+}
+
+
+def run_serve_command(args: argparse.Namespace) -> None:
+    """
+    Run the query service until interrupted.
+    """
+    from soundcalc.server import serve
+
+    serve(args.host, args.port, args.socket)
+
+
+def run_list_command(args: argparse.Namespace) -> None:
+    """
+    Print the names of the available presets, regimes and low-degree tests, including the ones of plugins.
+    """
+    print("presets: " + ", ".join(sorted(PRESETS)))
+    print("regimes: " + ", ".join(sorted(REGIMES)))
+    print("low-degree tests: " + ", ".join(sorted(LOW_DEGREE_TESTS)))
+
+
+def build_arg_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="soundcalc", description="Universal zkEVM security bits calculator")
+    parser.add_argument("--cache", nargs="?", const=".soundcalc-cache.sqlite", default=None, metavar="PATH",
+                        help="serve the report's results from a persistent cache (default path: %(const)s)")
+    parser.add_argument("--profile", action="store_true",
+                        help="time the regimes, RBR components, presets and report, and print a summary")
+    parser.add_argument("--profile-output", default="soundcalc-profile.json", metavar="PATH",
+                        help="where --profile dumps the timings as JSON (default: %(default)s)")
+    parser.add_argument("--cprofile", default=None, metavar="PATH", help="also write cProfile stats to this file")
+    subparsers = parser.add_subparsers(dest="command")
+
+    sweep = subparsers.add_parser("sweep", help="evaluate a grid of variants of a preset")
+    sweep.add_argument("--preset", choices=PRESETS, metavar="PRESET", required=True,
+                       help="preset to start from (see the list command)")
+    sweep.add_argument("--regimes", nargs="+", choices=REGIMES, metavar="REGIME", default=["UDR", "JBR"])
+    sweep.add_argument("--rho", type=axis_type("rho"), help="rates, e.g. 1/2,1/4")
+    sweep.add_argument("--num-queries", type=axis_type("num_queries"), help="e.g. 30:80:10")
+    sweep.add_argument("--folding-factor", type=axis_type("FRI_folding_factor"), help="e.g. 2,4,8,16")
+    sweep.add_argument("--early-stop-degree", type=axis_type("FRI_early_stop_degree"), help="e.g. 32,256")
+    sweep.add_argument("--field", type=axis_type("field"), help="e.g. GOLDILOCKS_2,BABYBEAR_4")
+    sweep.add_argument("--grinding", type=axis_type("grinding_query_phase"), help="query phase grinding bits, e.g. 0:20:4")
+    sweep.add_argument("--grinding-batching", type=axis_type("grinding_batching_phase"), help="batching phase grinding bits, e.g. 0:8")
+    sweep.add_argument("--grinding-commit", type=axis_type("grinding_commit_phase"), help="grinding bits before each folding round, e.g. 0:4")
+    sweep.add_argument("--workers", type=int, default=None, help="number of processes (default: all cores)")
+    sweep.add_argument("--chunk-size", type=int, default=256, help="configs per work unit")
+    sweep.add_argument("--output", help="stream the results to this file (or directory, for npz) instead of printing them")
+    sweep.add_argument("--format", choices=["jsonl", "csv", "npz"], default=None,
+                       help="output format (default: from the extension of --output)")
+    sweep.add_argument("--machine", default=None, metavar="PATH",
+                       help="JSON machine profile for prover time estimates (default: a 16-core CPU)")
+    sweep.add_argument("--verifier-schedule", default=None, metavar="PATH",
+                       help="JSON cost schedule for verifier cost estimates (default: EVM gas)")
+
+    catalog = subparsers.add_parser("catalog", help="evaluate the configs of TOML, JSON or JSONL catalogs")
+    catalog.add_argument("paths", nargs="+", metavar="PATH", help="catalog files, with the format as extension")
+    catalog.add_argument("--regimes", nargs="+", choices=REGIMES, metavar="REGIME", default=["UDR", "JBR"])
+    catalog.add_argument("--skip-invalid", action="store_true",
+                         help="skip invalid configs and report them at the end, instead of stopping at the first one")
+    catalog.add_argument("--workers", type=int, default=None, help="number of processes (default: all cores)")
+    catalog.add_argument("--chunk-size", type=int, default=256, help="configs per work unit")
+    catalog.add_argument("--output", help="stream the results to this file (or directory, for npz) instead of printing them")
+    catalog.add_argument("--format", choices=["jsonl", "csv", "npz"], default=None,
+                         help="output format (default: from the extension of --output)")
+    catalog.add_argument("--machine", default=None, metavar="PATH",
+                         help="JSON machine profile for prover time estimates (default: a 16-core CPU)")
+    catalog.add_argument("--verifier-schedule", default=None, metavar="PATH",
+                         help="JSON cost schedule for verifier cost estimates (default: EVM gas)")
+
+    multi_air = subparsers.add_parser("multi-air", help="evaluate a system that proves many AIRs, from a catalog with one entry per AIR")
+    multi_air.add_argument("path", metavar="PATH", help="catalog file, with the format as extension")
+    multi_air.add_argument("--regimes", nargs="+", choices=REGIMES, metavar="REGIME", default=["UDR", "JBR"])
+    multi_air.add_argument("--aggregation", choices=["min", "union"], default="min",
+                           help="combine the AIRs by their minimum, or by a union bound over them (default: %(default)s)")
+
+    pipeline = subparsers.add_parser("pipeline", help="evaluate a recursive proof, from a catalog with one entry per stage")
+    pipeline.add_argument("path", metavar="PATH", help="catalog file with the stages in order, from the base proof to the final wrap")
+    pipeline.add_argument("--regimes", nargs="+", choices=REGIMES, metavar="REGIME", default=["UDR", "JBR"])
+    pipeline.add_argument("--aggregation", choices=["min", "union"], default="union",
+                          help="combine the stages by their minimum, or by a union bound over them (default: %(default)s)")
+    pipeline.add_argument("--machine", default=None, metavar="PATH",
+                          help="JSON machine profile for prover time estimates (default: a 16-core CPU)")
+
+    pareto = subparsers.add_parser("pareto", help="find the configs with the best proof size versus security trade-off")
+    pareto.add_argument("--preset", choices=PRESETS, metavar="PRESET", required=True,
+                        help="preset to start from (see the list command)")
+    pareto.add_argument("--regimes", nargs="+", choices=REGIMES, metavar="REGIME", default=["UDR", "JBR"])
+    pareto.add_argument("--rho", type=axis_type("rho"), help="rates, e.g. 1/2,1/4")
+    pareto.add_argument("--num-queries", type=axis_type("num_queries"), help="e.g. 20:200")
+    pareto.add_argument("--folding-factor", type=axis_type("FRI_folding_factor"), help="e.g. 2,4,8,16")
+    pareto.add_argument("--early-stop-degree", type=axis_type("FRI_early_stop_degree"), help="e.g. 32,256")
+    pareto.add_argument("--field", type=axis_type("field"), help="e.g. GOLDILOCKS_2,BABYBEAR_4")
+    pareto.add_argument("--grinding", type=axis_type("grinding_query_phase"), help="query phase grinding bits, e.g. 0:20:4")
+    pareto.add_argument("--grinding-batching", type=axis_type("grinding_batching_phase"), help="batching phase grinding bits, e.g. 0:8")
+    pareto.add_argument("--grinding-commit", type=axis_type("grinding_commit_phase"), help="grinding bits before each folding round, e.g. 0:4")
+    pareto.add_argument("--machine", default=None, metavar="PATH",
+                        help="JSON machine profile for prover time estimates (default: a 16-core CPU)")
+    pareto.add_argument("--verifier-schedule", default=None, metavar="PATH",
+                        help="JSON cost schedule for verifier cost estimates (default: EVM gas)")
+    pareto.add_argument("--objective", choices=["proof_size", "verifier_cost"], default="proof_size",
+                        help="what to trade security against (default: %(default)s)")
+
+    sensitivity = subparsers.add_parser("sensitivity", help="show how the security levels change with each parameter")
+    sensitivity.add_argument("--preset", choices=PRESETS, metavar="PRESET", required=True)
+    sensitivity.add_argument("--regimes", nargs="+", choices=REGIMES, metavar="REGIME", default=["UDR", "JBR"])
+    sensitivity.add_argument("--parameters", nargs="+", default=None,
+                             help="parameters to step (default: rho, trace_length, num_queries, num_polys, "
+                                  "max_combo, field_extension_degree, grinding_query_phase)")
+
+    proof_size = subparsers.add_parser("proof-size", help="estimate the proof size with deduplicated Merkle openings")
+    proof_size.add_argument("--preset", choices=PRESETS, metavar="PRESET", required=True)
+    proof_size.add_argument("--cap-heights", nargs="+", type=int, default=[0], metavar="HEIGHT",
+                            help="heights of the Merkle caps, where 0 is a plain root (default: 0)")
+    proof_size.add_argument("--samples", type=int, default=1000, help="Monte Carlo samples of the query positions")
+    proof_size.add_argument("--seed", type=int, default=None, help="seed of the Monte Carlo sampling")
+
+    prover = subparsers.add_parser("prover", help="estimate the prover time of a preset")
+    prover.add_argument("--preset", choices=PRESETS, metavar="PRESET", required=True)
+    prover.add_argument("--machine", default=None, metavar="PATH",
+                        help="JSON machine profile for prover time estimates (default: a 16-core CPU)")
+
+    verifier = subparsers.add_parser("verifier", help="estimate the verifier cost of a preset, e.g. in gas")
+    verifier.add_argument("--preset", choices=PRESETS, metavar="PRESET", required=True)
+    verifier.add_argument("--verifier-schedule", default=None, metavar="PATH",
+                          help="JSON cost schedule for verifier cost estimates (default: EVM gas)")
+
+    ldt = subparsers.add_parser("ldt", help="compare the queries and proof size of FRI, STIR and WHIR at the same security")
+    ldt.add_argument("--preset", choices=PRESETS, metavar="PRESET", required=True)
+    ldt.add_argument("--regimes", nargs="+", choices=REGIMES, metavar="REGIME", default=["UDR", "JBR"])
+    ldt.add_argument("--protocols", nargs="+", metavar="PROTOCOL", default=None,
+                     help="low-degree tests to compare with FRI (default: all)")
+    ldt.add_argument("--target", type=int, default=None,
+                     help="target bits of security (default: the level of the preset with FRI)")
+
+    solve = subparsers.add_parser("solve", help="find the smallest number of queries for a target security level")
+    solve.add_argument("--preset", choices=PRESETS, metavar="PRESET", required=True)
+    solve.add_argument("--regime", choices=REGIMES, metavar="REGIME", required=True)
+    solve.add_argument("--target", type=int, required=True, help="target bits of security")
+    grinding = solve.add_mutually_exclusive_group()
+    grinding.add_argument("--grinding", type=int, default=None, help="query phase grinding bits (default: the preset's)")
+    grinding.add_argument("--max-grinding", type=int, default=None, help="list the queries/grinding trade-off up to this many bits")
+
+    grinding_parser = subparsers.add_parser("grinding", help="distribute a budget of grinding across the rounds")
+    grinding_parser.add_argument("--preset", choices=PRESETS, metavar="PRESET", required=True)
+    grinding_parser.add_argument("--regime", choices=REGIMES, metavar="REGIME", required=True)
+    grinding_parser.add_argument("--budget", type=float, required=True, help="expected number of grinding hashes, e.g. 1e9")
+    grinding_parser.add_argument("--machine", default=None, metavar="PATH",
+                                 help="JSON machine profile for grinding time estimates (default: a 16-core CPU)")
+
+    serve = subparsers.add_parser("serve", help="answer queries over HTTP, keeping everything warm between them")
+    serve.add_argument("--host", default="127.0.0.1", help="address to listen on (default: %(default)s)")
+    serve.add_argument("--port", type=int, default=8765, help="port to listen on (default: %(default)s)")
+    serve.add_argument("--socket", default=None, metavar="PATH", help="listen on this Unix socket instead")
+
+    subparsers.add_parser("list", help="list the available presets and regimes")
+
+    return parser
+
+
+def run_command(args: argparse.Namespace) -> None:
+    if args.command == "sweep":
+        run_sweep_command(args)
+    elif args.command == "catalog":
+        run_catalog_command(args)
+    elif args.command == "multi-air":
+        run_multi_air_command(args)
+    elif args.command == "pipeline":
+        run_pipeline_command(args)
+    elif args.command == "pareto":
+        run_pareto_command(args)
+    elif args.command == "sensitivity":
+        run_sensitivity_command(args)
+    elif args.command == "proof-size":
+        run_proof_size_command(args)
+    elif args.command == "prover":
+        run_prover_command(args)
+    elif args.command == "verifier":
+        run_verifier_command(args)
+    elif args.command == "ldt":
+        run_ldt_command(args)
+    elif args.command == "solve":
+        run_solve_command(args)
+    elif args.command == "grinding":
+        run_grinding_command(args)
+    elif args.command == "serve":
+        run_serve_command(args)
+    elif args.command == "list":
+        run_list_command(args)
+    else:
+        generate_report(cache_path=args.cache)
+
+
+def run_profiled_command(args: argparse.Namespace) -> None:
+    """
+    Run the command while timing the instrumented calls (see the profiling module), then
+    print a summary table and dump the timings as JSON. With --cprofile, also run cProfile.
+    """
+    import cProfile
+    import json
+    import pstats
+
+    # Worker processes do not report to the hooks of this process
+    if args.command in ("sweep", "catalog"):
+        args.workers = 1
+
+    cprofile = cProfile.Profile() if args.cprofile is not None else None
+    with profiling.Profiler() as profiler:
+        if cprofile is not None:
+            cprofile.enable()
+        run_command(args)
+        if cprofile is not None:
+            cprofile.disable()
+
+    print()
+    print(profiler.format_table())
+    with open(args.profile_output, "w", encoding="utf-8") as f:
+        json.dump(profiler.to_dict(), f, indent=2)
+    print(f"wrote :: {args.profile_output}")
+
+    if cprofile is not None:
+        cprofile.dump_stats(args.cprofile)
+        print(f"wrote :: {args.cprofile}")
+        pstats.Stats(cprofile).sort_stats("cumulative").print_stats(20)
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    """
+    Main entry point for soundcalc
+
+    Without a command, analyze the supported zkEVMs and write the markdown report.
+    """
+    args = build_arg_parser().parse_args(argv)
+
+    if args.profile or args.cprofile is not None:
+        run_profiled_command(args)
+    else:
+        run_command(args)
+
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,187 @@
+"""
+Security and proof size of systems that prove many AIRs (traces) at once.
+
+Presets model a single trace, e.g. the worst-case trace of ZisK. A `MultiAIR`
+instead holds one zkEVMConfig per sub-AIR, each with its own trace length,
+columns, polynomials and blowup. All instances are evaluated in one vectorized
+pass over a `ParamTable`, so that systems with hundreds of sub-AIRs stay fast.
+
+The security of the whole system is aggregated from the instances in one of two ways:
+- "min": the level of the weakest instance, i.e., each instance is sound on its own,
+- "union": a union bound over the instances, i.e., the adversary wins if it breaks
+  any of them. The errors of the instances add up, so this is below "min".
+Both are computed per component, and for the total. The total proof size is the
+sum of the proof sizes of the instances.
+
+Instances that a regime does not apply to, or whose FRI layers do not all have leafs,
+are left out of the aggregation, and reported as "invalid instances" instead.
+
+A multi-AIR can be loaded from a catalog (see the catalog module), with one
+entry per sub-AIR and the shared parameters as defaults:
+
+    [defaults]
+    preset = "zisk"
+
+    [[configs]]
+    name = "main"
+    trace_length = 4194304
+    num_columns = 66
+    num_polys = 68
+
+    [[configs]]
+    name = "binary"
+    trace_length = 1048576
+    rho = "1/4"
+    num_columns = 40
+    num_polys = 42
+"""
+
+from __future__ import annotations
+
+import dataclasses
+from dataclasses import dataclass
+from functools import cached_property
+from typing import Iterable, Optional, Sequence
+
+import numpy as np
+
+from .catalog import check_config, load_catalog
+from .common.utils import get_bits_of_security_from_log2_error
+from .sensitivity import get_rbr_bits_for_table
+from .zkevms.param_table import ParamTable
+from .zkevms.zkevm import zkEVMConfig
+
+
+# How the levels of the instances are combined (see the module docs)
+AGGREGATIONS = ("min", "union")
+
+
+@dataclass(frozen=True)
+class MultiAIR:
+    """
+    A system that proves several AIRs, with one config per instance.
+    """
+    name: str
+    instances: tuple[zkEVMConfig, ...]
+
+    @classmethod
+    def from_base(cls, name: str, base: zkEVMConfig, sub_airs: Iterable[dict]) -> "MultiAIR":
+        """
+        Build a multi-AIR from a base config, and one dictionary of fields that differ
+        from it per sub-AIR (e.g. trace_length, num_columns, num_polys and rho).
+
+        Raises a ValueError that lists every sub-AIR whose parameters are out of range
+        (see `check_config`).
+        """
+        instances = tuple(dataclasses.replace(base, **fields) for fields in sub_airs)
+        errors = []
+        for index, cfg in enumerate(instances):
+            try:
+                check_config(cfg)
+            except ValueError as e:
+                errors.append(f"{describe_instance(index, cfg)}: {e}")
+        if errors:
+            raise ValueError("invalid sub-AIRs: " + "; ".join(errors))
+        return cls(name, instances)
+
+    @classmethod
+    def from_catalog(cls, path: str, name: Optional[str] = None) -> "MultiAIR":
+        """
+        Load a multi-AIR from a catalog, with one entry per sub-AIR. The name defaults to the path.
+        """
+        return cls(name if name is not None else path, tuple(load_catalog(path)))
+
+    @cached_property
+    def table(self) -> ParamTable:
+        """
+        The parameters of all instances, one row per instance.
+        """
+        return ParamTable.from_configs(self.instances)
+
+    @cached_property
+    def proof_size_bits(self) -> int:
+        """
+        The total proof size of the instances whose proof size is defined
+        (see `ParamTable.has_proof_size` and `invalid_instances`).
+        """
+        return int(self.table.proof_size_bits[self.table.has_proof_size].sum())
+
+    @cached_property
+    def invalid_instances(self) -> list[str]:
+        """
+        The instances whose FRI layers do not all have leafs, as in `describe_instance`.
+        """
+        return self.describe_instances(~self.table.has_proof_size)
+
+    def describe_instances(self, mask: np.ndarray) -> list[str]:
+        """
+        Returns `describe_instance` for every instance selected by the boolean mask.
+        """
+        return [describe_instance(int(index), self.instances[index]) for index in np.flatnonzero(mask)]
+
+
+def describe_instance(index: int, cfg: zkEVMConfig) -> str:
+    """
+    Names an instance of a multi-AIR. Sub-AIRs from `MultiAIR.from_base` share the name of
+    their base, so the name alone may be ambiguous.
+    """
+    return f"#{index} {cfg.name}"
+
+
+def aggregate_bits(bits: np.ndarray, aggregation: str) -> float:
+    """
+    Combine the (unrounded) bits of security of the instances into the bits of the system.
+    """
+    if aggregation == "min":
+        return float(np.min(bits))
+    if aggregation == "union":
+        # The errors are 2^-bits, and their sum is computed in the log domain
+        return float(-np.logaddexp2.reduce(-bits))
+    raise ValueError(f"unknown aggregation {aggregation!r}, choose from {list(AGGREGATIONS)}")
+
+
+def compute_security_for_multi_air(
+    regime,
+    multi_air: MultiAIR,
+    aggregation: str = "min",
+) -> dict:
+    """
+    Returns the aggregated level of each component and of the "total" for one regime,
+    and the name of the "weakest instance", i.e., the one with the lowest total.
+
+    Instances that the regime does not apply to (as its sanity checks fail), or whose
+    proof size is not defined, are left out, and listed as "invalid instances".
+    If no instance is left, the result only has the "invalid instances".
+    """
+    if aggregation not in AGGREGATIONS:
+        raise ValueError(f"unknown aggregation {aggregation!r}, choose from {list(AGGREGATIONS)}")
+    bits, valid = get_rbr_bits_for_table(regime, multi_air.table)
+    valid = valid & multi_air.table.has_proof_size
+
+    invalid = {"invalid instances": multi_air.describe_instances(~valid)} if not valid.all() else {}
+    if not valid.any():
+        return invalid
+
+    result = {}
+    for label, values in bits.items():
+        aggregated = aggregate_bits(values[valid], aggregation)
+        # No instance has a commit round, so there is no level for it
+        if np.isinf(aggregated):
+            continue
+        result[label] = get_bits_of_security_from_log2_error(-aggregated)
+    result["weakest instance"] = multi_air.instances[int(np.nanargmin(np.where(valid, bits["total"], np.nan)))].name
+    return result | invalid
+
+
+def compute_security_for_multi_air_and_regimes(
+    fri_regimes: Sequence,
+    multi_air: MultiAIR,
+    aggregation: str = "min",
+) -> dict[str, dict]:
+    """
+    Returns the result of `compute_security_for_multi_air` for every regime, by identifier.
+    """
+    return {
+        regime.identifier(): compute_security_for_multi_air(regime, multi_air, aggregation)
+        for regime in fri_regimes
+    }
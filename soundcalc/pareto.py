@@ -0,0 +1,192 @@
+"""
+Pareto frontier of proof size (or verifier cost) versus security over a grid of zkEVM configs.
+"""
+
+from __future__ import annotations
+
+import bisect
+import dataclasses
+import itertools
+from dataclasses import dataclass, field
+from typing import Sequence
+
+from .common.fri import get_FRI_roots_and_opening_size_bits, get_FRI_query_phase_log2_error
+from .common.utils import get_bits_of_security_from_log2_error
+from .costs.verifier import EVM_GAS, CostSchedule, get_verifier_cost_affine
+from .security import get_rbr_levels_for_zkevm_and_regime, get_component_levels
+from .zkevms.zkevm import zkEVMConfig, zkEVMParams
+
+
+@dataclass(frozen=True)
+class ParetoPoint:
+    config: zkEVMConfig
+    proof_size_bits: int
+    # Round-by-round levels (as in `get_rbr_levels_for_zkevm_and_regime`)
+    levels: dict[str, int]
+    # Value of the objective, i.e., the proof size in bits or the verifier cost
+    cost: float
+
+
+@dataclass
+class ParetoFrontier:
+    """
+    The Pareto optimal points, ordered by increasing cost (and thus increasing security).
+    """
+    points: list[ParetoPoint] = field(default_factory=list)
+    # Number of configs in the grid, and how many of them had to be evaluated in full
+    configs_total: int = 0
+    configs_evaluated: int = 0
+    # Number of branches (i.e., configs up to num_queries) that were skipped entirely
+    branches_pruned: int = 0
+
+    # Costs and totals of the points, both strictly increasing
+    _costs: list[float] = field(default_factory=list, repr=False)
+    _totals: list[int] = field(default_factory=list, repr=False)
+
+    def dominates(self, cost: float, total: int) -> bool:
+        """
+        Returns True if some point is at least as cheap and at least as secure.
+        """
+        i = bisect.bisect_right(self._costs, cost)
+        return i > 0 and self._totals[i - 1] >= total
+
+    def insert(self, point: ParetoPoint) -> None:
+        cost, total = point.cost, point.levels["total"]
+        if self.dominates(cost, total):
+            return
+        # remove the points that the new point dominates
+        lo = bisect.bisect_left(self._costs, cost)
+        hi = lo
+        while hi < len(self._costs) and self._totals[hi] <= total:
+            hi += 1
+        self._costs[lo:hi] = [cost]
+        self._totals[lo:hi] = [total]
+        self.points[lo:hi] = [point]
+
+
+# The objectives that the frontier can trade security against
+OBJECTIVES = ("proof_size", "verifier_cost")
+
+
+def _get_proof_size_bits_affine(params: zkEVMParams) -> tuple[int, int]:
+    """
+    The proof size is affine in the number of queries: it is the size of all Merkle roots,
+    plus one opening per query. Returns both parts.
+    """
+    return get_FRI_roots_and_opening_size_bits(
+        hash_size_bits=params.hash_size_bits,
+        field_size_bits=params.field_size_bits,
+        num_functions=params.num_polys,
+        witness_size=int(params.D),
+        field_extension_degree=int(params.field_extension_degree),
+        early_stop_degree=int(params.FRI_early_stop_degree),
+        folding_factor=int(params.FRI_folding_factor),
+    )
+
+
+def _get_objective_affine(params: zkEVMParams, objective: str, schedule: CostSchedule) -> tuple[float, float]:
+    """
+    Both objectives are affine in the number of queries. Returns the part that does not
+    depend on it, and the part per query.
+    """
+    if objective == "proof_size":
+        return _get_proof_size_bits_affine(params)
+    fixed, per_query = get_verifier_cost_affine(params, schedule.hash_rate_bits)
+    return fixed.get_cost(schedule), per_query.get_cost(schedule, include_fixed=False)
+
+
+def find_pareto_frontier(
+    base: zkEVMConfig,
+    regime,
+    axes: dict[str, Sequence],
+    objective: str = "proof_size",
+    schedule: CostSchedule = EVM_GAS,
+) -> ParetoFrontier:
+    """
+    Compute the Pareto frontier of (cost, total security) for one regime, over the
+    Cartesian product of `axes` (see `SWEEP_AXES` of the sweep module). The cost is
+    the proof size, or the verifier cost under `schedule` (see the costs.verifier module).
+
+    We use branch and bound. A branch fixes every axis except `num_queries`. Since the
+    number of queries only affects the query phase level, the minimum over all other
+    levels bounds the total of the whole branch from above, and the cost at the
+    smallest number of queries bounds its cost from below. A branch is skipped
+    if a point found so far beats both bounds. Within a branch, we stop as soon as the
+    query phase is no longer the bottleneck, as more queries would only add cost.
+
+    Regimes that choose their own parameters per config (e.g. `JohnsonBoundRegime(optimize_m=True)`)
+    choose them differently for every number of queries, which also changes theta and the other
+    levels. The bounds do not hold for them, so every config of the grid is evaluated in full.
+    """
+    if objective not in OBJECTIVES:
+        raise ValueError(f"unknown objective {objective!r}, choose from {list(OBJECTIVES)}")
+    num_queries_values = sorted(axes.get("num_queries", [base.num_queries]))
+    branch_axes = {name: values for name, values in axes.items() if name != "num_queries"}
+    names = list(branch_axes)
+
+    frontier = ParetoFrontier()
+
+    if regime.get_regime_parameter_names():
+        for values in itertools.product(*(branch_axes[name] for name in names)):
+            for num_queries in num_queries_values:
+                cfg = dataclasses.replace(base, num_queries=num_queries, **dict(zip(names, values)))
+                params = zkEVMParams(cfg)
+                frontier.configs_total += 1
+                frontier.configs_evaluated += 1
+                try:
+                    levels = get_rbr_levels_for_zkevm_and_regime(regime, params)
+                except AssertionError:
+                    # the sanity checks of the regime failed for these parameters
+                    continue
+                fixed_cost, query_cost = _get_objective_affine(params, objective, schedule)
+                cost = fixed_cost + num_queries * query_cost
+                frontier.insert(ParetoPoint(cfg, params.proof_size_bits, levels, cost))
+        return frontier
+
+    # Compute the bounds of all branches, with one full evaluation each
+    branches = []
+    for values in itertools.product(*(branch_axes[name] for name in names)):
+        cfg = dataclasses.replace(base, num_queries=num_queries_values[0], **dict(zip(names, values)))
+        params = zkEVMParams(cfg)
+        frontier.configs_total += len(num_queries_values)
+        frontier.configs_evaluated += 1
+        try:
+            levels = get_rbr_levels_for_zkevm_and_regime(regime, params)
+        except AssertionError:
+            # the sanity checks of the regime failed for these parameters
+            continue
+        cap = min(level for label, level in get_component_levels(levels).items() if label != "FRI query phase")
+        fixed_cost, query_cost = _get_objective_affine(params, objective, schedule)
+        branches.append((fixed_cost + params.num_queries * query_cost, cap, params))
+
+    # Visit the most secure branches first, and among those the smallest ones
+    branches.sort(key=lambda branch: (-branch[1], branch[0]))
+    for cost_lower_bound, cap, params in branches:
+        if frontier.dominates(cost_lower_bound, cap):
+            frontier.branches_pruned += 1
+            continue
+
+        theta = regime.get_theta(params)
+        roots_bits, opening_bits = _get_proof_size_bits_affine(params)
+        fixed_cost, query_cost = _get_objective_affine(params, objective, schedule)
+        previous_total = None
+        for num_queries in num_queries_values:
+            query_level = get_bits_of_security_from_log2_error(
+                get_FRI_query_phase_log2_error(theta, num_queries, params.grinding_query_phase)
+            )
+            total = min(cap, query_level)
+            proof_size_bits = roots_bits + num_queries * opening_bits
+            cost = fixed_cost + num_queries * query_cost
+            if frontier.dominates(cost, cap):
+                # this and all larger numbers of queries are dominated
+                break
+            if total != previous_total and not frontier.dominates(cost, total):
+                cfg = dataclasses.replace(params.cfg, num_queries=num_queries)
+                levels = get_rbr_levels_for_zkevm_and_regime(regime, zkEVMParams(cfg))
+                frontier.configs_evaluated += 1
+                frontier.insert(ParetoPoint(cfg, proof_size_bits, levels, cost))
+            previous_total = total
+            if query_level >= cap:
+                break
+
+    return frontier
@@ -0,0 +1,92 @@
+"""
+Timing instrumentation of the hot paths.
+
+The instrumented code calls `profiling.call(label, function, ...)` instead of
+`function(...)` directly. Calls are nested, so every timing is reported for a
+path of labels, e.g. ("RISC0", "JBR", "query phase").
+
+Timings are only taken while a hook is registered (see `add_hook` and
+`Profiler`). Otherwise, `call` just calls the function.
+"""
+
+from __future__ import annotations
+
+import time
+from typing import Callable
+
+# Receives the path of labels of a call, and its duration in seconds
+Hook = Callable[[tuple, float], None]
+
+_hooks: list[Hook] = []
+
+# Labels of the instrumented calls that are currently running
+_scope: list[str] = []
+
+
+def add_hook(hook: Hook) -> None:
+    _hooks.append(hook)
+
+
+def remove_hook(hook: Hook) -> None:
+    _hooks.remove(hook)
+
+
+def call(label: str, function, *args):
+    """
+    Returns function(*args), and reports its duration to the hooks.
+    """
+    if not _hooks:
+        return function(*args)
+
+    _scope.append(label)
+    start = time.perf_counter()
+    try:
+        return function(*args)
+    finally:
+        elapsed = time.perf_counter() - start
+        path = tuple(_scope)
+        _scope.pop()
+        for hook in _hooks:
+            hook(path, elapsed)
+
+
+class Profiler:
+    """
+    A hook that counts the calls and sums up the time per path. While used as a
+    context manager, it is registered as a hook.
+    """
+
+    def __init__(self):
+        # Maps each path to [number of calls, total seconds]
+        self.stats: dict[tuple, list] = {}
+
+    def __call__(self, path: tuple, seconds: float) -> None:
+        entry = self.stats.setdefault(path, [0, 0.0])
+        entry[0] += 1
+        entry[1] += seconds
+
+    def __enter__(self) -> "Profiler":
+        add_hook(self)
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        remove_hook(self)
+
+    def to_dict(self) -> list[dict]:
+        """
+        Returns the stats in a form that can be dumped as JSON.
+        """
+        return [
+            {"path": list(path), "calls": calls, "seconds": seconds}
+            for path, (calls, seconds) in sorted(self.stats.items())
+        ]
+
+    def format_table(self) -> str:
+        """
+        Returns the stats as a table, where nested calls are indented below their callers.
+        """
+        lines = [f"{'call':<48} {'calls':>9} {'total ms':>11} {'per call µs':>12}"]
+        for path, (calls, seconds) in sorted(self.stats.items()):
+            label = "  " * (len(path) - 1) + path[-1]
+            lines.append(f"{label:<48} {calls:>9} {seconds * 1e3:>11.2f} {seconds / calls * 1e6:>12.2f}")
+        return "\n".join(lines)
@@ -0,0 +1,147 @@
+"""
+Recursive composition: a base proof, wrapped by one or more recursion layers and a final wrap.
+
+A `Pipeline` is the chain of configs of its stages, from the base STARK to the final
+wrap, each with its own field, rate and number of queries. The pipeline is evaluated
+end to end: every stage gets its round-by-round levels, proof size and prover time,
+and the pipeline gets
+- the combined soundness, i.e., a union bound over the errors of all stages, as the
+  whole proof is unsound if any of the stages is (or their minimum, see `AGGREGATIONS`),
+- the total prover time, as the stages are proven one after the other,
+- the final proof size, i.e., the one of the last stage.
+The combined soundness is computed from the levels of the stages, so it is a lower bound.
+
+A `PipelineEvaluator` keeps the results of the stages that it has seen, so that
+variants of a pipeline (e.g. with a different final wrap) only evaluate the stages
+that changed.
+"""
+
+from __future__ import annotations
+
+import collections
+import dataclasses
+from dataclasses import dataclass
+from typing import Optional, Sequence
+
+import numpy as np
+
+from .catalog import load_catalog
+from .common.utils import get_bits_of_security_from_log2_error
+from .costs.prover import DEFAULT_MACHINE, MachineProfile, get_prover_seconds
+from .multi_air import AGGREGATIONS, aggregate_bits
+from .sweep import evaluate_config
+from .zkevms.zkevm import zkEVMConfig, zkEVMParams
+
+
+# Number of stage results that an evaluator keeps in memory
+STAGE_CACHE_SIZE = 1 << 12
+
+
+@dataclass(frozen=True)
+class Pipeline:
+    """
+    The stages of a recursive proof, from the base proof to the final wrap.
+    """
+    name: str
+    stages: tuple[zkEVMConfig, ...]
+
+    def replace_stage(self, index: int, **changes) -> "Pipeline":
+        """
+        Returns the pipeline with the given changes to one stage, e.g. `replace_stage(-1, num_queries=30)`
+        for the final wrap.
+        """
+        stages = list(self.stages)
+        stages[index] = dataclasses.replace(stages[index], **changes)
+        return Pipeline(self.name, tuple(stages))
+
+    @classmethod
+    def from_catalog(cls, path: str, name: Optional[str] = None) -> "Pipeline":
+        """
+        Load a pipeline from a catalog, with one entry per stage in order. The name defaults to the path.
+        """
+        return cls(name if name is not None else path, tuple(load_catalog(path)))
+
+
+@dataclass(frozen=True)
+class StageResult:
+    config: zkEVMConfig
+    # None if the config of the stage is invalid (see `evaluate_config`)
+    proof_size_bits: Optional[int]
+    prover_seconds: float
+    # Maps each regime identifier to its round-by-round levels (as in `compute_security_for_zkevm`).
+    # A regime maps to None if the stage is outside the range where the regime's analysis applies.
+    results: dict[str, Optional[dict]]
+
+
+@dataclass(frozen=True)
+class PipelineResult:
+    pipeline: Pipeline
+    stages: list[StageResult]
+    # Combined level of all stages per regime identifier, or None if the regime does not apply to some stage
+    combined: dict[str, Optional[int]]
+    # Sum of the prover times of all stages
+    prover_seconds: float
+    # Proof size of the final stage, or None if it is invalid
+    proof_size_bits: Optional[int]
+
+
+class PipelineEvaluator:
+    """
+    Evaluates pipelines for fixed regimes and machine, and keeps the results of their stages.
+    """
+
+    def __init__(
+        self,
+        regimes: Sequence,
+        machine: MachineProfile = DEFAULT_MACHINE,
+        aggregation: str = "union",
+        stage_cache_size: int = STAGE_CACHE_SIZE,
+    ):
+        if aggregation not in AGGREGATIONS:
+            raise ValueError(f"unknown aggregation {aggregation!r}, choose from {list(AGGREGATIONS)}")
+        self.regimes = list(regimes)
+        self.machine = machine
+        self.aggregation = aggregation
+        self.stage_cache_size = stage_cache_size
+        self.stages_evaluated = 0
+        # Maps configs to their results, least recently used first
+        self._stages: collections.OrderedDict = collections.OrderedDict()
+
+    def evaluate_stage(self, cfg: zkEVMConfig) -> StageResult:
+        """
+        Returns the results of one stage, from memory if it was evaluated before.
+        """
+        if cfg in self._stages:
+            self._stages.move_to_end(cfg)
+            return self._stages[cfg]
+
+        proof_size_bits, results = evaluate_config(cfg, self.regimes)
+        stage = StageResult(cfg, proof_size_bits, get_prover_seconds(zkEVMParams(cfg), self.machine), results)
+        self.stages_evaluated += 1
+        self._stages[cfg] = stage
+        if len(self._stages) > self.stage_cache_size:
+            self._stages.popitem(last=False)
+        return stage
+
+    def evaluate(self, pipeline: Pipeline) -> PipelineResult:
+        """
+        Evaluate all stages of the pipeline, and combine their results.
+        """
+        stages = [self.evaluate_stage(cfg) for cfg in pipeline.stages]
+
+        combined: dict[str, Optional[int]] = {}
+        for regime in self.regimes:
+            identifier = regime.identifier()
+            if any(stage.results[identifier] is None for stage in stages):
+                combined[identifier] = None
+                continue
+            totals = np.array([stage.results[identifier]["total"] for stage in stages], dtype=float)
+            combined[identifier] = get_bits_of_security_from_log2_error(-aggregate_bits(totals, self.aggregation))
+
+        return PipelineResult(
+            pipeline=pipeline,
+            stages=stages,
+            combined=combined,
+            prover_seconds=sum(stage.prover_seconds for stage in stages),
+            proof_size_bits=stages[-1].proof_size_bits,
+        )
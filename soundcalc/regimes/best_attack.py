@@ -2,7 +2,11 @@ from __future__ import annotations
 
 
 from ..zkevms.zkevm import zkEVMParams
-from ..common.utils import get_bits_of_security_from_error
+from ..common.utils import get_bits_of_security_from_log2_error
+from ..common.arrays import log2, logaddexp2
+
+# Bump this whenever a change to `best_attack_security` changes its results (see the cache module)
+FORMULA_VERSION = 1
 
 
 def best_attack_security(params: zkEVMParams) -> int:
@@ -19,12 +23,14 @@ def best_attack_security(params: zkEVMParams) -> int:
 
     # FRI errors under the toy problem regime
     # see "Toy problem security" in §5.9.1 of the ethSTARK paper
-    commit_phase_error = 1 / params.F
-    query_phase_error_without_grinding = params.rho ** params.num_queries
+    # We work with log2 of the errors, as rho ** num_queries underflows for many queries
+    commit_phase_log2_error = -params.log2_F - params.grinding_commit_phase
+    query_phase_log2_error_without_grinding = params.num_queries * log2(params.rho)
     # Add bits of security from grinding (see section 6.3 in ethSTARK)
-    query_phase_error_with_grinding = query_phase_error_without_grinding * 2 ** (-params.grinding_query_phase)
+    query_phase_log2_error_with_grinding = query_phase_log2_error_without_grinding - params.grinding_query_phase
 
-    final_error = commit_phase_error + query_phase_error_with_grinding
-    final_level = get_bits_of_security_from_error(final_error)
+    # final_error = commit_phase_error + query_phase_error_with_grinding
+    final_log2_error = logaddexp2(commit_phase_log2_error, query_phase_log2_error_with_grinding)
+    final_level = get_bits_of_security_from_log2_error(final_log2_error)
 
     return final_level
@@ -1,16 +1,39 @@
 from __future__ import annotations
 
-import math
-
 # TODO: Conjectured.
 C1 = 1.0
 C2 = 1.0
 C3 = 1.0 # List size related
 
+import functools
+import math
+from types import SimpleNamespace
+from typing import Optional
+
 from .fri_regime import FRIRegime
 from ..zkevms.zkevm import zkEVMParams
-from soundcalc.common.fri import get_johnson_parameter_m
-from ..common.utils import get_rho_plus
+from soundcalc.common.fri import MEMO_SIZE, get_johnson_parameter_m, get_FRI_query_phase_log2_error
+from ..common.utils import get_rho_plus, get_ALI_and_DEEP_log2_error
+from ..common.arrays import is_array, sqrt, ceil, log2, where
+
+# Number of golden-section steps when optimizing eta. Each step shrinks the search interval by ~0.618.
+ETA_SEARCH_ITERATIONS = 64
+
+# The parameters that the levels depending on eta are computed from
+_ETA_OPTIMIZATION_INPUTS = (
+    "rho",
+    "trace_length",
+    "D",
+    "log2_F",
+    "max_combo",
+    "num_columns",
+    "num_polys",
+    "power_batching",
+    "AIR_max_degree",
+    "num_queries",
+    "grinding_query_phase",
+    "grinding_batching_phase",
+)
 
 class CapacityBoundRegime(FRIRegime):
     """
@@ -19,17 +42,50 @@ class CapacityBoundRegime(FRIRegime):
     This is Regime 3 from the RISC0 python calculator.
     This regime assumes the proximity conjecture with parameters C1,C2 + the list size
     conjecture parameter C3.
+
+    The distance eta to the capacity bound trades off the query phase against batching
+    and the list size. By default, it is fixed. With `optimize_eta=True`, it is chosen
+    per zkEVM to maximize the total security level, and reported as "eta".
+    Alternatively, a fixed `eta` can be given.
     """
 
+    FORMULA_VERSION = 1
+
+    def __init__(self, optimize_eta: bool = False, eta: Optional[float] = None):
+        assert not (optimize_eta and eta is not None)
+        self.optimize_eta = optimize_eta
+        self.eta = eta
+        # The optimal eta for the last ParamTable that we have seen, as (table, eta)
+        self._table_eta = None
+
     def identifier(self) -> str:
         return "CBR"
 
+    def get_regime_parameters(self, params: zkEVMParams) -> dict[str, float]:
+        """
+        Reports the chosen eta, if it is optimized.
+        """
+        if not self.optimize_eta:
+            return {}
+        return {"eta": self._get_eta(params)}
+
+    def get_regime_parameter_names(self) -> tuple[str, ...]:
+        return ("eta",) if self.optimize_eta else ()
+
+    def with_regime_parameters(self, regime_parameters: dict[str, float]) -> "CapacityBoundRegime":
+        if "eta" not in regime_parameters:
+            return self
+        return CapacityBoundRegime(eta=regime_parameters["eta"])
+
 
     def get_bound_on_list_size(self, params: zkEVMParams) -> int:
         """
         Returns an upper bound on the list size of this regime, i.e., the number of codewords
         a function is close to.
         """
+        return self._get_bound_on_list_size(params, self._get_eta(params))
+
+    def _get_bound_on_list_size(self, params: zkEVMParams, eta) -> int:
 
         # ASN This computation is again kinda different between Ha22 and STIR conjecture.
         # Clarify and document why we are using this one.
@@ -37,28 +93,39 @@ class CapacityBoundRegime(FRIRegime):
         # we assume that the theta has been chosen that this assert always holds
         # however, we might want to guarantee that
         # TODO DK: figure out how to guarantee that
-        theta = self.get_theta(params)
-        assert theta < 1 - r_plus
+        theta = self._get_theta(params, eta)
+        # In a table, the rows where this fails are reported by `get_valid_rows` instead
+        if not is_array(theta):
+            assert theta < 1 - r_plus
         eta_plus = 1 - r_plus - theta
 
-        return math.ceil((params.D / eta_plus) ** C3)
+        return ceil((params.D / eta_plus) ** C3)
+
 
+    def get_valid_rows(self, table) -> np.ndarray:
+        import numpy as np
+
+        r_plus = get_rho_plus(table.trace_length, table.D, table.max_combo)
+        return np.broadcast_to(self.get_theta(table) < 1 - r_plus, (len(table),))
 
     def get_theta(self, params: zkEVMParams) -> float:
         """
         Returns the theta for the query phase error.
         """
-        eta = self._get_eta()
+        return self._get_theta(params, self._get_eta(params))
+
+    def _get_theta(self, params: zkEVMParams, eta) -> float:
         theta = 1 - params.rho - eta
         return theta
 
 
-    def get_batching_error(self, params: zkEVMParams) -> float:
+    def get_batching_log2_error(self, params: zkEVMParams) -> float:
         """
-        Returns the error for the FRI batching step for this regime.
+        Returns log2 of the error for the FRI batching step for this regime.
         """
+        return self._get_batching_log2_error(params, self._get_eta(params))
 
-        eta = self._get_eta()
+    def _get_batching_log2_error(self, params: zkEVMParams, eta) -> float:
         rho = params.rho
 
         # Note: the errors for correlated agreement in the following two cases differ,
@@ -75,33 +142,103 @@ class CapacityBoundRegime(FRIRegime):
         # the error in Conjecture 8.4, first item.
         #
         # Then easiest way to see the difference is to compare Theorems 1.5 and 1.6.
-        term_one =  1 / ((eta * rho) ** C1)
-        term_two =  (params.D ** C2) / params.F
-        error = term_one * term_two
-        if params.power_batching:
-            error *= params.num_polys ** C2
-        return error
-
-    def get_commit_phase_error(self, params: zkEVMParams) -> float:
+        #   term_one = 1 / ((eta * rho) ** C1)
+        #   term_two = (D ** C2) / F
+        #   error = term_one * term_two, times num_polys ** C2 for power batching
+        log2_term_one = -C1 * log2(eta * rho)
+        log2_term_two = C2 * log2(params.D) - params.log2_F
+        log2_error = log2_term_one + log2_term_two
+        log2_error = where(params.power_batching, log2_error + C2 * log2(params.num_polys), log2_error)
+        return log2_error
+
+    def get_commit_phase_log2_error(self, params: zkEVMParams) -> float:
         """
-        Returns the error for the FRI commit phase for this regime.
+        Returns log2 of the error for the FRI commit phase for this regime.
         """
         # Note: This function is used by CBR, but there is no good foundation for it yet.
         # It is just copied from JBR.
         # TODO Find a better formula for CBR.
         m = self._get_m()
-        error = (2 * m + 1) * (params.D + 1) * params.FRI_folding_factor / (math.sqrt(params.rho) * params.F)
-        return error
+        # error = (2 * m + 1) * (D + 1) * FRI_folding_factor / (sqrt(rho) * F)
+        log2_error = log2((2 * m + 1) * (params.D + 1) * params.FRI_folding_factor / sqrt(params.rho)) - params.log2_F
+        return log2_error
 
 
-    def _get_eta(self):
+    def _get_eta(self, params: zkEVMParams):
         # This is called epsilon in the RISC0 calculator, but it's usually eta elsewhere
         # It denotes how close we are to the capacity bound
-        # TODO DK: figure out if we can optimize this parameter
-        eta = 0.05
+        if self.eta is not None:
+            return self.eta
+        if not self.optimize_eta:
+            eta = 0.05
+            return eta
+        if is_array(params.rho):
+            if self._table_eta is None or self._table_eta[0] is not params:
+                import numpy as np
+
+                # The search is meaningless for rows that the regime does not apply to (see `get_valid_rows`)
+                with np.errstate(divide="ignore", invalid="ignore"):
+                    self._table_eta = (params, self._get_optimal_eta(params))
+            return self._table_eta[1]
+        return _get_optimal_eta_cached(tuple(getattr(params, name) for name in _ETA_OPTIMIZATION_INPUTS))
+
+    def _get_eta_objective(self, params: zkEVMParams, eta):
+        """
+        Returns the minimum over the (unrounded) levels that depend on eta: batching,
+        query phase, ALI and DEEP. The commit phase does not depend on eta.
+
+        The batching and list size terms improve with eta, while the query phase gets
+        worse, so this is unimodal in eta.
+        """
+        import numpy as np
+
+        log2_errors = [
+            self._get_batching_log2_error(params, eta) - params.grinding_batching_phase,
+            get_FRI_query_phase_log2_error(self._get_theta(params, eta), params.num_queries, params.grinding_query_phase),
+            *get_ALI_and_DEEP_log2_error(self._get_bound_on_list_size(params, eta), params),
+        ]
+        return functools.reduce(np.minimum, [-log2_error for log2_error in log2_errors])
+
+    def _get_optimal_eta(self, params: zkEVMParams):
+        """
+        Maximize `_get_eta_objective` with a golden-section search.
 
-        return eta
+        If params holds columns, this runs one search per row in lockstep, with one
+        batched evaluation of the objective per step.
+        """
+        # eta ranges over (r_plus - rho, 1 - rho), such that both
+        # eta_plus = 1 - r_plus - theta and theta are positive
+        r_plus = get_rho_plus(params.trace_length, params.D, params.max_combo)
+        lo = r_plus - params.rho
+        hi = 1 - params.rho
+
+        inv_phi = (math.sqrt(5) - 1) / 2
+        c = hi - inv_phi * (hi - lo)
+        d = lo + inv_phi * (hi - lo)
+        f_c = self._get_eta_objective(params, c)
+        f_d = self._get_eta_objective(params, d)
+        for _ in range(ETA_SEARCH_ITERATIONS):
+            # If f(c) >= f(d), the maximum is in [lo, d], and d's new left neighbour is c.
+            # Otherwise, it is in [c, hi], and c's new right neighbour is d.
+            left = f_c >= f_d
+            lo, hi = where(left, lo, c), where(left, d, hi)
+            x = where(left, hi - inv_phi * (hi - lo), lo + inv_phi * (hi - lo))
+            f_x = self._get_eta_objective(params, x)
+            c, d, f_c, f_d = (
+                where(left, x, d), where(left, c, x),
+                where(left, f_x, f_d), where(left, f_c, f_x),
+            )
+        return (lo + hi) / 2
 
     def _get_m(self):
         m = get_johnson_parameter_m()  # TODO DK: it is not clear if this is the right m to use. To investigate.
         return m
+
+
+@functools.lru_cache(maxsize=MEMO_SIZE)
+def _get_optimal_eta_cached(inputs: tuple) -> float:
+    """
+    Memoized `CapacityBoundRegime._get_optimal_eta`, keyed by the values of _ETA_OPTIMIZATION_INPUTS.
+    """
+    params = SimpleNamespace(**dict(zip(_ETA_OPTIMIZATION_INPUTS, inputs)))
+    return float(CapacityBoundRegime()._get_optimal_eta(params))
@@ -1,13 +1,17 @@
 from __future__ import annotations
 
 import math
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, TYPE_CHECKING
 
-from soundcalc.common.fri import get_FRI_query_phase_error
-from soundcalc.common.utils import get_bits_of_security_from_error
+from soundcalc import profiling
+from soundcalc.common.fri import get_FRI_query_phase_log2_error
+from soundcalc.common.utils import get_bits_of_security_from_log2_error
 
 from ..zkevms.zkevm import zkEVMParams
 
+if TYPE_CHECKING:
+    import numpy as np
+
 
 class FRIRegime:
     """
@@ -18,6 +22,10 @@ class FRIRegime:
     Code for those regimes can be found in files across this directory.
     """
 
+    # Bump this whenever a change to the formulas of a regime changes its results.
+    # Cached results of the regime (see the cache module) are then recomputed.
+    FORMULA_VERSION = 1
+
     def identifier(self) -> str:
         raise NotImplementedError
 
@@ -35,17 +43,60 @@ class FRIRegime:
         """
         raise NotImplementedError
 
+    def get_batching_log2_error(self, params: zkEVMParams) -> float:
+        """
+        Returns log2 of the error for the FRI batching step for this regime.
+        """
+        raise NotImplementedError
+
+    def get_commit_phase_log2_error(self, params: zkEVMParams) -> float:
+        """
+        Returns log2 of the error for the FRI commit phase for this regime.
+        """
+        raise NotImplementedError
+
+    # Regimes compute their errors in the log domain (see above), as the errors
+    # themselves can under- or overflow floats. The plain errors are derived from there.
+
     def get_batching_error(self, params: zkEVMParams) -> float:
         """
         Returns the error for the FRI batching step for this regime.
         """
-        raise NotImplementedError
+        return 2.0 ** self.get_batching_log2_error(params)
 
     def get_commit_phase_error(self, params: zkEVMParams) -> float:
         """
         Returns the error for the FRI commit phase for this regime.
         """
-        raise NotImplementedError
+        return 2.0 ** self.get_commit_phase_log2_error(params)
+
+    def get_regime_parameters(self, params: zkEVMParams) -> dict[str, float]:
+        """
+        Returns the internal parameters that this regime has chosen for the given zkEVM
+        (e.g. when optimizing them), so that they can be reported next to the levels.
+        """
+        return {}
+
+    def get_regime_parameter_names(self) -> tuple[str, ...]:
+        """
+        Returns the keys of the dictionary that `get_regime_parameters` returns.
+        """
+        return ()
+
+    def with_regime_parameters(self, regime_parameters: dict[str, float]) -> "FRIRegime":
+        """
+        Returns a regime that uses the given internal parameters (as reported by
+        `get_regime_parameters`) instead of choosing them itself.
+        """
+        return self
+
+    def get_regime_parameter_candidates(self) -> dict[str, tuple[float, ...]]:
+        """
+        Returns the values that each internal parameter can take, for callers that choose the
+        parameters themselves and pass them to `with_regime_parameters` (e.g. the low-degree
+        tests, which choose them per round). Empty if the regime does not choose its parameters.
+        """
+        return {}
 
     def get_rbr_levels(self, params: zkEVMParams) -> dict[str, int]:
         """
@@ -53,19 +104,81 @@ class FRIRegime:
         It maps from a label that explains which round it is for to an integer.
         If this integer is, say, k, then it means the error for this round is at
         most 2^{-k}.
+
+        The levels include the grinding before each round, i.e., `grinding_batching_phase`,
+        `grinding_commit_phase` (before every folding round) and `grinding_query_phase`.
         """
         bits = {}
+        bits |= profiling.call("batching", self.get_batching_levels, params)
+        bits |= profiling.call("commit phase", self.get_commit_levels, params)
+        bits |= profiling.call("query phase", self.get_query_phase_levels, params)
+        return bits
+
+    # The three parts of `get_rbr_levels`. They are separate, so that they can also
+    # be recomputed separately (see the incremental module).
 
-        # Compute FRI errors for batching
-        bits["FRI batching round"] = get_bits_of_security_from_error(self.get_batching_error(params))
+    def get_batching_levels(self, params: zkEVMParams) -> dict[str, int]:
+        # Compute FRI errors for batching, with the bits of security from grinding (see section 6.3 in ethSTARK)
+        log2_error = self.get_batching_log2_error(params) - params.grinding_batching_phase
+        return {"FRI batching round": get_bits_of_security_from_log2_error(log2_error)}
 
+    def get_commit_levels(self, params: zkEVMParams) -> dict[str, int]:
         # Compute FRI error for folding / commit phase
+        bits = {}
         FRI_rounds = params.FRI_rounds_n
+        commit_level = get_bits_of_security_from_log2_error(
+            self.get_commit_phase_log2_error(params) - params.grinding_commit_phase
+        )
         for i in range(FRI_rounds):
-            bits[f"FRI commit round {i+1}"] = get_bits_of_security_from_error(self.get_commit_phase_error(params))
+            bits[f"FRI commit round {i+1}"] = commit_level
+        return bits
 
+    def get_query_phase_levels(self, params: zkEVMParams) -> dict[str, int]:
         # Compute FRI error for query phase
         theta = self.get_theta(params)
-        bits["FRI query phase"] = get_bits_of_security_from_error(get_FRI_query_phase_error(theta, params.num_queries, params.grinding_query_phase))
+        return {"FRI query phase": get_bits_of_security_from_log2_error(get_FRI_query_phase_log2_error(theta, params.num_queries, params.grinding_query_phase))}
 
-        return bits
+    def get_valid_rows(self, table) -> np.ndarray:
+        """
+        Returns a boolean array that tells for each row of a `ParamTable` whether this
+        regime applies to it, i.e., whether its sanity checks hold. For a single zkEVM,
+        the sanity checks raise an AssertionError instead.
+        """
+        import numpy as np
+
+        return np.ones(len(table), dtype=bool)
+
+    def get_rbr_levels_vectorized(self, table) -> tuple[dict[str, np.ndarray], np.ndarray]:
+        """
+        Vectorized counterpart of `get_rbr_levels` for a `ParamTable`.
+
+        Returns a dictionary mapping each label to an integer array with one
+        level per row of the table, and the rows the regime applies to (see
+        `get_valid_rows`). The levels of the other rows are 0.
+
+        The commit phase error is the same for every folding round, so instead of
+        one entry per round we return a single "FRI commit round" entry, which is
+        the level of each of the `table.FRI_rounds_n` commit rounds.
+        """
+        import numpy as np
+
+        valid = self.get_valid_rows(table)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            log2_errors = self.get_rbr_log2_errors_vectorized(table)
+        levels = {
+            label: get_bits_of_security_from_log2_error(np.where(valid, log2_error, 0.0))
+            for label, log2_error in log2_errors.items()
+        }
+        return levels, valid
+
+    def get_rbr_log2_errors_vectorized(self, table) -> dict[str, np.ndarray]:
+        """
+        Same as `get_rbr_levels_vectorized`, but returns log2 of the errors, before
+        they are rounded to levels. Entries can be scalars if they are the same for all rows.
+        """
+        theta = self.get_theta(table)
+        return {
+            "FRI batching round": self.get_batching_log2_error(table) - table.grinding_batching_phase,
+            "FRI commit round": self.get_commit_phase_log2_error(table) - table.grinding_commit_phase,
+            "FRI query phase": get_FRI_query_phase_log2_error(theta, table.num_queries, table.grinding_query_phase),
+        }
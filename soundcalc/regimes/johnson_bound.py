@@ -1,14 +1,40 @@
 from __future__ import annotations
 
+import functools
+from types import SimpleNamespace
+
 from .fri_regime import FRIRegime
 from ..zkevms.zkevm import zkEVMParams
-from typing import Any
-from ..common.utils import get_rho_plus
+from typing import Any, Optional
+from ..common.utils import get_rho_plus, get_DEEP_ALI_errors, get_bits_of_security_from_log2_error
+from ..common.arrays import is_array, sqrt, ceil, log2, where
 from soundcalc.common.fri import (
+    MEMO_SIZE,
     get_johnson_parameter_m,
-    get_FRI_query_phase_error,
+    get_FRI_query_phase_log2_error,
+)
+
+# Candidate values for m, when optimizing it (see `JohnsonBoundRegime`)
+JOHNSON_M_CANDIDATES = tuple(float(m) for m in range(3, 129))
+
+# The parameters that the total security of JBR depends on, for a fixed m
+_M_OPTIMIZATION_INPUTS = (
+    "rho",
+    "trace_length",
+    "D",
+    "log2_F",
+    "max_combo",
+    "num_columns",
+    "num_polys",
+    "power_batching",
+    "AIR_max_degree",
+    "FRI_folding_factor",
+    "FRI_rounds_n",
+    "num_queries",
+    "grinding_query_phase",
+    "grinding_batching_phase",
+    "grinding_commit_phase",
 )
-import math
 
 class JohnsonBoundRegime(FRIRegime):
     """
@@ -16,49 +42,103 @@ class JohnsonBoundRegime(FRIRegime):
     The proximity parameter θ is in the range `(1 - ρ)/2 < θ < 1 - √ρ` where ρ is the rate
 
     This is Regime 2 from the RISC0 Python calculator
+
+    The Guruswami-Sudan multiplicity parameter m trades off the query phase against the
+    other rounds. By default, it is fixed (see `get_johnson_parameter_m`). With
+    `optimize_m=True`, it is chosen per zkEVM to maximize the total security level,
+    like winterfell does. Alternatively, a fixed `m` can be given.
     """
 
+    FORMULA_VERSION = 1
+
+    def __init__(self, optimize_m: bool = False, m: Optional[float] = None):
+        assert not (optimize_m and m is not None)
+        self.optimize_m = optimize_m
+        self.m = m
+        # The optimal m for the last ParamTable that we have seen, as (table, m)
+        self._table_m = None
+
     def identifier(self) -> str:
         return "JBR"
 
+    def get_regime_parameters(self, params: zkEVMParams) -> dict[str, float]:
+        """
+        Reports the chosen m, if it is optimized.
+        """
+        if not self.optimize_m:
+            return {}
+        return {"m": self._get_m(params)}
+
+    def get_regime_parameter_names(self) -> tuple[str, ...]:
+        return ("m",) if self.optimize_m else ()
+
+    def with_regime_parameters(self, regime_parameters: dict[str, float]) -> "JohnsonBoundRegime":
+        if "m" not in regime_parameters:
+            return self
+        return JohnsonBoundRegime(m=regime_parameters["m"])
+
+    def get_regime_parameter_candidates(self) -> dict[str, tuple[float, ...]]:
+        return {"m": JOHNSON_M_CANDIDATES} if self.optimize_m else {}
+
     def get_bound_on_list_size(self, params: zkEVMParams) -> int:
         """
         Returns an upper bound on the list size of this regime, i.e., the number of codewords
         a function is close to.
         """
 
+        list_size, valid = self._get_list_size(params, self._get_m(params))
+        # Sanity checks. The theta must have been selected to have this valid
+        # TODO guarantee that
+        # In a table, the rows where this fails are reported by `get_valid_rows` instead
+        if not is_array(valid):
+            assert valid
+        return list_size
+
+    def get_valid_rows(self, table) -> np.ndarray:
+        import numpy as np
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            valid = self._get_list_size(table, self._get_m(table))[1]
+        return np.broadcast_to(valid, (len(table),))
+
+    def _get_list_size(self, params: zkEVMParams, m) -> tuple[Any, Any]:
+        """
+        Returns the bound on the list size for the given m, together with a flag
+        that tells if m is valid for these parameters.
+        """
+
         # The value is from the Guruswami-Sudan decoder.
         # Concrete formulas and notation are taken from pages 16-18 of [Ha22] with
         # the final formula from Theorem 8 of [Ha22].
-        m = self._get_m()
         alpha, theta = self._get_alpha_and_theta(params.rho, m)
         r_plus = get_rho_plus(params.trace_length, params.D, params.max_combo)
-        # Sanity checks. The theta must have been selected to have this valid
-        # TODO guarantee that
-        assert theta < 1 - math.sqrt(r_plus)
+        valid = theta < 1 - sqrt(r_plus)
         m_plus = self._get_minimal_m_plus(r_plus, alpha)
-        assert theta <= 1 - math.sqrt(r_plus) * (1 + 1 / (2 * m_plus))
+        valid = valid & (theta <= 1 - sqrt(r_plus) * (1 + 1 / (2 * m_plus)))
 
         # Note: Miden computes L differently (see eps_1 of Theorem 2 of https://eprint.iacr.org/2024/1553.pdf)
         # TODO figure out the right one for Miden
         #    L_miden = m / (params.rho - (2.0 * m / params.D));
         # Small difference for RISC0 parameters:
         #  RISC0=35, Miden=64
-        return (m_plus + 0.5) / math.sqrt(r_plus)
+        return (m_plus + 0.5) / sqrt(r_plus), valid
 
     def get_theta(self, params: zkEVMParams) -> float:
         """
         Returns the theta for the query phase error.
         """
-        m = self._get_m()
+        m = self._get_m(params)
         alpha, theta = self._get_alpha_and_theta(params.rho, m)
         return theta
 
 
-    def get_batching_error(self, params: zkEVMParams) -> float:
+    def get_batching_log2_error(self, params: zkEVMParams) -> float:
         """
-        Returns the error for the FRI batching step for this regime.
+        Returns log2 of the error for the FRI batching step for this regime.
         """
+        return self._get_batching_log2_error(params, self._get_m(params))
+
+    def _get_batching_log2_error(self, params: zkEVMParams, m) -> float:
 
         # Note: the errors for correlated agreement in the following two cases differ,
         # which is related to the batching method:
@@ -75,17 +155,19 @@ class JohnsonBoundRegime(FRIRegime):
         #
         # Then easiest way to see the difference is to compare Theorems 1.5 and 1.6.
 
-        m = self._get_m()
+        # error = ((m + 0.5) ** 5) / (3 * (rho ** 1.5)) * D / F, times num_polys for power batching
         rho = params.rho
-        error = ((m + 0.5) ** 5) / (3 * (rho ** 1.5)) * (params.D) / params.F
-        if params.power_batching:
-            error *= params.num_polys
-        return error
+        log2_error = 5 * log2(m + 0.5) - log2(3 * (rho ** 1.5)) + log2(params.D) - params.log2_F
+        log2_error = where(params.power_batching, log2_error + log2(params.num_polys), log2_error)
+        return log2_error
 
-    def get_commit_phase_error(self, params: zkEVMParams) -> float:
+    def get_commit_phase_log2_error(self, params: zkEVMParams) -> float:
         """
-        Returns the error for the FRI commit phase for this regime.
+        Returns log2 of the error for the FRI commit phase for this regime.
         """
+        return self._get_commit_phase_log2_error(params, self._get_m(params))
+
+    def _get_commit_phase_log2_error(self, params: zkEVMParams, m) -> float:
 
         # See Theorem 8.3 of BCIKS20.
         # Also, seen in Theorem 2 of Ha22, and Theorem 1 of eSTARK paper.
@@ -94,9 +176,9 @@ class JohnsonBoundRegime(FRIRegime):
         # TODO Find a better formula for CBR.
 
         # TODO: check this formula carefully
-        m = self._get_m()
-        error = (2 * m + 1) * (params.D + 1) * params.FRI_folding_factor / (math.sqrt(params.rho) * params.F)
-        return error
+        # error = (2 * m + 1) * (D + 1) * FRI_folding_factor / (sqrt(rho) * F)
+        log2_error = log2((2 * m + 1) * (params.D + 1) * params.FRI_folding_factor / sqrt(params.rho)) - params.log2_F
+        return log2_error
 
 
     def _get_alpha_and_theta(self, rho: float, m: float) -> tuple[float, float]:
@@ -106,12 +188,12 @@ class JohnsonBoundRegime(FRIRegime):
         # ASN Is this a good value for eta?
 
         # eta denotes our distance from the JB
-        eta = math.sqrt(rho) / (2 * m)
+        eta = sqrt(rho) / (2 * m)
 
         # Given the above eta, we have:
         #   alpha = sqrt(rho) * (1 + 1/(2m))
         # as required by Theorem 2 of Ha22.
-        alpha = math.sqrt(rho) + eta
+        alpha = sqrt(rho) + eta
 
         # And proximity parameter theta = 1 - sqrt(rho) - eta
         #                               = 1 - sqrt(rho) * (1 + 1/ (2m) )
@@ -122,8 +204,56 @@ class JohnsonBoundRegime(FRIRegime):
     def _get_minimal_m_plus(self, r_plus: float, alpha: float) -> int:
         # ASN RISC0 rust soundness also puts max_combo in here:
         #         let m_plus = 1.0 / (params.biggest_combo * (alpha / rho_plus.sqrt() - 1.0));
-        return math.ceil(1 / (2 * (alpha / math.sqrt(r_plus) - 1)))
+        return ceil(1 / (2 * (alpha / sqrt(r_plus) - 1)))
 
-    def _get_m(self):
-        m = get_johnson_parameter_m()  # TODO DK: it is not clear if this is the right m to use. To investigate.
-        return m
+    def _get_m(self, params: zkEVMParams):
+        if self.m is not None:
+            return self.m
+        if not self.optimize_m:
+            m = get_johnson_parameter_m()  # TODO DK: it is not clear if this is the right m to use. To investigate.
+            return m
+        if is_array(params.rho):
+            if self._table_m is None or self._table_m[0] is not params:
+                self._table_m = (params, self._get_optimal_m(params.as_column_vectors())[:, 0])
+            return self._table_m[1]
+        return _get_optimal_m_cached(tuple(getattr(params, name) for name in _M_OPTIMIZATION_INPUTS))
+
+    def _get_optimal_m(self, params: zkEVMParams):
+        """
+        Returns the m from JOHNSON_M_CANDIDATES that maximizes the total level.
+
+        All candidates are evaluated at once, as an array. If params holds columns
+        (of shape (n, 1)), this returns the best m per row, with shape (n, 1).
+        """
+        import numpy as np
+
+        m = np.array(JOHNSON_M_CANDIDATES)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            list_size, valid = self._get_list_size(params, m)
+            levels = [
+                get_bits_of_security_from_log2_error(
+                    self._get_batching_log2_error(params, m) - params.grinding_batching_phase
+                ),
+                get_bits_of_security_from_log2_error(get_FRI_query_phase_log2_error(
+                    self._get_alpha_and_theta(params.rho, m)[1], params.num_queries, params.grinding_query_phase
+                )),
+            ]
+            levels += get_DEEP_ALI_errors(np.where(valid, list_size, 1.0), params).values()
+            commit_level = get_bits_of_security_from_log2_error(
+                self._get_commit_phase_log2_error(params, m) - params.grinding_commit_phase
+            )
+            levels.append(np.where(np.asarray(params.FRI_rounds_n) > 0, commit_level, np.iinfo(int).max))
+        total = np.where(valid, np.minimum.reduce(levels), np.iinfo(int).min)
+
+        # If no candidate is valid, this falls back to the first one and the sanity checks will fail
+        best = np.argmax(total, axis=-1)
+        return m[best][..., None] if total.ndim > 1 else m[best]
+
+
+@functools.lru_cache(maxsize=MEMO_SIZE)
+def _get_optimal_m_cached(inputs: tuple) -> float:
+    """
+    Memoized `JohnsonBoundRegime._get_optimal_m`, keyed by the values of _M_OPTIMIZATION_INPUTS.
+    """
+    params = SimpleNamespace(**dict(zip(_M_OPTIMIZATION_INPUTS, inputs)))
+    return float(JohnsonBoundRegime()._get_optimal_m(params))
@@ -2,6 +2,7 @@ from __future__ import annotations
 
 from .fri_regime import FRIRegime
 from ..zkevms.zkevm import zkEVMParams
+from ..common.arrays import log2, where
 
 
 class UniqueDecodingRegime(FRIRegime):
@@ -14,6 +15,8 @@ class UniqueDecodingRegime(FRIRegime):
         https://hackmd.io/@pgaf/HkKs_1ytT
     """
 
+    FORMULA_VERSION = 1
+
     def identifier(self) -> str:
         return "UDR"
 
@@ -28,9 +31,9 @@ class UniqueDecodingRegime(FRIRegime):
         theta = (1 - params.rho) / 2
         return theta
 
-    def get_batching_error(self, params: zkEVMParams) -> float:
+    def get_batching_log2_error(self, params: zkEVMParams) -> float:
         """
-        Returns the error for the FRI batching step for this regime.
+        Returns log2 of the error for the FRI batching step for this regime.
         """
 
         # Note: the errors for correlated agreement in the following two cases differ,
@@ -48,18 +51,18 @@ class UniqueDecodingRegime(FRIRegime):
         #
         # Then easiest way to see the difference is to compare Theorems 1.5 and 1.6.
 
-        error = params.D / params.F
-        if params.power_batching:
-            error *= params.num_polys
-        return error
+        # error = D / F, times num_polys for power batching
+        log2_error = log2(params.D) - params.log2_F
+        log2_error = where(params.power_batching, log2_error + log2(params.num_polys), log2_error)
+        return log2_error
 
-    def get_commit_phase_error(self, params: zkEVMParams) -> float:
+    def get_commit_phase_log2_error(self, params: zkEVMParams) -> float:
         """
-        Returns the error for the FRI commit phase for this regime.
+        Returns log2 of the error for the FRI commit phase for this regime.
         """
         D = params.D
         FRI_folding_factor = params.FRI_folding_factor
-        F = params.F
 
-        fri_folding_error = (D * (FRI_folding_factor - 1)) / F
-        return fri_folding_error
+        # fri_folding_error = (D * (FRI_folding_factor - 1)) / F
+        fri_folding_log2_error = log2(D * (FRI_folding_factor - 1)) - params.log2_F
+        return fri_folding_log2_error
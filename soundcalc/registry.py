@@ -0,0 +1,113 @@
+"""
+Registry of the zkEVM presets, security regimes and low-degree tests that can be selected by name.
+
+Entries are import paths "module:attribute", and an entry is only imported when
+it is looked up. This keeps the startup of soundcalc cheap, no matter how many
+presets there are: a command that uses one preset imports one preset.
+
+Other packages can add presets and regimes through the entry point groups
+"soundcalc.presets", "soundcalc.regimes" and "soundcalc.low_degree_tests", e.g. in
+their pyproject.toml:
+
+    [project.entry-points."soundcalc.presets"]
+    my-zkvm = "my_package.presets:MyZkvmPreset"
+
+Installed entry points are only looked up when a name is not built in, or when
+all names are listed. Built-in names take precedence over entry points.
+"""
+
+from __future__ import annotations
+
+import importlib
+from collections.abc import Mapping
+from typing import Any, Iterator
+
+
+class Registry(Mapping):
+    """
+    A mapping from names to presets (or regimes), which imports them on first access.
+    """
+
+    def __init__(self, group: str, builtins: dict[str, str]):
+        # The entry point group to look for plugins in
+        self.group = group
+        # Maps names to their import path "module:attribute"
+        self._paths = dict(builtins)
+        self._loaded: dict[str, Any] = {}
+        self._scanned = False
+
+    def register(self, name: str, target) -> None:
+        """
+        Register a preset (or regime) under `name`, given as an object or an import path.
+        Replaces any entry of the same name.
+        """
+        self._loaded.pop(name, None)
+        if isinstance(target, str):
+            self._paths[name] = target
+        else:
+            self._paths[name] = f"{target.__module__}:{target.__qualname__}"
+            self._loaded[name] = target
+
+    def _scan_entry_points(self) -> None:
+        if self._scanned:
+            return
+        self._scanned = True
+
+        from importlib.metadata import entry_points
+
+        found = entry_points()
+        if hasattr(found, "select"):
+            found = found.select(group=self.group)
+        else:
+            # Python 3.9 returns a dict of groups
+            found = found.get(self.group, ())
+        for entry_point in found:
+            self._paths.setdefault(entry_point.name, entry_point.value)
+
+    def __getitem__(self, name: str):
+        if name in self._loaded:
+            return self._loaded[name]
+        if name not in self._paths:
+            self._scan_entry_points()
+        if name not in self._paths:
+            raise KeyError(name)
+
+        module_name, _, attribute = self._paths[name].partition(":")
+        target = importlib.import_module(module_name)
+        for part in attribute.split("."):
+            target = getattr(target, part)
+        self._loaded[name] = target
+        return target
+
+    def __contains__(self, name) -> bool:
+        # Does not import anything
+        if name not in self._paths:
+            self._scan_entry_points()
+        return name in self._paths
+
+    def __iter__(self) -> Iterator[str]:
+        self._scan_entry_points()
+        return iter(list(self._paths))
+
+    def __len__(self) -> int:
+        self._scan_entry_points()
+        return len(self._paths)
+
+
+PRESETS = Registry("soundcalc.presets", {
+    "zisk": "soundcalc.zkevms.zisk:ZiskPreset",
+    "miden": "soundcalc.zkevms.miden:MidenPreset",
+    "risc0": "soundcalc.zkevms.risc0:Risc0Preset",
+})
+
+REGIMES = Registry("soundcalc.regimes", {
+    "UDR": "soundcalc.regimes.unique_decoding:UniqueDecodingRegime",
+    "JBR": "soundcalc.regimes.johnson_bound:JohnsonBoundRegime",
+    "CBR": "soundcalc.regimes.capacity_bound:CapacityBoundRegime",
+})
+
+# Low-degree tests that can be compared with FRI (see the ldt package)
+LOW_DEGREE_TESTS = Registry("soundcalc.low_degree_tests", {
+    "STIR": "soundcalc.ldt.stir:STIR",
+    "WHIR": "soundcalc.ldt.whir:WHIR",
+})
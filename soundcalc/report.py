@@ -6,6 +6,7 @@ import math
 from typing import Dict, Any, List, Tuple
 
 from soundcalc.common.utils import KIB
+from soundcalc.costs.verifier import EVM_GAS, get_verifier_cost
 
 
 
@@ -44,6 +45,9 @@ def build_markdown_report(sections) -> str:
         lines.append(f"**Parameters:**")
         lines.append(f"- Number of queries: {zkevm_params.num_queries}")
         lines.append(f"- Grinding (bits): {zkevm_params.grinding_query_phase}")
+        if zkevm_params.grinding_batching_phase or zkevm_params.grinding_commit_phase:
+            lines.append(f"- Grinding before batching (bits): {zkevm_params.grinding_batching_phase}")
+            lines.append(f"- Grinding before each folding round (bits): {zkevm_params.grinding_commit_phase}")
         # Get field name from the field extension degree and base field
         field_name = "Unknown"
         if hasattr(zkevm_params, 'field_extension_degree'):
@@ -68,6 +72,12 @@ def build_markdown_report(sections) -> str:
         proof_size_kib = zkevm_params.proof_size_bits // KIB
         lines.append(f"**Proof Size Estimate:** {proof_size_kib} KiB, where 1 KiB = 1024 bytes")
         lines.append("")
+        verifier_cost = get_verifier_cost(zkevm_params, EVM_GAS.hash_rate_bits)
+        lines.append(
+            f"**Verifier Cost Estimate:** {verifier_cost.get_cost(EVM_GAS):,.0f} {EVM_GAS.unit} on the {EVM_GAS.name} "
+            f"({verifier_cost.hashes:,.0f} hashes, {verifier_cost.field_mults:,.0f} field multiplications)"
+        )
+        lines.append("")
 
         # Show results
 
@@ -0,0 +1,104 @@
+"""
+The security levels of a zkEVM (or of a `ParamTable`) across regimes: the round-by-round
+levels of each regime, the ones of the proof system (ALI and DEEP), and their total.
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from . import profiling
+from .common.utils import get_DEEP_ALI_errors
+from .regimes.best_attack import best_attack_security
+
+if TYPE_CHECKING:
+    import numpy as np
+
+
+def get_rbr_levels_for_zkevm_and_regime(regime, params) -> dict[str, int]:
+
+    # the round-by-round errors consist of the ones for FRI and for the proof system
+    # and we also add a total, which is the minimum over all of them.
+
+    fri_levels = regime.get_rbr_levels(params)
+    list_size = profiling.call("list size", regime.get_bound_on_list_size, params)
+
+    proof_system_levels = profiling.call("DEEP-ALI", get_DEEP_ALI_errors, list_size, params)
+
+    total = min(list(fri_levels.values()) + list(proof_system_levels.values()))
+
+    # the regime might also report parameters it has chosen, such as eta for CBR
+    regime_parameters = profiling.call("regime parameters", regime.get_regime_parameters, params)
+
+    return fri_levels | proof_system_levels | {"total": total} | regime_parameters
+
+
+def get_component_levels(levels: dict) -> dict[str, int]:
+    """
+    Given the output of `get_rbr_levels_for_zkevm_and_regime`, return only the levels
+    of the individual rounds, i.e., drop the total and the regime parameters (which are floats).
+    """
+    return {
+        label: level for label, level in levels.items()
+        if label != "total" and not isinstance(level, float)
+    }
+
+
+def get_rbr_levels_for_table_and_regime(regime, table) -> tuple[dict[str, np.ndarray], np.ndarray]:
+    """
+    Vectorized counterpart of `get_rbr_levels_for_zkevm_and_regime` for a `ParamTable`.
+
+    Every entry of the result is an integer array with one level per row of the table.
+    Also returns the rows the regime applies to (see `FRIRegime.get_valid_rows`), where
+    the scalar API fails its sanity checks instead. The levels of the other rows are 0.
+    """
+    import numpy as np
+
+    fri_levels, valid = regime.get_rbr_levels_vectorized(table)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        list_size = np.where(valid, regime.get_bound_on_list_size(table), 1.0)
+
+    proof_system_levels = {
+        label: np.where(valid, level, 0) for label, level in get_DEEP_ALI_errors(list_size, table).items()
+    }
+
+    # Rows without any folding rounds have no commit round that could limit the total
+    commit_levels = np.where(table.FRI_rounds_n > 0, fri_levels["FRI commit round"], np.iinfo(int).max)
+    other_levels = [v for k, v in fri_levels.items() if k != "FRI commit round"]
+    total = np.minimum.reduce(other_levels + list(proof_system_levels.values()) + [commit_levels])
+
+    return fri_levels | proof_system_levels | {"total": total} | regime.get_regime_parameters(table), valid
+
+
+def compute_security_for_zkevm(fri_regimes: list, params) -> dict[str, dict]:
+    """
+    Compute bits of security for a single zkEVM across all security regimes.
+    """
+    results: dict[str, dict] = {}
+
+    # first all reasonable regimes
+    for fri_regime in fri_regimes:
+        rbr_errors = profiling.call(
+            fri_regime.identifier(), get_rbr_levels_for_zkevm_and_regime, fri_regime, params
+        )
+        results[fri_regime.identifier()] = rbr_errors
+
+    # now the security based on the best known attack - for reference
+    results["best attack"] = profiling.call("best attack", best_attack_security, params)
+
+    return results
+
+
+def compute_security_for_table(fri_regimes: list, table) -> dict[str, dict]:
+    """
+    Vectorized counterpart of `compute_security_for_zkevm` for a `ParamTable`.
+
+    The levels of each regime also have a boolean "valid" entry, with the rows that the
+    regime applies to (see `get_rbr_levels_for_table_and_regime`).
+    """
+    results: dict[str, dict] = {}
+    for fri_regime in fri_regimes:
+        levels, valid = get_rbr_levels_for_table_and_regime(fri_regime, table)
+        results[fri_regime.identifier()] = levels | {"valid": valid}
+    results["best attack"] = best_attack_security(table)
+    return results
@@ -0,0 +1,191 @@
+"""
+Sensitivity of the security levels to the parameters of a config.
+
+For every parameter, we take one step (e.g. halve rho, or add a query) and see
+how the bits of security of each component, the total and the proof size change.
+The bits are compared before rounding them down to levels, so that steps smaller
+than one bit are visible too.
+
+All configs and all of their steps are evaluated in one vectorized pass over a
+`ParamTable`, instead of one `compute_security_for_zkevm` call per step.
+"""
+
+from __future__ import annotations
+
+import dataclasses
+import math
+from dataclasses import dataclass
+from typing import Callable, Optional, Sequence
+
+import numpy as np
+
+from .common.fields import get_extension_field
+from .common.utils import KIB, get_ALI_and_DEEP_log2_error
+from .zkevms.param_table import ParamTable
+from .zkevms.zkevm import zkEVMConfig
+
+
+@dataclass(frozen=True)
+class Step:
+    # How the step changes the parameter, e.g. "+1"
+    description: str
+    apply: Callable[[zkEVMConfig], zkEVMConfig]
+
+
+# The parameters that sensitivities are computed for, and the step that is taken for each
+STEPS = {
+    "rho": Step("/2", lambda cfg: dataclasses.replace(cfg, rho=cfg.rho / 2)),
+    "trace_length": Step("*2", lambda cfg: dataclasses.replace(cfg, trace_length=cfg.trace_length * 2)),
+    "num_queries": Step("+1", lambda cfg: dataclasses.replace(cfg, num_queries=cfg.num_queries + 1)),
+    "num_polys": Step("+1", lambda cfg: dataclasses.replace(cfg, num_polys=cfg.num_polys + 1)),
+    "max_combo": Step("+1", lambda cfg: dataclasses.replace(cfg, max_combo=cfg.max_combo + 1)),
+    "field_extension_degree": Step("+1", lambda cfg: dataclasses.replace(
+        cfg, field=get_extension_field(cfg.field, cfg.field.field_extension_degree + 1)
+    )),
+    "grinding_query_phase": Step("+1", lambda cfg: dataclasses.replace(
+        cfg, grinding_query_phase=cfg.grinding_query_phase + 1
+    )),
+}
+
+
+@dataclass(frozen=True)
+class Sensitivity:
+    """
+    The effect of one step of a parameter.
+    """
+    parameter: str
+    step: str
+    # Change of the (unrounded) bits of security, per component and for the "total".
+    # NaN if the regime does not apply to the config after the step.
+    bits: dict[str, float]
+    # Change of the proof size, or None if it is not defined before or after the step
+    # (see `ParamTable.has_proof_size`)
+    proof_size_bits: Optional[int]
+
+    @property
+    def bits_per_KiB(self) -> Optional[float]:
+        """
+        Change of the total bits per KiB of additional proof size, or None if the proof size
+        does not change or is not defined.
+        """
+        if not self.proof_size_bits:
+            return None
+        return self.bits["total"] / (self.proof_size_bits / KIB)
+
+
+@dataclass(frozen=True)
+class SensitivityReport:
+    config: zkEVMConfig
+    regime: str
+    # The unrounded bits of security of the config, per component and for the "total"
+    bits: dict[str, float]
+    # None if the FRI layers of the config do not all have leafs
+    proof_size_bits: Optional[int]
+    sensitivities: list[Sensitivity]
+
+    def ranked(self) -> list[Sensitivity]:
+        """
+        Returns the sensitivities, with the steps that buy the most security per
+        proof size first. Steps that add security without growing the proof come
+        first, and steps that do not add security (or lead to an invalid config) come last.
+        """
+        def key(sensitivity: Sensitivity) -> float:
+            total = sensitivity.bits["total"]
+            if math.isnan(total) or sensitivity.proof_size_bits is None:
+                return -math.inf
+            if total <= 0:
+                return total
+            if sensitivity.proof_size_bits <= 0:
+                return math.inf
+            return sensitivity.bits_per_KiB
+
+        return sorted(self.sensitivities, key=key, reverse=True)
+
+
+def get_rbr_bits_for_table(regime, table: ParamTable) -> tuple[dict[str, np.ndarray], np.ndarray]:
+    """
+    Unrounded counterpart of `get_rbr_levels_for_table_and_regime`: returns -log2 of
+    the error of each component, and their minimum as "total", per row of the table,
+    and the rows the regime applies to. The bits of the other rows are NaN.
+    """
+    valid = regime.get_valid_rows(table)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        log2_errors = regime.get_rbr_log2_errors_vectorized(table)
+        list_size = np.where(valid, regime.get_bound_on_list_size(table), 1.0)
+    log2_errors["ALI"], log2_errors["DEEP"] = get_ALI_and_DEEP_log2_error(list_size, table)
+
+    bits = {label: np.broadcast_to(-np.asarray(e, dtype=float), (len(table),)) for label, e in log2_errors.items()}
+    # Rows without any folding rounds have no commit round that could limit the total
+    bits["FRI commit round"] = np.where(table.FRI_rounds_n > 0, bits["FRI commit round"], np.inf)
+    bits["total"] = np.minimum.reduce(list(bits.values()))
+    return {label: np.where(valid, values, np.nan) for label, values in bits.items()}, valid
+
+
+def compute_sensitivities(
+    configs: Sequence[zkEVMConfig],
+    regime,
+    parameters: Sequence[str] = tuple(STEPS),
+) -> list[SensitivityReport]:
+    """
+    Compute the sensitivity of the security levels of each config to each of the given parameters.
+    """
+    for parameter in parameters:
+        if parameter not in STEPS:
+            raise ValueError(f"unknown parameter {parameter!r}, choose from {list(STEPS)}")
+
+    # One row per config, followed by one row per step of that config
+    rows = []
+    for cfg in configs:
+        rows.append(cfg)
+        rows.extend(STEPS[parameter].apply(cfg) for parameter in parameters)
+
+    table = ParamTable.from_configs(rows)
+    bits, _ = get_rbr_bits_for_table(regime, table)
+    proof_size_bits = table.proof_size_bits
+
+    def get_proof_size_bits(i: int, base: Optional[int] = None) -> Optional[int]:
+        # The proof size of row i (relative to row base, if given), or None if it is not defined
+        size = proof_size_bits[i] - (0 if base is None else proof_size_bits[base])
+        return None if np.isnan(size) else int(size)
+
+    reports = []
+    stride = 1 + len(parameters)
+    for i, cfg in enumerate(configs):
+        base = i * stride
+        sensitivities = []
+        for j, parameter in enumerate(parameters, start=1):
+            sensitivities.append(Sensitivity(
+                parameter=parameter,
+                step=STEPS[parameter].description,
+                bits={label: float(values[base + j] - values[base]) for label, values in bits.items()},
+                proof_size_bits=get_proof_size_bits(base + j, base),
+            ))
+        reports.append(SensitivityReport(
+            config=cfg,
+            regime=regime.identifier(),
+            bits={label: float(values[base]) for label, values in bits.items()},
+            proof_size_bits=get_proof_size_bits(base),
+            sensitivities=sensitivities,
+        ))
+    return reports
+
+
+def format_sensitivity_report(report: SensitivityReport) -> str:
+    """
+    Human-readable table of a sensitivity report, ranked as in `SensitivityReport.ranked`.
+    """
+    labels = [label for label in report.bits if label != "total"]
+    proof_size = "invalid" if report.proof_size_bits is None else f"{report.proof_size_bits // KIB} KiB"
+    lines = [
+        f"{report.config.name} in {report.regime}: total {report.bits['total']:.2f} bits, proof size {proof_size}",
+        f"{'parameter':<26} {'Δtotal':>8} {'ΔKiB':>8} {'bits/KiB':>9}  " + " ".join(f"{label:>18}" for label in labels),
+    ]
+    for sensitivity in report.ranked():
+        bits_per_KiB = sensitivity.bits_per_KiB
+        KiB = "—" if sensitivity.proof_size_bits is None else f"{sensitivity.proof_size_bits / KIB:+.1f}"
+        lines.append(
+            f"{sensitivity.parameter + ' ' + sensitivity.step:<26} {sensitivity.bits['total']:>+8.2f} "
+            f"{KiB:>8} {'—' if bits_per_KiB is None else f'{bits_per_KiB:+.3f}':>9}  "
+            + " ".join(f"{sensitivity.bits[label]:>+18.2f}" for label in labels)
+        )
+    return "\n".join(lines)
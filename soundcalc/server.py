@@ -0,0 +1,272 @@
+"""
+A long-running local query service, so that dashboards and bots do not have to
+start a new process (and recompute everything) per query.
+
+The service speaks a minimal HTTP/1.1 with JSON bodies, over TCP or a Unix socket.
+Connections are kept alive, so a client can send many requests over one of them.
+
+    GET  /health      -> {"status": "ok", ...counters}
+    GET  /presets     -> {"presets": [...], "regimes": [...]}
+    POST /evaluate    {"config": {...}, "regimes": ["UDR", "JBR"]}
+                      -> {"name": ..., "proof_size_bits": ..., "results": {...}}
+    POST /batch       {"configs": [{...}, ...], "regimes": [...]}
+                      -> {"results": [{...}, ...]}
+
+Configs are catalog entries (see the catalog module), so they can start from a
+preset, e.g. {"preset": "risc0", "num_queries": 60}. Regimes default to UDR and
+JBR. Results are as in `compute_security_for_zkevm`, where a regime maps to None
+if the config is outside its range. In a batch, an invalid config (or one that
+cannot be evaluated) gets {"error": ...} instead of failing the whole batch.
+
+The regimes, the preset configs, the memos of the formulas and the results of
+recent configs stay in memory between requests.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import collections
+import json
+from http import HTTPStatus
+from typing import Any, Optional
+
+from .catalog import parse_config
+from .registry import PRESETS, REGIMES
+from .sweep import evaluate_config
+from .zkevms.zkevm import zkEVMConfig
+
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+
+DEFAULT_REGIMES = ("UDR", "JBR")
+
+# Requests with larger bodies are rejected
+MAX_BODY_SIZE = 64 * 1024 * 1024
+
+# Number of results that are kept in memory, for configs that are asked for again
+RESULT_CACHE_SIZE = 1 << 16
+
+
+class RequestError(ValueError):
+    """
+    A request that cannot be answered, with the HTTP status to answer it with.
+    """
+
+    def __init__(self, status: HTTPStatus, message: str):
+        self.status = status
+        super().__init__(message)
+
+
+class QueryService:
+    """
+    Answers the requests of the server. Independent of the transport, so that
+    it can also be used (and tested) directly.
+    """
+
+    def __init__(self, result_cache_size: int = RESULT_CACHE_SIZE):
+        self.result_cache_size = result_cache_size
+        self.requests = 0
+        self.configs_evaluated = 0
+        self._regimes: dict[str, Any] = {}
+        # Maps (config, regime identifiers) to results, least recently used first
+        self._results: collections.OrderedDict = collections.OrderedDict()
+
+    def get_regimes(self, identifiers) -> list:
+        if not isinstance(identifiers, list) or not all(isinstance(i, str) for i in identifiers):
+            raise RequestError(HTTPStatus.BAD_REQUEST, f"regimes must be a list of names, got {identifiers!r}")
+        regimes = []
+        for identifier in identifiers:
+            if identifier not in self._regimes:
+                if identifier not in REGIMES:
+                    raise RequestError(HTTPStatus.BAD_REQUEST, f"unknown regime {identifier!r}")
+                self._regimes[identifier] = REGIMES[identifier]()
+            regimes.append(self._regimes[identifier])
+        return regimes
+
+    def evaluate(self, cfg: zkEVMConfig, identifiers: list[str]) -> dict:
+        """
+        Returns the proof size and levels of a config, from memory if it was asked for before.
+        """
+        key = (cfg, tuple(identifiers))
+        if key in self._results:
+            self._results.move_to_end(key)
+            return self._results[key]
+
+        proof_size_bits, results = evaluate_config(cfg, self.get_regimes(identifiers))
+        self.configs_evaluated += 1
+        answer = {"name": cfg.name, "proof_size_bits": proof_size_bits, "results": results}
+        self._results[key] = answer
+        if len(self._results) > self.result_cache_size:
+            self._results.popitem(last=False)
+        return answer
+
+    def _evaluate_entry(self, entry, identifiers: list[str]) -> dict:
+        try:
+            cfg = parse_config(entry)
+        except ValueError as e:
+            raise RequestError(HTTPStatus.BAD_REQUEST, f"invalid config: {e}") from None
+        try:
+            return self.evaluate(cfg, identifiers)
+        except Exception as e:
+            # e.g. a sanity check of the formulas that the validation of the config does not cover
+            raise RequestError(
+                HTTPStatus.UNPROCESSABLE_ENTITY, f"cannot evaluate config: {type(e).__name__}: {e}"
+            ) from None
+
+    def handle(self, method: str, path: str, body: bytes) -> tuple[HTTPStatus, dict]:
+        """
+        Returns the status and the JSON payload of the answer to a request.
+        """
+        self.requests += 1
+        try:
+            return HTTPStatus.OK, self._route(method, path, body)
+        except RequestError as e:
+            return e.status, {"error": str(e)}
+        except Exception as e:
+            # Answer anyway, as the connection would otherwise be closed without a response
+            return HTTPStatus.INTERNAL_SERVER_ERROR, {"error": f"internal error: {type(e).__name__}: {e}"}
+
+    def _route(self, method: str, path: str, body: bytes) -> dict:
+        routes = {
+            "/health": ("GET", self._health),
+            "/presets": ("GET", self._presets),
+            "/evaluate": ("POST", self._evaluate),
+            "/batch": ("POST", self._batch),
+        }
+        if path not in routes:
+            raise RequestError(HTTPStatus.NOT_FOUND, f"unknown path {path!r}, choose from {list(routes)}")
+        expected_method, handler = routes[path]
+        if method != expected_method:
+            raise RequestError(HTTPStatus.METHOD_NOT_ALLOWED, f"{path} only supports {expected_method}")
+        if method == "GET":
+            return handler()
+
+        try:
+            request = json.loads(body)
+        except ValueError as e:
+            raise RequestError(HTTPStatus.BAD_REQUEST, f"invalid JSON: {e}") from None
+        if not isinstance(request, dict):
+            raise RequestError(HTTPStatus.BAD_REQUEST, "the request must be a JSON object")
+        return handler(request)
+
+    def _health(self) -> dict:
+        return {
+            "status": "ok",
+            "requests": self.requests,
+            "configs_evaluated": self.configs_evaluated,
+            "results_cached": len(self._results),
+        }
+
+    def _presets(self) -> dict:
+        return {"presets": sorted(PRESETS), "regimes": sorted(REGIMES)}
+
+    def _evaluate(self, request: dict) -> dict:
+        identifiers = request.get("regimes", list(DEFAULT_REGIMES))
+        self.get_regimes(identifiers)
+        if "config" not in request:
+            raise RequestError(HTTPStatus.BAD_REQUEST, "missing key 'config'")
+        return self._evaluate_entry(request["config"], identifiers)
+
+    def _batch(self, request: dict) -> dict:
+        identifiers = request.get("regimes", list(DEFAULT_REGIMES))
+        self.get_regimes(identifiers)
+        entries = request.get("configs")
+        if not isinstance(entries, list):
+            raise RequestError(HTTPStatus.BAD_REQUEST, "'configs' must be a list of configs")
+
+        results = []
+        for entry in entries:
+            try:
+                results.append(self._evaluate_entry(entry, identifiers))
+            except RequestError as e:
+                results.append({"error": str(e)})
+        return {"results": results}
+
+
+async def _read_request(reader: asyncio.StreamReader) -> Optional[tuple[str, str, dict, bytes]]:
+    """
+    Returns the method, path, headers and body of the next request, or None at the end of the connection.
+    """
+    request_line = await reader.readline()
+    if not request_line.strip():
+        return None
+    method, path, version = request_line.decode("latin-1").split()
+
+    headers = {"version": version}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+
+    length = int(headers.get("content-length", 0))
+    if length > MAX_BODY_SIZE:
+        raise RequestError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, f"bodies are limited to {MAX_BODY_SIZE} bytes")
+    body = await reader.readexactly(length) if length else b""
+    return method, path.split("?")[0], headers, body
+
+
+def _format_response(status: HTTPStatus, payload: dict, keep_alive: bool) -> bytes:
+    body = json.dumps(payload).encode()
+    head = (
+        f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+        f"Content-Type: application/json\r\n"
+        f"Content-Length: {len(body)}\r\n"
+    )
+    if not keep_alive:
+        head += "Connection: close\r\n"
+    return (head + "\r\n").encode("latin-1") + body
+
+
+async def _handle_connection(service: QueryService, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+    try:
+        while True:
+            try:
+                request = await _read_request(reader)
+            except RequestError as e:
+                writer.write(_format_response(e.status, {"error": str(e)}, keep_alive=False))
+                break
+            except ValueError:
+                writer.write(_format_response(HTTPStatus.BAD_REQUEST, {"error": "malformed request"}, keep_alive=False))
+                break
+            if request is None:
+                break
+
+            method, path, headers, body = request
+            keep_alive = headers["version"] == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+            # Evaluation is CPU-bound and fast, so it runs right in the event loop
+            status, payload = service.handle(method, path, body)
+            writer.write(_format_response(status, payload, keep_alive))
+            await writer.drain()
+            if not keep_alive:
+                break
+    except (ConnectionError, asyncio.IncompleteReadError):
+        pass
+    finally:
+        writer.close()
+
+
+async def _serve(service: QueryService, host: str, port: int, socket_path: Optional[str]) -> None:
+    def handle(reader, writer):
+        return _handle_connection(service, reader, writer)
+
+    if socket_path is not None:
+        server = await asyncio.start_unix_server(handle, path=socket_path)
+        print(f"serving on unix socket {socket_path}", flush=True)
+    else:
+        server = await asyncio.start_server(handle, host, port)
+        print(f"serving on http://{host}:{port}", flush=True)
+    async with server:
+        await server.serve_forever()
+
+
+def serve(host: str = DEFAULT_HOST, port: int = DEFAULT_PORT, socket_path: Optional[str] = None) -> None:
+    """
+    Run the query service until interrupted, on a TCP port or (with `socket_path`) on a Unix socket.
+    """
+    try:
+        asyncio.run(_serve(QueryService(), host, port, socket_path))
+    except KeyboardInterrupt:
+        pass
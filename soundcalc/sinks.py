@@ -0,0 +1,217 @@
+"""
+Streaming output of sweep results, to JSONL, CSV or chunked columnar (.npz) files.
+
+Results are written as they are produced, and only a bounded number of them is
+held in memory. Files are flushed regularly, so that other tools can start
+reading them before the sweep has finished.
+"""
+
+from __future__ import annotations
+
+import csv
+import dataclasses
+import json
+import os
+from typing import Optional, TextIO
+
+from .common.fields import FieldParams
+from .sweep import SweepResult
+from .zkevms.zkevm import zkEVMConfig
+
+
+# Output formats, by name and by file extension
+SINK_FORMATS = ("jsonl", "csv", "npz")
+
+# Number of results after which text files are flushed
+FLUSH_EVERY = 1024
+
+# The levels of a regime in the flat (CSV and npz) rows. All commit rounds have
+# the same level, so they are represented by a single "FRI commit round" column.
+LEVEL_LABELS = (
+    "FRI batching round",
+    "FRI commit round",
+    "FRI query phase",
+    "ALI",
+    "DEEP",
+    "total",
+)
+
+CONFIG_COLUMNS = tuple(field.name for field in dataclasses.fields(zkEVMConfig))
+
+
+def get_result_columns(regimes: list) -> list[str]:
+    """
+    Returns the columns of the flat rows for the given regimes (see `get_result_row`).
+    """
+    columns = ["index", *CONFIG_COLUMNS, "proof_size_bits"]
+    for regime in regimes:
+        labels = LEVEL_LABELS + regime.get_regime_parameter_names()
+        columns.extend(f"{regime.identifier()}/{label}" for label in labels)
+    columns.append("best attack")
+    return columns
+
+
+def _get_config_dict(cfg: zkEVMConfig) -> dict:
+    config = {}
+    for name in CONFIG_COLUMNS:
+        value = getattr(cfg, name)
+        config[name] = value.name if isinstance(value, FieldParams) else value
+    return config
+
+
+def get_result_row(result: SweepResult) -> dict:
+    """
+    Flatten a sweep result into one value per column of `get_result_columns`.
+
+    Levels are keyed as "<regime>/<label>". The levels of a regime are missing
+    if the config is outside the range of the regime, and the commit round
+    level is missing if there are no folding rounds.
+    """
+    row = {"index": result.index, **_get_config_dict(result.config), "proof_size_bits": result.proof_size_bits}
+    for identifier, levels in result.results.items():
+        if not isinstance(levels, dict):
+            if levels is not None:
+                row[identifier] = levels
+            continue
+        for label, level in levels.items():
+            if label.startswith("FRI commit round"):
+                label = "FRI commit round"
+            row[f"{identifier}/{label}"] = level
+    return row
+
+
+class ResultSink:
+    """
+    Base class of the sinks. Sinks are context managers, and closing them writes
+    out everything that is still buffered.
+    """
+
+    def write(self, result: SweepResult) -> None:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        pass
+
+    def __enter__(self) -> "ResultSink":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+class JSONLSink(ResultSink):
+    """
+    Writes one JSON object per result and line, with the full round-by-round levels.
+    """
+
+    def __init__(self, file: TextIO):
+        self.file = file
+        self._unflushed = 0
+
+    def write(self, result: SweepResult) -> None:
+        record = {
+            "index": result.index,
+            "config": _get_config_dict(result.config),
+            "proof_size_bits": result.proof_size_bits,
+            "results": result.results,
+        }
+        self.file.write(json.dumps(record) + "\n")
+        self._unflushed += 1
+        if self._unflushed >= FLUSH_EVERY:
+            self.file.flush()
+            self._unflushed = 0
+
+    def close(self) -> None:
+        self.file.close()
+
+
+class CSVSink(ResultSink):
+    """
+    Writes one row per result, with the columns of `get_result_columns`.
+    Missing levels, and the proof size of invalid configs, are left empty.
+    """
+
+    def __init__(self, file: TextIO, regimes: list):
+        self.file = file
+        self._writer = csv.DictWriter(file, fieldnames=get_result_columns(regimes), restval="")
+        self._writer.writeheader()
+        self._unflushed = 0
+
+    def write(self, result: SweepResult) -> None:
+        self._writer.writerow(get_result_row(result))
+        self._unflushed += 1
+        if self._unflushed >= FLUSH_EVERY:
+            self.file.flush()
+            self._unflushed = 0
+
+    def close(self) -> None:
+        self.file.close()
+
+
+class NPZSink(ResultSink):
+    """
+    Writes the results into a directory of columnar chunks `part-00000.npz`, ...,
+    each holding one array per column of `get_result_columns`.
+
+    A chunk is written once `chunk_size` results have been collected, and appears
+    atomically, so readers never see a partial chunk. Missing levels, and the proof
+    size of invalid configs, are NaN.
+    """
+
+    def __init__(self, directory: str, regimes: list, chunk_size: int = 1 << 16):
+        self.directory = directory
+        self.columns = get_result_columns(regimes)
+        self.chunk_size = chunk_size
+        self._rows: list[dict] = []
+        self._num_parts = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def write(self, result: SweepResult) -> None:
+        self._rows.append(get_result_row(result))
+        if len(self._rows) >= self.chunk_size:
+            self._write_part()
+
+    def close(self) -> None:
+        if self._rows:
+            self._write_part()
+
+    def _write_part(self) -> None:
+        import numpy as np
+
+        arrays = {}
+        for column in self.columns:
+            values = [row.get(column) for row in self._rows]
+            if "/" in column or column in ("best attack", "proof_size_bits"):
+                # levels and regime parameters, and the proof size, which is missing for invalid configs
+                arrays[column] = np.array([np.nan if value is None else value for value in values], dtype=float)
+            else:
+                arrays[column] = np.array(values)
+
+        path = os.path.join(self.directory, f"part-{self._num_parts:05d}.npz")
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            np.savez(f, **arrays)
+        os.replace(tmp_path, path)
+        self._num_parts += 1
+        self._rows = []
+
+
+def open_sink(path: str, regimes: list, format: Optional[str] = None) -> ResultSink:
+    """
+    Open a sink for writing results to `path`.
+
+    The format defaults to the extension of `path`, where a path without
+    extension is taken to be a directory of npz chunks.
+    """
+    if format is None:
+        extension = os.path.splitext(path)[1].lstrip(".")
+        format = extension or "npz"
+    if format not in SINK_FORMATS:
+        raise ValueError(f"unknown output format {format!r}, choose from {SINK_FORMATS}")
+
+    if format == "npz":
+        return NPZSink(path, regimes)
+    file = open(path, "w", encoding="utf-8", newline="")
+    if format == "jsonl":
+        return JSONLSink(file)
+    return CSVSink(file, regimes)
@@ -0,0 +1,268 @@
+"""
+Inverse questions: how many queries (and how much grinding) does a zkEVM need
+to reach a target security level? And how should a budget of grinding be
+distributed across the rounds?
+"""
+
+from __future__ import annotations
+
+import dataclasses
+import heapq
+import math
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+from .common.fri import get_FRI_num_queries_for_level
+from .costs.prover import get_expected_grinding_hashes
+from .security import get_rbr_levels_for_zkevm_and_regime, get_component_levels
+from .zkevms.zkevm import zkEVMParams
+
+
+# Upper limit for the number of queries when searching without a closed form
+MAX_NUM_QUERIES = 1 << 16
+
+
+@dataclass(frozen=True)
+class QuerySolution:
+    """
+    The smallest number of queries that meets a target, for a given amount of grinding.
+    """
+    num_queries: int
+    grinding_query_phase: int
+    # Round-by-round levels for this solution (as in `get_rbr_levels_for_zkevm_and_regime`)
+    levels: dict[str, int]
+    # The component with the lowest level, i.e., the one that caps the total
+    bottleneck: str
+    # False if some component other than the query phase stays below the target,
+    # which no number of queries can fix
+    meets_target: bool
+
+
+def get_bottleneck(levels: dict[str, int]) -> str:
+    """
+    Returns the label of the component with the lowest level.
+    """
+    components = get_component_levels(levels)
+    return min(components, key=components.get)
+
+
+def _replace(params: zkEVMParams, **changes) -> zkEVMParams:
+    return zkEVMParams(dataclasses.replace(params.cfg, **changes))
+
+
+def _bisect_min_num_queries(level_of: Callable[[int], int], target_bits: int) -> Optional[int]:
+    """
+    Find the smallest s with level_of(s) >= target_bits, assuming level_of is non-decreasing.
+    Returns None if no s up to MAX_NUM_QUERIES works.
+    """
+    hi = 1
+    while level_of(hi) < target_bits:
+        if hi >= MAX_NUM_QUERIES:
+            return None
+        hi = min(2 * hi, MAX_NUM_QUERIES)
+    lo = 1
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if level_of(mid) >= target_bits:
+            hi = mid
+        else:
+            lo = mid + 1
+    return lo
+
+
+def solve_num_queries(
+    params: zkEVMParams,
+    regime,
+    target_bits: int,
+    grinding_bits: Optional[int] = None,
+) -> Optional[QuerySolution]:
+    """
+    Returns the smallest number of queries such that the FRI query phase reaches
+    `target_bits` in the given regime, together with the resulting levels.
+
+    Grinding defaults to the one of `params`. We use the closed form inversion of
+    the query phase error, and fall back to bisection if it is not applicable.
+    Returns None if the query phase cannot reach the target at all.
+    """
+    if grinding_bits is None:
+        grinding_bits = params.grinding_query_phase
+    params = _replace(params, grinding_query_phase=grinding_bits)
+
+    def level_of(num_queries: int) -> int:
+        levels = regime.get_rbr_levels(_replace(params, num_queries=num_queries))
+        return levels["FRI query phase"]
+
+    theta = regime.get_theta(params)
+    num_queries = get_FRI_num_queries_for_level(theta, target_bits, grinding_bits)
+    # Accept the closed form only if it is indeed minimal (it may be off due to rounding)
+    if num_queries is None or level_of(num_queries) < target_bits or (
+        num_queries > 1 and level_of(num_queries - 1) >= target_bits
+    ):
+        num_queries = _bisect_min_num_queries(level_of, target_bits)
+        if num_queries is None:
+            return None
+
+    levels = get_rbr_levels_for_zkevm_and_regime(regime, _replace(params, num_queries=num_queries))
+    return QuerySolution(
+        num_queries=num_queries,
+        grinding_query_phase=grinding_bits,
+        levels=levels,
+        bottleneck=get_bottleneck(levels),
+        meets_target=levels["total"] >= target_bits,
+    )
+
+
+def solve_grinding_split(
+    params: zkEVMParams,
+    regime,
+    target_bits: int,
+    max_grinding_bits: int,
+) -> list[QuerySolution]:
+    """
+    Returns the trade-off between queries and query phase grinding for reaching `target_bits`.
+
+    For each amount of grinding from 0 to `max_grinding_bits`, we compute the smallest
+    number of queries. Amounts of grinding that do not save any query are skipped.
+    """
+    solutions = []
+    for grinding_bits in range(max_grinding_bits + 1):
+        solution = solve_num_queries(params, regime, target_bits, grinding_bits)
+        if solution is None:
+            continue
+        if solutions and solution.num_queries >= solutions[-1].num_queries:
+            continue
+        solutions.append(solution)
+    return solutions
+
+
+def format_query_solution(solution: QuerySolution) -> str:
+    """
+    One-line human-readable summary of a solution.
+    """
+    status = "meets target" if solution.meets_target else "target not reachable"
+    return (
+        f"num_queries={solution.num_queries} grinding={solution.grinding_query_phase} "
+        f"total={solution.levels['total']} bottleneck={solution.bottleneck!r} ({status})"
+    )
+
+
+# The zkEVMConfig fields of the grinding before each kind of round, and the labels of their levels.
+# The commit rounds are labeled "FRI commit round 1", "FRI commit round 2", ..., and share one amount of grinding.
+GRINDING_ROUNDS = {
+    "grinding_batching_phase": "FRI batching round",
+    "grinding_commit_phase": "FRI commit round",
+    "grinding_query_phase": "FRI query phase",
+}
+
+
+@dataclass(frozen=True)
+class GrindingAllocation:
+    """
+    A distribution of grinding bits across the rounds, as found by `optimize_grinding`.
+    """
+    grinding_batching_phase: int
+    grinding_commit_phase: int
+    grinding_query_phase: int
+    # Expected number of hashes of all grinding, where the commit phase grinding is paid once per folding round
+    expected_hashes: float
+    # Round-by-round levels for this allocation (as in `get_rbr_levels_for_zkevm_and_regime`)
+    levels: dict[str, int]
+    # The component with the lowest level, i.e., the one that caps the total
+    bottleneck: str
+
+
+def _get_grinding_field(label: str) -> Optional[str]:
+    """
+    Returns the zkEVMConfig field of the grinding before the round with the given label, if any.
+    """
+    for name, round_label in GRINDING_ROUNDS.items():
+        if label.startswith(round_label):
+            return name
+    return None
+
+
+def _get_grinding_hashes(params: zkEVMParams, allocation: dict[str, int]) -> float:
+    return sum(
+        float(get_expected_grinding_hashes(bits)) * (params.FRI_rounds_n if name == "grinding_commit_phase" else 1)
+        for name, bits in allocation.items()
+    )
+
+
+def optimize_grinding(params: zkEVMParams, regime, budget_hashes: float) -> GrindingAllocation:
+    """
+    Distribute a budget of expected grinding hashes across the batching, commit and
+    query rounds, such that the total level is as high as possible, and the expected
+    hashes (i.e., the prover's proof of work time) are as low as possible for that total.
+
+    The total is the minimum over all rounds, and one bit of grinding raises the level
+    of its round by exactly one. So we keep the levels of the rounds in a priority queue,
+    and repeatedly raise all rounds at the lowest level by one bit, as long as the budget
+    allows raising all of them (raising only some would not change the total). We stop
+    when the lowest level is one that grinding cannot raise (e.g. ALI or DEEP). Each bit
+    of commit phase grinding is paid once per folding round.
+
+    This replaces the grinding of `params`. Regimes that choose their internal parameters
+    per config (e.g. JBR with `optimize_m`) may choose different ones for the allocation,
+    so its levels are recomputed in full at the end.
+    """
+    params = _replace(params, **dict.fromkeys(GRINDING_ROUNDS, 0))
+    levels = get_rbr_levels_for_zkevm_and_regime(regime, params)
+
+    # The highest total that grinding can reach, and the lowest level of each kind of round
+    cap = math.inf
+    round_levels: dict[str, int] = {}
+    for label, level in get_component_levels(levels).items():
+        name = _get_grinding_field(label)
+        if name is None:
+            cap = min(cap, level)
+        else:
+            round_levels[name] = min(level, round_levels.get(name, level))
+
+    multiplicity = {name: params.FRI_rounds_n if name == "grinding_commit_phase" else 1 for name in GRINDING_ROUNDS}
+    allocation = dict.fromkeys(GRINDING_ROUNDS, 0)
+    spent = 0.0
+    queue = [(level, name) for name, level in round_levels.items()]
+    heapq.heapify(queue)
+    while queue and queue[0][0] < cap:
+        level = queue[0][0]
+        lowest = []
+        while queue and queue[0][0] == level:
+            lowest.append(heapq.heappop(queue)[1])
+        cost = sum(
+            multiplicity[name] * float(
+                get_expected_grinding_hashes(allocation[name] + 1) - get_expected_grinding_hashes(allocation[name])
+            )
+            for name in lowest
+        )
+        if spent + cost > budget_hashes:
+            break
+        spent += cost
+        for name in lowest:
+            allocation[name] += 1
+            heapq.heappush(queue, (level + 1, name))
+
+    params = _replace(params, **allocation)
+    levels = get_rbr_levels_for_zkevm_and_regime(regime, params)
+    return GrindingAllocation(
+        **allocation,
+        expected_hashes=_get_grinding_hashes(params, allocation),
+        levels=levels,
+        bottleneck=get_bottleneck(levels),
+    )
+
+
+def format_grinding_allocation(allocation: GrindingAllocation, machine=None) -> str:
+    """
+    One-line human-readable summary of an allocation. With a `MachineProfile`, this
+    includes the expected time of the grinding.
+    """
+    line = (
+        f"grinding_batching_phase={allocation.grinding_batching_phase} "
+        f"grinding_commit_phase={allocation.grinding_commit_phase} "
+        f"grinding_query_phase={allocation.grinding_query_phase} "
+        f"total={allocation.levels['total']} bottleneck={allocation.bottleneck!r} "
+        f"expected_hashes={allocation.expected_hashes:.4g}"
+    )
+    if machine is not None:
+        line += f" ({allocation.expected_hashes / machine.grinding_hashes_per_second:.3g}s on {machine.name})"
+    return line
@@ -0,0 +1,207 @@
+"""
+Parameter sweeps: evaluate many variants of a zkEVM config across all cores.
+"""
+
+from __future__ import annotations
+
+import collections
+import dataclasses
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from fractions import Fraction
+from typing import Iterable, Iterator, Optional, Sequence
+
+from . import profiling
+from .common.fields import FIELDS
+from .common.utils import KIB
+from .security import get_rbr_levels_for_zkevm_and_regime
+from .regimes.best_attack import best_attack_security
+from .zkevms.zkevm import zkEVMConfig, zkEVMParams
+
+
+# The zkEVMConfig fields that can be swept over
+SWEEP_AXES = (
+    "rho",
+    "num_queries",
+    "FRI_folding_factor",
+    "FRI_early_stop_degree",
+    "field",
+    "grinding_query_phase",
+    "grinding_batching_phase",
+    "grinding_commit_phase",
+)
+
+
+@dataclass(frozen=True)
+class SweepResult:
+    """
+    The outcome of evaluating one config of a sweep.
+    """
+    # Position of the config in the (lazily expanded) Cartesian product
+    index: int
+    config: zkEVMConfig
+    # None if the config is invalid, e.g. if its last FRI layer has no leafs. All results are None then.
+    proof_size_bits: Optional[int]
+    # Maps each regime identifier to its round-by-round levels (as in `compute_security_for_zkevm`).
+    # A regime maps to None if the config is outside the range where the regime's analysis applies.
+    results: dict[str, Optional[dict]]
+
+
+def iter_sweep_configs(base: zkEVMConfig, axes: dict[str, Sequence]) -> Iterator[zkEVMConfig]:
+    """
+    Lazily expand the Cartesian product of the given axes into configs.
+
+    `axes` maps names from SWEEP_AXES to the values to try. Fields that are not
+    swept keep their value from `base`. The last axis varies fastest.
+    """
+    for name in axes:
+        if name not in SWEEP_AXES:
+            raise ValueError(f"cannot sweep over {name!r}, choose from {SWEEP_AXES}")
+
+    names = list(axes)
+    for values in itertools.product(*(axes[name] for name in names)):
+        yield dataclasses.replace(base, **dict(zip(names, values)))
+
+
+def evaluate_config(cfg: zkEVMConfig, regimes: list) -> tuple[Optional[int], dict[str, Optional[dict]]]:
+    """
+    Compute the proof size and the security levels of a single config.
+
+    The proof size is None if the config is invalid, and so is every result.
+    """
+    return profiling.call(cfg.name, _evaluate_config, cfg, regimes)
+
+
+def _evaluate_config(cfg: zkEVMConfig, regimes: list) -> tuple[Optional[int], dict[str, Optional[dict]]]:
+    try:
+        params = zkEVMParams(cfg)
+        proof_size_bits = params.proof_size_bits
+    except AssertionError:
+        # the sanity checks of the proof size failed, e.g. as a FRI layer has no leafs
+        results = {regime.identifier(): None for regime in regimes}
+        results["best attack"] = None
+        return None, results
+
+    results: dict[str, Optional[dict]] = {}
+    for regime in regimes:
+        try:
+            results[regime.identifier()] = profiling.call(
+                regime.identifier(), get_rbr_levels_for_zkevm_and_regime, regime, params
+            )
+        except AssertionError:
+            # the sanity checks of the regime failed for these parameters
+            results[regime.identifier()] = None
+    results["best attack"] = profiling.call("best attack", best_attack_security, params)
+    return proof_size_bits, results
+
+
+def _evaluate_chunk(start: int, configs: list[zkEVMConfig], regimes: list) -> list[SweepResult]:
+    chunk = []
+    for offset, cfg in enumerate(configs):
+        proof_size_bits, results = evaluate_config(cfg, regimes)
+        chunk.append(SweepResult(start + offset, cfg, proof_size_bits, results))
+    return chunk
+
+
+def _chunked(configs: Iterable[zkEVMConfig], chunk_size: int) -> Iterator[tuple[int, list[zkEVMConfig]]]:
+    iterator = iter(configs)
+    start = 0
+    while True:
+        chunk = list(itertools.islice(iterator, chunk_size))
+        if not chunk:
+            return
+        yield start, chunk
+        start += len(chunk)
+
+
+def run_sweep(
+    configs: Iterable[zkEVMConfig],
+    regimes: list,
+    max_workers: Optional[int] = None,
+    chunk_size: int = 256,
+) -> Iterator[SweepResult]:
+    """
+    Evaluate all configs across a pool of processes and yield the results.
+
+    Configs are consumed lazily and dispatched in chunks of `chunk_size`. Only a
+    bounded number of chunks is in flight at any time, so arbitrarily large sweeps
+    can be streamed. Results are yielded in the order of `configs`, independently
+    of the number of workers.
+
+    With `max_workers=1`, everything is evaluated in the current process.
+    """
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    chunks = _chunked(configs, chunk_size)
+
+    if max_workers == 1:
+        for start, chunk in chunks:
+            yield from _evaluate_chunk(start, chunk, regimes)
+        return
+
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        in_flight = collections.deque()
+        for start, chunk in chunks:
+            in_flight.append(executor.submit(_evaluate_chunk, start, chunk, regimes))
+            # keep every worker busy, but do not expand the whole sweep upfront
+            if len(in_flight) >= 2 * max_workers:
+                yield from in_flight.popleft().result()
+        while in_flight:
+            yield from in_flight.popleft().result()
+
+
+def parse_axis_values(name: str, text: str) -> list:
+    """
+    Parse the values of a sweep axis from the command line.
+
+    Values are separated by commas. Numeric axes also accept inclusive ranges
+    `start:stop[:step]` (e.g. `30:60:10` for 30, 40, 50, 60), and `rho` accepts
+    fractions (e.g. `1/4`). The `field` axis takes names like `GOLDILOCKS_3`.
+    """
+    values = []
+    for item in text.split(","):
+        item = item.strip()
+        if name == "field":
+            if item not in FIELDS:
+                raise ValueError(f"unknown field {item!r}, choose from {list(FIELDS)}")
+            values.append(FIELDS[item])
+        elif name == "rho":
+            values.append(float(Fraction(item)))
+        elif ":" in item:
+            start, stop, *step = (int(part) for part in item.split(":"))
+            values.extend(range(start, stop + 1, step[0] if step else 1))
+        else:
+            values.append(int(item))
+    return values
+
+
+def format_sweep_result(result: SweepResult, axes: Sequence[str], machine=None, schedule=None) -> str:
+    """
+    One-line human-readable summary of a sweep result.
+
+    With a `MachineProfile`, this includes the estimated prover time (see the costs.prover module),
+    and with a `CostSchedule`, the estimated verifier cost (see the costs.verifier module).
+    """
+    cfg = result.config
+    parts = []
+    for name in axes:
+        value = getattr(cfg, name)
+        parts.append(f"{name}={value.name if name == 'field' else value}")
+    for identifier, levels in result.results.items():
+        if isinstance(levels, dict):
+            levels = levels["total"]
+        parts.append(f"{identifier}={'—' if levels is None else levels}")
+    if result.proof_size_bits is None:
+        parts.append("invalid config")
+        return f"{result.index}: " + " ".join(parts)
+    parts.append(f"proof_size={result.proof_size_bits // KIB}KiB")
+    params = zkEVMParams(cfg)
+    if machine is not None:
+        from .costs.prover import get_prover_seconds
+        parts.append(f"prover={get_prover_seconds(params, machine):.3g}s")
+    if schedule is not None:
+        from .costs.verifier import get_verifier_gas
+        parts.append(f"verifier={get_verifier_gas(params, schedule):.4g}{schedule.unit}")
+    return f"{result.index}: " + " ".join(parts)
@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from .zkevm import zkEVMConfig, zkEVMParams
-from ..common.fields import *
+from ..common.fields import GOLDILOCKS_2
 
 
 class MidenPreset:
@@ -0,0 +1,350 @@
+"""
+Column-oriented (struct-of-arrays) view of many zkEVM parameter sets.
+"""
+
+from __future__ import annotations
+
+import dataclasses
+import math
+from functools import cached_property
+from typing import Iterable, Sequence
+
+import numpy as np
+
+from ..common.fields import field_element_size_bits
+from .zkevm import zkEVMConfig, zkEVMParams
+
+
+# The type that each column is stored with. We use the smallest types that fit
+# realistic parameters, as a table can have millions of rows.
+COLUMN_DTYPES = {
+    "hash_size_bits": np.int16,
+    "rho": np.float64,
+    "trace_length": np.int64,
+    "F": np.float64,
+    "log2_F": np.float64,
+    "field_extension_degree": np.int8,
+    "field_size_bits": np.int16,
+    "num_columns": np.int32,
+    "num_polys": np.int32,
+    "power_batching": np.bool_,
+    "num_queries": np.int16,
+    "AIR_max_degree": np.int16,
+    "FRI_folding_factor": np.int16,
+    "FRI_early_stop_degree": np.int32,
+    "max_combo": np.int16,
+    "grinding_query_phase": np.int16,
+    "grinding_batching_phase": np.int16,
+    "grinding_commit_phase": np.int16,
+}
+
+# The columns that are derived from the field of a zkEVMConfig
+_FIELD_COLUMNS = {
+    "F": lambda field: field.F,
+    "log2_F": lambda field: field.log2_F,
+    "field_extension_degree": lambda field: field.field_extension_degree,
+    "field_size_bits": field_element_size_bits,
+}
+
+
+class ParamTable:
+    """
+    Struct-of-arrays counterpart of `zkEVMParams`.
+
+    Every attribute that `zkEVMParams` exposes to the regimes is a NumPy array here,
+    with one entry per configuration. The regimes and `best_attack_security` can
+    therefore be evaluated on a whole table at once, e.g. via
+    `FRIRegime.get_rbr_levels_vectorized`.
+
+    Columns are stored with the types in `COLUMN_DTYPES`. Columns that are the same
+    for all rows are broadcast, so they take the memory of a single entry.
+    """
+
+    # Columns that have to be provided by the caller
+    INPUT_COLUMNS = tuple(COLUMN_DTYPES)
+
+    def __init__(self, **columns):
+        """
+        Build a table from one keyword argument per column in `INPUT_COLUMNS`.
+
+        Scalars are broadcast, so only the columns that actually vary need to be arrays.
+        """
+        missing = set(self.INPUT_COLUMNS) - set(columns)
+        if missing:
+            raise ValueError(f"missing columns: {sorted(missing)}")
+        unknown = set(columns) - set(self.INPUT_COLUMNS)
+        if unknown:
+            raise ValueError(f"unknown columns: {sorted(unknown)}")
+
+        arrays = np.broadcast_arrays(*(_to_column(name, columns[name]) for name in self.INPUT_COLUMNS))
+        for name, array in zip(self.INPUT_COLUMNS, arrays):
+            setattr(self, name, array)
+
+        # Number of columns should be less or equal to the final number of polynomials in batched-FRI
+        assert np.all(self.num_columns <= self.num_polys)
+
+        # Auxiliary parameters, see `zkEVMParams`
+        self.k = np.rint(-np.log2(self.rho)).astype(np.int8)
+        self.h = np.rint(np.log2(self.trace_length)).astype(np.int8)
+        self.D = self.trace_length / self.rho
+        self.FRI_rounds_n = get_num_FRI_folding_rounds_vectorized(
+            witness_size=self.D.astype(np.int64),
+            field_extension_degree=self.field_extension_degree,
+            folding_factor=self.FRI_folding_factor,
+            fri_early_stop_degree=self.FRI_early_stop_degree,
+        ).astype(np.int8)
+
+    def __len__(self) -> int:
+        return len(self.rho)
+
+    @cached_property
+    def proof_size_bits(self) -> np.ndarray:
+        """
+        The proof size of every row, as in `zkEVMParams.proof_size_bits`.
+
+        This is a float array. Rows with a FRI layer without leafs, where
+        `zkEVMParams.proof_size_bits` fails its sanity check, are NaN (see `has_proof_size`).
+        """
+        return get_FRI_proof_size_bits_vectorized(
+            hash_size_bits=self.hash_size_bits,
+            field_size_bits=self.field_size_bits,
+            num_functions=self.num_polys,
+            num_queries=self.num_queries,
+            witness_size=self.D.astype(np.int64),
+            field_extension_degree=self.field_extension_degree,
+            early_stop_degree=self.FRI_early_stop_degree,
+            folding_factor=self.FRI_folding_factor,
+        )
+
+    @property
+    def has_proof_size(self) -> np.ndarray:
+        """
+        Boolean array of the rows whose proof size is defined, i.e., not NaN in `proof_size_bits`.
+        """
+        return ~np.isnan(self.proof_size_bits)
+
+    def as_column_vectors(self) -> "_ColumnVectorView":
+        """
+        Returns a view of this table where every column has shape (n, 1).
+
+        This lets the regimes broadcast the table against an array of candidate values
+        for one of their internal parameters (e.g. m in JBR), in a single pass.
+        """
+        return _ColumnVectorView(self)
+
+    @classmethod
+    def from_params(cls, params_list: Iterable[zkEVMParams]) -> "ParamTable":
+        """
+        Build a table from a sequence of `zkEVMParams`, one row per entry.
+        """
+        params_list = list(params_list)
+        return cls(**{
+            name: np.array([getattr(params, name) for params in params_list])
+            for name in cls.INPUT_COLUMNS
+        })
+
+    @classmethod
+    def from_configs(cls, configs: Iterable[zkEVMConfig]) -> "ParamTable":
+        """
+        Build a table from a sequence of `zkEVMConfig`, one row per entry.
+
+        Unlike `from_params`, this does not create a `zkEVMParams` per row.
+        """
+        configs = list(configs)
+        return cls(**{
+            name: np.fromiter((_get_config_column(cfg, name) for cfg in configs), COLUMN_DTYPES[name], len(configs))
+            for name in cls.INPUT_COLUMNS
+        })
+
+    @classmethod
+    def from_presets(cls, presets: Iterable) -> "ParamTable":
+        """
+        Build a table with one row per preset (e.g. `ZiskPreset`), from their defaults.
+        """
+        return cls.from_configs(preset.default().cfg for preset in presets)
+
+    @classmethod
+    def from_grid(cls, base: zkEVMConfig, axes: dict[str, Sequence]) -> "ParamTable":
+        """
+        Build a table from the Cartesian product of `axes`, in the same order as
+        `iter_sweep_configs` (the last axis varies fastest).
+
+        `axes` maps fields of zkEVMConfig to the values to try, and fields that are not
+        in `axes` keep their value from `base`. No object is created per row, so this
+        scales to grids with millions of configs.
+        """
+        config_fields = {field.name for field in dataclasses.fields(zkEVMConfig)} - {"name"}
+        for name in axes:
+            if name not in config_fields:
+                raise ValueError(f"cannot build a grid over {name!r}, choose from {sorted(config_fields)}")
+
+        columns = {name: _get_config_column(base, name) for name in cls.INPUT_COLUMNS}
+        lengths = [len(values) for values in axes.values()]
+        rows = np.arange(math.prod(lengths), dtype=np.int64)
+        stride = 1
+        for (name, values), length in reversed(list(zip(axes.items(), lengths))):
+            index = rows // stride % length
+            stride *= length
+            for column in _get_columns_of_field(name):
+                column_values = [_get_column_value(column, value) for value in values]
+                columns[column] = _to_column(column, column_values)[index]
+        return cls(**columns)
+
+
+def _to_column(name: str, values) -> np.ndarray:
+    """
+    Convert values to a column of type COLUMN_DTYPES[name], checking that they fit.
+    """
+    dtype = COLUMN_DTYPES[name]
+    array = np.atleast_1d(np.asarray(values))
+    if np.issubdtype(dtype, np.integer) and array.size:
+        info = np.iinfo(dtype)
+        if array.min() < info.min or array.max() > info.max:
+            raise ValueError(f"values of column {name} do not fit into {np.dtype(dtype).name}")
+    return array.astype(dtype, copy=False)
+
+
+def _get_config_column(cfg: zkEVMConfig, name: str):
+    """
+    Returns the value of the column `name` for the given config.
+    """
+    if name in _FIELD_COLUMNS:
+        return _FIELD_COLUMNS[name](cfg.field)
+    return getattr(cfg, name)
+
+
+def _get_column_value(name: str, value):
+    """
+    Returns the value of the column `name`, given the value of the zkEVMConfig field it comes from.
+    """
+    if name in _FIELD_COLUMNS:
+        return _FIELD_COLUMNS[name](value)
+    return value
+
+
+def _get_columns_of_field(name: str) -> tuple[str, ...]:
+    """
+    Returns the columns that depend on the given zkEVMConfig field.
+    """
+    if name == "field":
+        return tuple(_FIELD_COLUMNS)
+    return (name,)
+
+
+def get_num_FRI_folding_rounds_vectorized(
+    witness_size: np.ndarray,
+    field_extension_degree: np.ndarray,
+    folding_factor: np.ndarray,
+    fri_early_stop_degree: np.ndarray,
+) -> np.ndarray:
+    """
+    Vectorized version of `get_num_FRI_folding_rounds`.
+
+    Runs the same loop for all entries in lockstep, until every entry has stopped.
+    """
+    n = np.array(witness_size, dtype=np.int64)
+    rounds = np.zeros_like(n)
+    active = n // field_extension_degree > fri_early_stop_degree
+    while np.any(active):
+        n = np.where(active, n // folding_factor, n)
+        rounds += active
+        active = n // field_extension_degree > fri_early_stop_degree
+    return rounds
+
+
+def get_FRI_proof_size_bits_vectorized(
+    hash_size_bits: np.ndarray,
+    field_size_bits: np.ndarray,
+    num_functions: np.ndarray,
+    num_queries: np.ndarray,
+    witness_size: np.ndarray,
+    field_extension_degree: np.ndarray,
+    early_stop_degree: np.ndarray,
+    folding_factor: np.ndarray,
+) -> np.ndarray:
+    """
+    Vectorized version of `get_FRI_proof_size_bits`.
+
+    Runs the same loop over the folding layers for all entries in lockstep.
+    Entries with a layer without leafs, where the scalar version fails its sanity
+    check, are NaN.
+    """
+    hash_size_bits = np.asarray(hash_size_bits, dtype=np.int64)
+    field_size_bits = np.asarray(field_size_bits, dtype=np.int64)
+    folding_factor = np.asarray(folding_factor, dtype=np.int64)
+
+    # Initial Round: one root and one path per query
+    n = np.array(witness_size, dtype=np.int64)
+    roots_bits = hash_size_bits + np.zeros_like(n)
+    opening_bits = _get_size_of_merkle_path_bits_vectorized(
+        n // folding_factor, np.asarray(num_functions, dtype=np.int64), field_size_bits, hash_size_bits
+    )
+
+    # Folding rounds
+    active = n // (folding_factor * field_extension_degree) >= early_stop_degree
+    while np.any(active):
+        n = np.where(active, n // folding_factor, n)
+        roots_bits += np.where(active, hash_size_bits, 0)
+        # entries that have stopped get a dummy tree with one leaf
+        num_leafs = np.where(active, n // folding_factor, 1)
+        opening_bits += np.where(
+            active,
+            _get_size_of_merkle_path_bits_vectorized(num_leafs, folding_factor, field_size_bits, hash_size_bits),
+            0,
+        )
+        active = n // (folding_factor * field_extension_degree) >= early_stop_degree
+
+    return roots_bits + np.asarray(num_queries, dtype=np.int64) * opening_bits
+
+
+def get_FRI_layers_vectorized(
+    num_functions: np.ndarray,
+    witness_size: np.ndarray,
+    field_extension_degree: np.ndarray,
+    early_stop_degree: np.ndarray,
+    folding_factor: np.ndarray,
+) -> list[tuple[np.ndarray, np.ndarray]]:
+    """
+    Vectorized version of `get_FRI_layers`.
+
+    Runs the same loop for all entries in lockstep, so entries with fewer layers
+    than others have no leafs in the layers after their last one.
+    """
+    folding_factor = np.asarray(folding_factor, dtype=np.int64)
+
+    # Initial Round
+    n = np.array(witness_size, dtype=np.int64)
+    layers = [(n // folding_factor, np.asarray(num_functions, dtype=np.int64) + np.zeros_like(n))]
+
+    # Folding rounds
+    active = n // (folding_factor * field_extension_degree) >= early_stop_degree
+    while np.any(active):
+        n = np.where(active, n // folding_factor, n)
+        layers.append((np.where(active, n // folding_factor, 0), folding_factor + np.zeros_like(n)))
+        active = n // (folding_factor * field_extension_degree) >= early_stop_degree
+
+    return layers
+
+
+def _get_size_of_merkle_path_bits_vectorized(
+    num_leafs: np.ndarray,
+    tuple_size: np.ndarray,
+    element_size_bits: np.ndarray,
+    hash_size_bits: np.ndarray,
+) -> np.ndarray:
+    # See `get_size_of_merkle_path_bits`. Trees without leafs are NaN.
+    leaf_size = tuple_size * element_size_bits
+    sibling = tuple_size * element_size_bits
+    # ceil(log2(num_leafs)), computed exactly as the bit length of num_leafs - 1
+    tree_depth = np.frexp(num_leafs - 1)[1]
+    co_path = (tree_depth - 1) * hash_size_bits
+    return np.where(num_leafs > 0, leaf_size + sibling + co_path, np.nan)
+
+
+class _ColumnVectorView:
+    def __init__(self, table: ParamTable):
+        self._table = table
+
+    def __getattr__(self, name: str):
+        value = getattr(self._table, name)
+        return value[:, None] if isinstance(value, np.ndarray) else value
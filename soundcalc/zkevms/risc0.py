@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from .zkevm import zkEVMConfig, zkEVMParams
-from ..common.fields import *
+from ..common.fields import BABYBEAR_4
 
 
 class Risc0Preset:
@@ -1,7 +1,9 @@
 from __future__ import annotations
 
+import math
+
 from .zkevm import zkEVMConfig, zkEVMParams
-from ..common.fields import *
+from ..common.fields import GOLDILOCKS_3
 
 
 class ZiskPreset:
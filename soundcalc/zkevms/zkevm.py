@@ -1,9 +1,11 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+from dataclasses import dataclass, fields
+from functools import cached_property
 from typing import Protocol, Mapping, Any
 
 from math import log2
+from .. import profiling
 from ..common.fields import FieldParams, field_element_size_bits
 from ..common.fri import get_FRI_proof_size_bits, get_num_FRI_folding_rounds
 
@@ -54,15 +56,42 @@ class zkEVMConfig:
     # Proof of Work grinding compute during FRI query phase (expressed in bits of security)
     grinding_query_phase: int
 
+    # Proof of Work grinding compute before the FRI batching challenge (expressed in bits of security)
+    grinding_batching_phase: int = 0
+    # Proof of Work grinding compute before each FRI folding challenge (expressed in bits of security)
+    grinding_commit_phase: int = 0
+
 
 class zkEVMParams:
     """
     zkEVM parameters used by the soundness calculator.
     """
+
+    # The attributes below are not simply copied from zkEVMConfig.
+    # For each of them, these are the zkEVMConfig fields that it is derived from.
+    DERIVED_FROM = {
+        "k": ("rho",),
+        "h": ("trace_length",),
+        "D": ("trace_length", "rho"),
+        "F": ("field",),
+        "log2_F": ("field",),
+        "field_extension_degree": ("field",),
+        "field_size_bits": ("field",),
+        "FRI_rounds_n": ("trace_length", "rho", "field", "FRI_folding_factor", "FRI_early_stop_degree"),
+        "proof_size_bits": (
+            "hash_size_bits", "field", "num_polys", "num_queries",
+            "trace_length", "rho", "FRI_early_stop_degree", "FRI_folding_factor",
+        ),
+        "cfg": tuple(field.name for field in fields(zkEVMConfig)),
+    }
+
     def __init__(self, zkevm_cfg: zkEVMConfig):
         """
         Given a zkEVMConfig, compute all the parameters relevant for the zkEVM.
         """
+        # Keep the config around, so that variants can be derived from it (e.g. in sweeps)
+        self.cfg = zkevm_cfg
+
         # Copy the parameters over (also see docs just above)
         self.name = zkevm_cfg.name
         self.hash_size_bits = zkevm_cfg.hash_size_bits
@@ -76,41 +105,63 @@ class zkEVMParams:
         self.FRI_folding_factor = zkevm_cfg.FRI_folding_factor
         self.FRI_early_stop_degree = zkevm_cfg.FRI_early_stop_degree
         self.grinding_query_phase = zkevm_cfg.grinding_query_phase
+        self.grinding_batching_phase = zkevm_cfg.grinding_batching_phase
+        self.grinding_commit_phase = zkevm_cfg.grinding_commit_phase
         self.AIR_max_degree = zkevm_cfg.AIR_max_degree
 
         # Number of columns should be less or equal to the final number of polynomials in batched-FRI
         assert self.num_columns <= self.num_polys
 
-        # Now, also compute some auxiliary parameters
-
-        # Negative log of rate
-        self.k = int(round(-log2(self.rho)))
-        # Log of trace length
-        self.h = int(round(log2(self.trace_length)))
-        # Domain size, after low-degree extension
-        self.D = self.trace_length / self.rho
-
         # Extract field parameters from the preset field
         # Extension field degree (e.g., ext_size = 2 for Fp²)
         self.field_extension_degree = zkevm_cfg.field.field_extension_degree
         # Extension field size |F| = p^{ext_size}
         self.F = zkevm_cfg.field.F
+        # log2 |F|, precomputed per field
+        self.log2_F = zkevm_cfg.field.log2_F
+        # Size of a field element in bits
+        self.field_size_bits = field_element_size_bits(zkevm_cfg.field)
 
+    # The auxiliary parameters below are computed lazily, on first access, and then cached.
+    # Callers that only need some of them (e.g. only the security levels) do not pay for the rest.
+
+    @cached_property
+    def k(self) -> int:
+        # Negative log of rate
+        return int(round(-log2(self.rho)))
+
+    @cached_property
+    def h(self) -> int:
+        # Log of trace length
+        return int(round(log2(self.trace_length)))
+
+    @cached_property
+    def D(self) -> float:
+        # Domain size, after low-degree extension
+        return self.trace_length / self.rho
+
+    @cached_property
+    def FRI_rounds_n(self) -> int:
         # Compute number of FRI folding rounds
-        self.FRI_rounds_n = get_num_FRI_folding_rounds(
+        return get_num_FRI_folding_rounds(
             witness_size=int(self.D),
             field_extension_degree=int(self.field_extension_degree),
             folding_factor=int(self.FRI_folding_factor),
             fri_early_stop_degree=int(self.FRI_early_stop_degree),
         )
 
+    @cached_property
+    def proof_size_bits(self) -> int:
         # Compute the proof size
         # XXX (BW): note that it is not clear that this is the
         # proof size for every zkEVM we can think of
         # XXX (BW): we should probably also add something for the OOD samples and plookup, lookup etc.
-        self.proof_size_bits = get_FRI_proof_size_bits(
+        return profiling.call("proof size", self._get_proof_size_bits)
+
+    def _get_proof_size_bits(self) -> int:
+        return get_FRI_proof_size_bits(
             hash_size_bits=self.hash_size_bits,
-            field_size_bits=field_element_size_bits(zkevm_cfg.field),
+            field_size_bits=self.field_size_bits,
             num_functions=self.num_polys,
             num_queries=self.num_queries,
             witness_size=int(self.D),
@@ -0,0 +1,26 @@
+"""
+Check that cached results are served until the formula version of their regime changes.
+"""
+
+from soundcalc.cache import ResultCache, compute_security_for_zkevm_cached
+from soundcalc.regimes.johnson_bound import JohnsonBoundRegime
+from soundcalc.regimes.unique_decoding import UniqueDecodingRegime
+from soundcalc.registry import PRESETS
+from soundcalc.security import compute_security_for_zkevm
+
+
+def test_formula_version_bump_invalidates(tmp_path, monkeypatch):
+    params = PRESETS["zisk"].default()
+    regimes = [UniqueDecodingRegime(), JohnsonBoundRegime()]
+    expected = compute_security_for_zkevm(regimes, params)
+
+    with ResultCache(str(tmp_path / "cache.sqlite")) as cache:
+        assert compute_security_for_zkevm_cached(cache, regimes, params) == expected
+        assert (cache.hits, cache.misses) == (0, 3)
+        assert compute_security_for_zkevm_cached(cache, regimes, params) == expected
+        assert (cache.hits, cache.misses) == (3, 3)
+
+        # Only the entry of the bumped regime is computed again
+        monkeypatch.setattr(JohnsonBoundRegime, "FORMULA_VERSION", JohnsonBoundRegime.FORMULA_VERSION + 1)
+        assert compute_security_for_zkevm_cached(cache, regimes, params) == expected
+        assert (cache.hits, cache.misses) == (5, 4)
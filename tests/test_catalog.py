@@ -0,0 +1,68 @@
+"""
+Check that `iter_catalog` collects the invalid entries of a catalog in `errors`.
+"""
+
+import json
+
+import pytest
+
+from soundcalc.catalog import CatalogError, iter_catalog, load_catalog
+
+
+CATALOG = """
+[defaults]
+preset = "risc0"
+
+[[configs]]
+name = "valid"
+
+[[configs]]
+name = "too many columns"
+num_columns = 1000
+num_polys = 10
+
+[[configs]]
+name = "no leafs"
+FRI_early_stop_degree = 1
+
+[[configs]]
+name = "unknown field"
+blowup = 4
+
+[[configs]]
+name = "also valid"
+rho = "1/4"
+"""
+
+
+def test_invalid_entries_are_collected(tmp_path):
+    path = tmp_path / "catalog.toml"
+    path.write_text(CATALOG)
+
+    errors = []
+    configs = list(iter_catalog(str(path), errors=errors))
+    assert [cfg.name for cfg in configs] == ["valid", "also valid"]
+    assert [error.location for error in errors] == [
+        "config 2 (too many columns)",
+        "config 3 (no leafs)",
+        "config 4 (unknown field)",
+    ]
+    assert "has no leafs" in str(errors[1])
+
+    # Without `errors`, the first invalid entry raises
+    with pytest.raises(CatalogError, match="too many columns"):
+        load_catalog(str(path))
+
+
+def test_invalid_lines_are_collected(tmp_path):
+    path = tmp_path / "catalog.jsonl"
+    path.write_text("\n".join(json.dumps(entry) for entry in [
+        {"preset": "miden", "name": "valid"},
+        {"preset": "miden", "name": "no leafs", "FRI_early_stop_degree": 1},
+        {"preset": "miden", "name": "bad rho", "rho": 2},
+    ]))
+
+    errors = []
+    configs = list(iter_catalog(str(path), errors=errors))
+    assert [cfg.name for cfg in configs] == ["valid"]
+    assert [error.location for error in errors] == ["line 2 (no leafs)", "line 3 (bad rho)"]
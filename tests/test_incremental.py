@@ -0,0 +1,60 @@
+"""
+Compare `IncrementalEvaluator` with a full recomputation after every edit of a random sequence.
+"""
+
+import dataclasses
+import random
+
+import pytest
+
+from soundcalc.incremental import IncrementalEvaluator
+from soundcalc.regimes.capacity_bound import CapacityBoundRegime
+from soundcalc.regimes.johnson_bound import JohnsonBoundRegime
+from soundcalc.regimes.unique_decoding import UniqueDecodingRegime
+from soundcalc.registry import PRESETS
+from soundcalc.security import compute_security_for_zkevm
+from soundcalc.zkevms.zkevm import zkEVMParams
+
+
+EDITS = {
+    "num_queries": lambda rng, cfg: rng.randint(10, 200),
+    "rho": lambda rng, cfg: rng.choice([1/2, 1/4, 1/8, 1/16]),
+    "trace_length": lambda rng, cfg: 2 ** rng.randint(16, 24),
+    "num_polys": lambda rng, cfg: cfg.num_columns + rng.randint(0, 10),
+    "max_combo": lambda rng, cfg: rng.randint(2, 8),
+    "FRI_folding_factor": lambda rng, cfg: rng.choice([2, 4, 8, 16]),
+    "grinding_query_phase": lambda rng, cfg: rng.randint(0, 20),
+    "grinding_commit_phase": lambda rng, cfg: rng.randint(0, 20),
+}
+
+REGIMES = [
+    UniqueDecodingRegime(),
+    JohnsonBoundRegime(optimize_m=True),
+    CapacityBoundRegime(optimize_eta=True),
+]
+
+
+def _recompute(cfg):
+    params = zkEVMParams(cfg)
+    return compute_security_for_zkevm(REGIMES, params), params.proof_size_bits
+
+
+@pytest.mark.parametrize("preset", ["zisk", "miden", "risc0"])
+def test_matches_full_recomputation(preset):
+    rng = random.Random(preset)
+    cfg = PRESETS[preset].default().cfg
+    evaluator = IncrementalEvaluator(cfg, REGIMES)
+    for _ in range(50):
+        names = rng.sample(list(EDITS), rng.randint(1, 3))
+        changes = {name: EDITS[name](rng, cfg) for name in names}
+        try:
+            expected = _recompute(dataclasses.replace(cfg, **changes))
+        except AssertionError:
+            # The evaluator rejects the edit too, and keeps its previous state
+            with pytest.raises(AssertionError):
+                evaluator.update(**changes)
+            assert (evaluator.results, evaluator.proof_size_bits) == _recompute(cfg)
+            continue
+        evaluator.update(**changes)
+        cfg = evaluator.cfg
+        assert (evaluator.results, evaluator.proof_size_bits) == expected
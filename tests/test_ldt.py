@@ -0,0 +1,42 @@
+"""
+Compare the per-round proximities and queries of STIR and WHIR.
+"""
+
+import dataclasses
+
+import pytest
+
+from soundcalc.ldt.stir import STIR
+from soundcalc.ldt.whir import WHIR
+from soundcalc.regimes.johnson_bound import JohnsonBoundRegime
+from soundcalc.regimes.unique_decoding import UniqueDecodingRegime
+from soundcalc.registry import PRESETS
+from soundcalc.zkevms.zkevm import zkEVMParams
+
+
+@pytest.mark.parametrize("preset", ["zisk", "miden", "risc0"])
+@pytest.mark.parametrize("regime", [UniqueDecodingRegime(), JohnsonBoundRegime()], ids=["UDR", "JBR"])
+@pytest.mark.parametrize("target_bits", [60, 90])
+def test_same_queries_for_a_fixed_proximity(preset, regime, target_bits):
+    # With a fixed proximity per round, both protocols need the same queries (as in the WHIR paper)
+    params = PRESETS[preset].default()
+    stir = STIR().analyze(params, regime, target_bits)
+    whir = WHIR().analyze(params, regime, target_bits)
+    assert [r.num_queries for r in stir.rounds] == [r.num_queries for r in whir.rounds]
+
+
+def test_whir_gets_closer_to_the_johnson_bound():
+    # In a small field, the folding error limits how close to the Johnson bound a round may get.
+    # The binary folds of WHIR have a smaller error than the folds by 16 of STIR, so WHIR can
+    # choose a larger m per round, which needs fewer queries and reaches targets that STIR cannot.
+    params = zkEVMParams(dataclasses.replace(PRESETS["risc0"].default().cfg, grinding_batching_phase=20))
+    regime = JohnsonBoundRegime(optimize_m=True)
+    stir = STIR().analyze(params, regime, 92)
+    whir = WHIR().analyze(params, regime, 92)
+
+    assert whir.levels["total"] == 92
+    assert stir.levels["total"] < 92
+    for stir_round, whir_round in zip(stir.rounds, whir.rounds):
+        assert whir_round.regime_parameters["m"] >= stir_round.regime_parameters["m"]
+        assert whir_round.num_queries <= stir_round.num_queries
+    assert whir.num_queries < stir.num_queries
@@ -0,0 +1,24 @@
+"""
+Compare the expected proof size with shared Merkle nodes with the one of independent paths.
+"""
+
+import dataclasses
+
+import pytest
+
+from soundcalc.common.merkle import get_expected_proof_size_bits
+from soundcalc.registry import PRESETS
+from soundcalc.zkevms.zkevm import zkEVMParams
+
+
+@pytest.mark.parametrize("preset", ["zisk", "miden", "risc0"])
+def test_single_query_matches_independent_paths(preset):
+    # A single query shares no nodes, so its paths are the ones of `get_FRI_proof_size_bits`
+    params = zkEVMParams(dataclasses.replace(PRESETS[preset].default().cfg, num_queries=1))
+    assert get_expected_proof_size_bits(params) == pytest.approx(params.proof_size_bits)
+
+
+@pytest.mark.parametrize("preset", ["zisk", "miden", "risc0"])
+def test_shared_nodes_are_not_larger(preset):
+    params = PRESETS[preset].default()
+    assert get_expected_proof_size_bits(params) <= params.proof_size_bits
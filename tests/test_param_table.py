@@ -0,0 +1,88 @@
+"""
+Compare the vectorized evaluation of a `ParamTable` with the scalar one of each of its configs.
+"""
+
+import dataclasses
+import itertools
+
+import numpy as np
+import pytest
+
+from soundcalc.costs.prover import get_prover_cost
+from soundcalc.regimes.capacity_bound import CapacityBoundRegime
+from soundcalc.regimes.johnson_bound import JohnsonBoundRegime
+from soundcalc.regimes.unique_decoding import UniqueDecodingRegime
+from soundcalc.registry import PRESETS
+from soundcalc.security import get_rbr_levels_for_table_and_regime, get_rbr_levels_for_zkevm_and_regime
+from soundcalc.zkevms.param_table import ParamTable
+from soundcalc.zkevms.zkevm import zkEVMParams
+
+
+# Includes configs that the list decoding regimes do not apply to, and ones with FRI layers without leafs
+AXES = {
+    "trace_length": [2**4, 2**10, 2**20],
+    "rho": [1/2, 1/4, 1/16],
+    "num_queries": [10, 60],
+    "FRI_folding_factor": [4, 16],
+    "FRI_early_stop_degree": [1, 8],
+}
+
+
+def _make_configs(preset):
+    base = PRESETS[preset].default().cfg
+    names = list(AXES)
+    return [
+        dataclasses.replace(base, **dict(zip(names, values)))
+        for values in itertools.product(*(AXES[name] for name in names))
+    ]
+
+
+@pytest.mark.parametrize("preset", ["zisk", "miden", "risc0"])
+@pytest.mark.parametrize("regime", [
+    UniqueDecodingRegime(),
+    JohnsonBoundRegime(),
+    JohnsonBoundRegime(optimize_m=True),
+    CapacityBoundRegime(),
+    CapacityBoundRegime(optimize_eta=True),
+], ids=["UDR", "JBR", "JBR optimize_m", "CBR", "CBR optimize_eta"])
+def test_levels_match_scalar(preset, regime):
+    configs = _make_configs(preset)
+    levels, valid = get_rbr_levels_for_table_and_regime(regime, ParamTable.from_configs(configs))
+    for i, cfg in enumerate(configs):
+        try:
+            expected = get_rbr_levels_for_zkevm_and_regime(regime, zkEVMParams(cfg))
+        except AssertionError:
+            assert not valid[i]
+            continue
+        assert valid[i]
+        assert levels["total"][i] == expected["total"]
+        for label, level in expected.items():
+            if label.startswith("FRI commit round"):
+                assert levels["FRI commit round"][i] == level
+            else:
+                assert levels[label][i] == level
+
+
+@pytest.mark.parametrize("preset", ["zisk", "miden", "risc0"])
+def test_proof_size_matches_scalar(preset):
+    configs = _make_configs(preset)
+    table = ParamTable.from_configs(configs)
+    for i, cfg in enumerate(configs):
+        try:
+            expected = zkEVMParams(cfg).proof_size_bits
+        except AssertionError:
+            assert not table.has_proof_size[i]
+            assert np.isnan(table.proof_size_bits[i])
+            continue
+        assert table.has_proof_size[i]
+        assert table.proof_size_bits[i] == expected
+
+
+@pytest.mark.parametrize("preset", ["zisk", "miden", "risc0"])
+def test_prover_cost_matches_scalar(preset):
+    configs = _make_configs(preset)
+    cost = get_prover_cost(ParamTable.from_configs(configs))
+    for i, cfg in enumerate(configs):
+        expected = get_prover_cost(zkEVMParams(cfg))
+        for name, value in dataclasses.asdict(expected).items():
+            assert getattr(cost, name)[i] == pytest.approx(value)
@@ -0,0 +1,48 @@
+"""
+Compare `find_pareto_frontier` with the frontier of a brute-force evaluation of the whole grid.
+"""
+
+import dataclasses
+import itertools
+
+import pytest
+
+from soundcalc.pareto import ParetoFrontier, ParetoPoint, find_pareto_frontier
+from soundcalc.regimes.capacity_bound import CapacityBoundRegime
+from soundcalc.regimes.johnson_bound import JohnsonBoundRegime
+from soundcalc.regimes.unique_decoding import UniqueDecodingRegime
+from soundcalc.registry import PRESETS
+from soundcalc.security import get_rbr_levels_for_zkevm_and_regime
+from soundcalc.zkevms.zkevm import zkEVMParams
+
+
+AXES = {"rho": [1/2, 1/4, 1/8], "num_queries": range(10, 201), "FRI_folding_factor": [4, 8, 16]}
+
+
+def _brute_force_frontier(base, regime, axes) -> ParetoFrontier:
+    frontier = ParetoFrontier()
+    names = list(axes)
+    for values in itertools.product(*(axes[name] for name in names)):
+        params = zkEVMParams(dataclasses.replace(base, **dict(zip(names, values))))
+        try:
+            levels = get_rbr_levels_for_zkevm_and_regime(regime, params)
+        except AssertionError:
+            continue
+        frontier.insert(ParetoPoint(params.cfg, params.proof_size_bits, levels, params.proof_size_bits))
+    return frontier
+
+
+@pytest.mark.parametrize("preset", ["risc0", "miden"])
+@pytest.mark.parametrize("regime", [
+    UniqueDecodingRegime(),
+    JohnsonBoundRegime(),
+    JohnsonBoundRegime(optimize_m=True),
+    CapacityBoundRegime(optimize_eta=True),
+], ids=["UDR", "JBR", "JBR optimize_m", "CBR optimize_eta"])
+def test_frontier_matches_brute_force(preset, regime):
+    base = PRESETS[preset].default().cfg
+    frontier = find_pareto_frontier(base, regime, AXES)
+    expected = _brute_force_frontier(base, regime, AXES)
+    assert [(p.cost, p.levels["total"]) for p in frontier.points] == [
+        (p.cost, p.levels["total"]) for p in expected.points
+    ]
@@ -0,0 +1,50 @@
+"""
+Errors of single configs must not fail a whole request of the query service.
+"""
+
+import json
+from http import HTTPStatus
+
+from soundcalc.server import QueryService
+
+
+def _post(service, path, request):
+    return service.handle("POST", path, json.dumps(request).encode())
+
+
+def test_batch_reports_invalid_configs_per_entry():
+    service = QueryService()
+    status, payload = _post(service, "/batch", {
+        "configs": [{"preset": "risc0", "FRI_early_stop_degree": 1}, {"preset": "risc0"}],
+        "regimes": ["JBR"],
+    })
+    assert status == HTTPStatus.OK
+    assert "error" in payload["results"][0]
+    assert payload["results"][1]["results"]["JBR"]["total"] > 0
+
+
+def test_evaluation_errors_are_answered(monkeypatch):
+    service = QueryService()
+
+    def fail(cfg, identifiers):
+        raise AssertionError("out of range")
+
+    monkeypatch.setattr(service, "evaluate", fail)
+    status, payload = _post(service, "/batch", {"configs": [{"preset": "risc0"}]})
+    assert status == HTTPStatus.OK
+    assert "cannot evaluate config" in payload["results"][0]["error"]
+
+    status, payload = _post(service, "/evaluate", {"config": {"preset": "risc0"}})
+    assert status == HTTPStatus.UNPROCESSABLE_ENTITY
+
+
+def test_unexpected_errors_are_answered(monkeypatch):
+    service = QueryService()
+
+    def fail():
+        raise RuntimeError("boom")
+
+    monkeypatch.setattr(service, "_health", fail)
+    status, payload = service.handle("GET", "/health", b"")
+    assert status == HTTPStatus.INTERNAL_SERVER_ERROR
+    assert "boom" in payload["error"]
@@ -0,0 +1,37 @@
+"""
+Compare the closed form of the number of queries (see `solve_num_queries`) with the
+bisection that it falls back to.
+"""
+
+import dataclasses
+
+import pytest
+
+from soundcalc.common.fri import get_FRI_num_queries_for_level
+from soundcalc.regimes.capacity_bound import CapacityBoundRegime
+from soundcalc.regimes.johnson_bound import JohnsonBoundRegime
+from soundcalc.regimes.unique_decoding import UniqueDecodingRegime
+from soundcalc.registry import PRESETS
+from soundcalc.solver import _bisect_min_num_queries, solve_num_queries
+from soundcalc.zkevms.zkevm import zkEVMParams
+
+
+@pytest.mark.parametrize("preset", ["zisk", "miden", "risc0"])
+@pytest.mark.parametrize("regime", [
+    UniqueDecodingRegime(),
+    JohnsonBoundRegime(),
+    CapacityBoundRegime(),
+], ids=["UDR", "JBR", "CBR"])
+@pytest.mark.parametrize("grinding_bits", [0, 16])
+def test_closed_form_matches_bisection(preset, regime, grinding_bits):
+    params = PRESETS[preset].default()
+    theta = regime.get_theta(params)
+
+    def level_of(num_queries):
+        cfg = dataclasses.replace(params.cfg, num_queries=num_queries, grinding_query_phase=grinding_bits)
+        return regime.get_rbr_levels(zkEVMParams(cfg))["FRI query phase"]
+
+    for target_bits in range(grinding_bits + 1, 129):
+        expected = _bisect_min_num_queries(level_of, target_bits)
+        assert get_FRI_num_queries_for_level(theta, target_bits, grinding_bits) == expected
+        assert solve_num_queries(params, regime, target_bits, grinding_bits).num_queries == expected